@@ -48,6 +48,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     "theatre_app",
     "rest_framework_simplejwt",
@@ -99,6 +100,26 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Each process keeps its own local-memory cache unless REDIS_URL points
+# every worker at a shared Redis instance.
+
+if os.environ.get("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ["REDIS_URL"],
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -150,11 +171,23 @@ REST_FRAMEWORK = {
         "rest_framework.throttling.AnonRateThrottle",
         "rest_framework.throttling.UserRateThrottle",
     ],
-    "DEFAULT_THROTTLE_RATES": {"anon": "100/minutes", "user": "1000/minutes"},
+    "DEFAULT_THROTTLE_RATES": {
+        "anon": os.environ.get("DJANGO_ANON_THROTTLE_RATE", "100/minutes"),
+        "user": os.environ.get("DJANGO_USER_THROTTLE_RATE", "1000/minutes"),
+    },
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "rest_framework_simplejwt.authentication.JWTAuthentication",
     ),
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_RENDERER_CLASSES": (
+        "theatre_app.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "theatre_app.renderers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
 }
 
 
@@ -164,6 +197,10 @@ SIMPLE_JWT = {
     "ROTATE_REFRESH_TOKENS": False,
 }
 
+SEAT_HOLD_TTL = timedelta(
+    minutes=int(os.environ.get("SEAT_HOLD_TTL_MINUTES", 10))
+)
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "Theatre API",
     "DESCRIPTION": "Make a reservation for performance in your city online.",
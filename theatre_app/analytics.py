@@ -0,0 +1,316 @@
+from collections import Counter
+from datetime import date, datetime, time, timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import (Case, Count, F, Max, OuterRef, Q, Subquery,
+                              Sum, Value, When)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from theatre_app.models import Occupancy, OccupancyDelta, Performance, Play
+
+# Performance lookup each rollup groups by and the one it is labelled
+# with; days are labelled with the date itself.
+DIMENSIONS = {
+    Occupancy.Dimension.PERFORMANCE: ("id", "play__title"),
+    Occupancy.Dimension.PLAY: ("play", "play__title"),
+    Occupancy.Dimension.THEATRE_HALL: (
+        "theatre_hall", "theatre_hall__name"
+    ),
+    Occupancy.Dimension.GENRE: ("play__genres", "play__genres__name"),
+    Occupancy.Dimension.DAY: ("show_time__date", None),
+}
+
+OCCUPANCY_FIELDS = (
+    "label", "performances", "seats_total", "seats_sold", "refreshed_at"
+)
+
+# Seconds between folds of the sales log run after sales commit; the
+# occupancy endpoint folds whatever is left before reading.
+OCCUPANCY_FOLD_INTERVAL = 1
+OCCUPANCY_FOLD_KEY = "theatre:occupancy:fold"
+
+# What a performance row needs to name its groups, genres joined in.
+GROUP_COLUMNS = ("id", "play_id", "theatre_hall_id", "show_time",
+                 "play__genres")
+
+
+def day_range(day):
+    """Return the [start, end) show times of a local calendar day."""
+    return (
+        timezone.make_aware(datetime.combine(day, time.min)),
+        timezone.make_aware(
+            datetime.combine(day + timedelta(days=1), time.min)
+        ),
+    )
+
+
+def groups_of(rows):
+    """Map GROUP_COLUMNS rows to {performance_id: {(dimension, key)}}."""
+    groups = {}
+    for performance_id, play_id, hall_id, show_time, genre_id in rows:
+        if timezone.is_naive(show_time):
+            show_time = timezone.make_aware(show_time)
+        performance_groups = groups.setdefault(performance_id, {
+            (Occupancy.Dimension.PERFORMANCE, str(performance_id)),
+            (Occupancy.Dimension.PLAY, str(play_id)),
+            (Occupancy.Dimension.THEATRE_HALL, str(hall_id)),
+            (Occupancy.Dimension.DAY, str(timezone.localdate(show_time))),
+        })
+        if genre_id is not None:
+            performance_groups.add(
+                (Occupancy.Dimension.GENRE, str(genre_id))
+            )
+    return groups
+
+
+def performance_groups(performances):
+    """Return the set of groups the given performances belong to."""
+    return set().union(*groups_of(
+        performances.values_list(*GROUP_COLUMNS)
+    ).values())
+
+
+def deleted_performance_groups(performance):
+    """Return the groups of a performance whose row is already gone."""
+    genre_ids = Play.genres.through.objects.filter(
+        play_id=performance.play_id
+    ).values_list("genre_id", flat=True)
+    return groups_of(
+        (performance.pk, performance.play_id, performance.theatre_hall_id,
+         performance.show_time, genre_id)
+        for genre_id in list(genre_ids) or [None]
+    )[performance.pk]
+
+
+def unfolded_seats():
+    """Seats each performance sold that are still waiting to be folded."""
+    return Coalesce(
+        Subquery(
+            OccupancyDelta.objects.filter(performance=OuterRef("pk"))
+            .values("performance")
+            .annotate(seats=Sum("delta"))
+            .values("seats")
+        ),
+        0,
+    )
+
+
+def occupancy_rows(groups=None):
+    """Aggregate performances into unsaved Occupancy rows.
+
+    With ``groups``, a set of (dimension, key), only those groups are
+    recomputed, each dimension from one grouped query over the stored
+    sold-seat counters. Sales still waiting in the OccupancyDelta log
+    are left out, in that same query, for the fold to add. Days are
+    selected by show_time range so the show_time index applies.
+    """
+    refreshed_at = timezone.now()
+    seats_total = F("theatre_hall__rows") * F("theatre_hall__seats_per_row")
+    rows = []
+    for dimension, (key, label) in DIMENSIONS.items():
+        # One filter() call, so genre conditions share a single join.
+        # Show times are never null, and testing their date would keep
+        # the show_time index from being used.
+        lookups = (
+            Q() if dimension == Occupancy.Dimension.DAY
+            else Q(**{f"{key}__isnull": False})
+        )
+        if groups is not None:
+            keys = [
+                group_key for group_dimension, group_key in groups
+                if group_dimension == dimension
+            ]
+            if not keys:
+                continue
+            if dimension == Occupancy.Dimension.DAY:
+                days = Q(pk__in=[])
+                for day in keys:
+                    start, end = day_range(date.fromisoformat(day))
+                    days |= Q(show_time__gte=start, show_time__lt=end)
+                lookups &= days
+            else:
+                lookups &= Q(**{f"{key}__in": keys})
+        performances = Performance.objects.filter(lookups)
+        aggregates = {}
+        if label is not None:
+            aggregates["group_label"] = Max(label)
+        aggregated = performances.values(key).annotate(
+            **aggregates,
+            group_performances=Count("id"),
+            group_seats_total=Sum(seats_total),
+            group_seats_sold=Sum(F("tickets_sold") - unfolded_seats()),
+        ).order_by()
+        rows.extend(
+            Occupancy(
+                dimension=dimension,
+                key=str(group[key]),
+                label=str(group.get("group_label", group[key])),
+                performances=group["group_performances"],
+                seats_total=group["group_seats_total"],
+                seats_sold=group["group_seats_sold"],
+                refreshed_at=refreshed_at,
+            )
+            for group in aggregated
+        )
+    return rows
+
+
+def groups_filter(groups):
+    """Build a Q matching the Occupancy rows of the given groups."""
+    query = Q(pk__in=[])
+    for dimension, key in groups:
+        query |= Q(dimension=dimension, key=key)
+    return query
+
+
+def refresh_occupancy(groups=None):
+    """Upsert occupancy rows, for every group or only the given ones.
+
+    The stored rows are locked in key order, as folds lock them, and
+    only then aggregated, in the same transaction: a fold that shifted
+    them committed first, any other waits and shifts the fresh rows.
+    New rows are written in key order as well. A full refresh also
+    empties the sales log, except rows a fold holds, and so starts
+    over from the stored counters even where they were overwritten
+    without logging, e.g. by a bulk load. Groups left without
+    performances are deleted; returns the number of rows written.
+    """
+    with transaction.atomic():
+        locked = Occupancy.objects.select_for_update().order_by(
+            "dimension", "key"
+        )
+        if groups is not None:
+            locked = locked.filter(groups_filter(groups))
+        list(locked.values_list("id", flat=True))
+        if groups is None:
+            OccupancyDelta.objects.filter(
+                id__in=list(
+                    OccupancyDelta.objects.select_for_update(
+                        skip_locked=True
+                    ).values_list("id", flat=True)
+                )
+            ).delete()
+
+        rows = sorted(
+            occupancy_rows(groups), key=lambda row: (row.dimension, row.key)
+        )
+        current = {(row.dimension, row.key) for row in rows}
+        Occupancy.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=("dimension", "key"),
+            update_fields=OCCUPANCY_FIELDS,
+        )
+        if groups is None:
+            Occupancy.objects.exclude(groups_filter(current)).delete()
+        elif set(groups) - current:
+            Occupancy.objects.filter(
+                groups_filter(set(groups) - current)
+            ).delete()
+    return len(rows)
+
+
+def schedule_occupancy_refresh(groups):
+    """Recompute the given groups once the current transaction commits.
+
+    Used for catalog changes that move performances between groups or
+    resize them; the aggregation only covers the groups involved.
+    """
+    groups = set(groups)
+    if groups:
+        transaction.on_commit(lambda: refresh_occupancy(groups))
+
+
+def record_sold_deltas(counts):
+    """Log {performance_id: delta} to be folded in after the commit.
+
+    Runs in the transaction that moved the sold-seat counters, which
+    commits the log rows with them. It only inserts, so sales of
+    performances sharing a play, hall, genre or day do not queue on
+    each other's occupancy rows.
+    """
+    deltas = [
+        OccupancyDelta(performance_id=performance_id, delta=delta)
+        for performance_id, delta in counts.items()
+        if delta
+    ]
+    if deltas:
+        OccupancyDelta.objects.bulk_create(deltas)
+        transaction.on_commit(fold_recent_sales, robust=True)
+
+
+def fold_recent_sales():
+    """Fold the sales log unless a fold started in the last interval.
+
+    Sales committing in a burst are then folded in batches instead of
+    one by one.
+    """
+    if cache.add(OCCUPANCY_FOLD_KEY, True, OCCUPANCY_FOLD_INTERVAL):
+        fold_occupancy_deltas()
+
+
+def fold_occupancy_deltas():
+    """Move logged sales into the occupancy rows of their groups.
+
+    Log rows another fold has locked are skipped rather than waited
+    for, so folds running after concurrent sales batch the log between
+    them. Occupancy rows are locked in key order, as refreshes lock
+    them. Groups without a row yet, and performances deleted since,
+    drop their share: the refresh creating or removing those rows
+    counts it. Returns the number of log rows folded.
+    """
+    with transaction.atomic():
+        pending = list(
+            OccupancyDelta.objects.select_for_update(skip_locked=True)
+            .values_list("id", "performance_id", "delta")
+        )
+        if not pending:
+            return 0
+
+        counts = Counter()
+        for _, performance_id, delta in pending:
+            counts[performance_id] += delta
+        shift_sold_seats(counts)
+        OccupancyDelta.objects.filter(
+            id__in=[delta_id for delta_id, _, _ in pending]
+        ).delete()
+    return len(pending)
+
+
+def shift_sold_seats(counts):
+    """Shift seats_sold of each group by {performance_id: delta}."""
+    deltas = Counter()
+    for performance_id, groups in groups_of(
+        Performance.objects.filter(id__in=counts).values_list(*GROUP_COLUMNS)
+    ).items():
+        for group in groups:
+            deltas[group] += counts[performance_id]
+    deltas = {group: delta for group, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    locked = list(
+        Occupancy.objects.select_for_update()
+        .filter(groups_filter(deltas))
+        .order_by("dimension", "key")
+        .values_list("id", flat=True)
+    )
+    if locked:
+        Occupancy.objects.filter(id__in=locked).update(
+            seats_sold=F("seats_sold") + Case(
+                *(
+                    When(dimension=dimension, key=key, then=Value(delta))
+                    for (dimension, key), delta in deltas.items()
+                ),
+                default=Value(0),
+            ),
+            refreshed_at=timezone.now(),
+        )
+
+
+def relabel_occupancy(groups, label):
+    """Rename the given groups in place; what they count is unchanged."""
+    Occupancy.objects.filter(groups_filter(groups)).exclude(
+        label=label
+    ).update(label=label)
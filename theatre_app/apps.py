@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class TheatreAppConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "theatre_app"
+
+    def ready(self):
+        import theatre_app.signals  # noqa: F401
@@ -0,0 +1,160 @@
+from asgiref.sync import sync_to_async
+from django.http import Http404, HttpResponse
+from rest_framework.exceptions import MethodNotAllowed
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
+
+from theatre_app.fieldsets import is_field_requested
+from theatre_app.models import Performance, Play
+from theatre_app.pagination import OptInCursorPagination
+from theatre_app.permissions import IsAdminOrIfAuthenticatedReadOnly
+from theatre_app.renderers import FastJSONRenderer
+from theatre_app.seat_map import aget_cached_seat_map, get_seat_map
+from theatre_app.serializers import (PerformanceDetailSerializer,
+                                     PerformanceListSerializer,
+                                     PlayListSerializer)
+from theatre_app.views import (filter_performances, filter_plays,
+                               select_performance_detail_fields,
+                               select_performance_list_fields)
+
+
+class AsyncReadView(APIView):
+    """Read-only endpoint whose handler runs on the event loop.
+
+    DRF views are synchronous, so this keeps APIView's authentication,
+    permissions, throttling and error bodies but awaits an async ``get``
+    that fetches with the async ORM. Under ASGI a worker keeps serving
+    other connections while a slow client or query is pending. The
+    handler returns plain data, rendered to JSON here so that Django
+    does not hop to a thread to render the response.
+    """
+
+    http_method_names = ["get"]
+    permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    renderer_classes = (FastJSONRenderer,)
+    pagination_class = api_settings.DEFAULT_PAGINATION_CLASS
+    schema = None
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            # JWT authentication loads the user and throttling talks to
+            # the cache, both through synchronous APIs.
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            if request.method != "GET":
+                raise MethodNotAllowed(request.method)
+            response = Response(await self.get(request, *args, **kwargs))
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        response = self.finalize_response(request, response, *args, **kwargs)
+        response.render()
+        http_response = HttpResponse(
+            response.content, status=response.status_code
+        )
+        for header, value in response.items():
+            http_response[header] = value
+        return http_response
+
+    def get_serializer_context(self):
+        return {"request": self.request, "format": None, "view": self}
+
+    async def paginate(self, queryset):
+        """Return one page of ``queryset`` and the paginator used.
+
+        Limit/offset pages are counted and fetched with the async ORM;
+        keyset pages of OptInCursorPagination go through the synchronous
+        paginator in a thread.
+        """
+        paginator = self.pagination_class()
+        if isinstance(paginator, OptInCursorPagination) and (
+            paginator.wants_cursor(self.request)
+        ):
+            page = await sync_to_async(paginator.paginate_queryset)(
+                queryset, self.request, self
+            )
+            return page, paginator
+
+        paginator.request = self.request
+        paginator.limit = paginator.get_limit(self.request)
+        paginator.offset = paginator.get_offset(self.request)
+        paginator.count = await queryset.acount()
+        if paginator.count == 0 or paginator.offset > paginator.count:
+            return [], paginator
+        page = queryset[paginator.offset:paginator.offset + paginator.limit]
+        return [obj async for obj in page], paginator
+
+    async def list(self, queryset, serializer_class):
+        page, paginator = await self.paginate(queryset)
+        serializer = serializer_class(
+            page, many=True, context=self.get_serializer_context()
+        )
+        return paginator.get_paginated_response(serializer.data).data
+
+
+class AsyncPerformanceListView(AsyncReadView):
+    """Async twin of GET /api/performances/."""
+
+    pagination_class = OptInCursorPagination
+    cursor_ordering = ("show_time", "id")
+
+    async def get(self, request):
+        queryset = select_performance_list_fields(
+            request, filter_performances(request, Performance.objects.all())
+        )
+        return await self.list(queryset, PerformanceListSerializer)
+
+
+class AsyncPerformanceDetailView(AsyncReadView):
+    """Async twin of GET /api/performances/<pk>/."""
+
+    async def get(self, request, pk):
+        queryset = select_performance_detail_fields(
+            request, filter_performances(request, Performance.objects.all())
+        )
+        try:
+            performance = await queryset.aget(pk=pk)
+        except Performance.DoesNotExist:
+            raise Http404("No Performance matches the given query.")
+
+        return PerformanceDetailSerializer(
+            performance, context=self.get_serializer_context()
+        ).data
+
+
+class AsyncSeatMapView(AsyncReadView):
+    """Async twin of GET /api/performances/<pk>/seat-map/.
+
+    A cached seat map is served without touching the database; a miss
+    builds it with the same code as the sync endpoint.
+    """
+
+    async def get(self, request, pk):
+        seat_map = await aget_cached_seat_map(pk)
+        if seat_map is None:
+            try:
+                performance = await Performance.objects.select_related(
+                    "theatre_hall"
+                ).aget(pk=pk)
+            except Performance.DoesNotExist:
+                raise Http404("No Performance matches the given query.")
+            seat_map = await sync_to_async(get_seat_map)(performance)
+
+        return seat_map
+
+
+class AsyncPlayListView(AsyncReadView):
+    """Async twin of GET /api/plays/."""
+
+    async def get(self, request):
+        queryset = filter_plays(request, Play.objects.all()).with_cast(
+            actors=is_field_requested(request, "actors"),
+            genres=is_field_requested(request, "genres"),
+        )
+        return await self.list(queryset, PlayListSerializer)
@@ -0,0 +1,72 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from theatre_app.response_cache import get_version_state
+
+
+class ConditionalGetMixin:
+    """Answer list and retrieve with 304 when the client copy is current.
+
+    Validators are derived from the versions of ``validator_sources``
+    (models or named scopes bumped on every change) and never from the
+    serialized response, so a 304 costs no database work unless
+    ``get_validator_sources`` or ``get_validator_extra`` needs some.
+    """
+
+    validator_sources = ()
+
+    def get_validator_sources(self):
+        """Return the versioned sources of this response."""
+        return self.validator_sources
+
+    def get_validator_extra(self):
+        """Return state the response depends on that has no version."""
+        return ()
+
+    def get_validators(self, request):
+        versions, last_modified = get_version_state(
+            self.get_validator_sources()
+        )
+        digest = hashlib.md5(
+            repr((
+                self.basename,
+                self.action,
+                request.get_full_path(),
+                request.accepted_media_type,
+                versions,
+                self.get_validator_extra(),
+            )).encode(),
+            usedforsecurity=False,
+        ).hexdigest()
+        return quote_etag(digest), last_modified
+
+    def conditional_response(self, request, render):
+        etag, last_modified = self.get_validators(request)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = render()
+            if response.status_code != 200:
+                return response
+
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            request, lambda: super(ConditionalGetMixin, self).list(
+                request, *args, **kwargs
+            )
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            request, lambda: super(ConditionalGetMixin, self).retrieve(
+                request, *args, **kwargs
+            )
+        )
@@ -0,0 +1,34 @@
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class SeatsTaken(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "Some of the requested seats are already taken."
+    default_code = "seats_taken"
+
+    def __init__(self, seats, detail=None, code=None):
+        super().__init__(detail, code)
+        self.seats = list(seats)
+        self.detail = {
+            "detail": self.detail,
+            "taken_seats": [
+                {
+                    "performance": seat.performance_id,
+                    "row": seat.row,
+                    "seat_number": seat.seat_number,
+                }
+                for seat in self.seats
+            ],
+        }
+
+
+class NoAdjacentSeats(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "No block of adjacent free seats is large enough."
+    default_code = "no_adjacent_seats"
+
+    def __init__(self, seats, detail=None, code=None):
+        if detail is None:
+            detail = f"No {seats} adjacent free seats are left in one row."
+        super().__init__(detail, code)
@@ -0,0 +1,92 @@
+import csv
+
+from rest_framework import serializers
+from rest_framework.renderers import BaseRenderer
+
+from theatre_app.renderers import FastJSONRenderer
+
+EXPORT_CHUNK_SIZE = 2000
+
+# (output column, Ticket lookup) pairs, in output order.
+TICKET_EXPORT_COLUMNS = (
+    ("ticket", "id"),
+    ("performance", "performance_id"),
+    ("show_time", "performance__show_time"),
+    ("row", "row"),
+    ("seat", "seat_number"),
+    ("reservation", "reservation_id"),
+    ("user_email", "reservation__user__email"),
+)
+
+
+class _Echo:
+    """File-like object whose write() hands the written line back."""
+
+    def write(self, value):
+        return value
+
+
+class ExportRenderer(BaseRenderer):
+    """Selects an export format; rows are streamed, only errors rendered.
+
+    Error bodies are JSON whatever format was asked for, so the response
+    is relabelled as JSON instead of claiming to be the export format.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        response = (renderer_context or {}).get("response")
+        if response is not None:
+            response["Content-Type"] = FastJSONRenderer.media_type
+        return FastJSONRenderer().render(data)
+
+
+class CSVExportRenderer(ExportRenderer):
+    media_type = "text/csv"
+    format = "csv"
+    charset = "utf-8"
+
+
+class NDJSONExportRenderer(ExportRenderer):
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = None
+
+
+def iter_ticket_rows(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield one dict per ticket through a server-side cursor.
+
+    Only the exported columns are fetched, as tuples, ``chunk_size``
+    rows at a time, so memory stays flat at any result size. Show
+    times are formatted as the API formats them.
+    """
+    show_time_field = serializers.DateTimeField()
+    names = [name for name, _ in TICKET_EXPORT_COLUMNS]
+    rows = queryset.values_list(
+        *(lookup for _, lookup in TICKET_EXPORT_COLUMNS)
+    ).iterator(chunk_size=chunk_size)
+
+    for values in rows:
+        row = dict(zip(names, values))
+        row["show_time"] = show_time_field.to_representation(
+            row["show_time"]
+        )
+        yield row
+
+
+def iter_csv(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow([name for name, _ in TICKET_EXPORT_COLUMNS])
+    for row in rows:
+        yield writer.writerow(row.values())
+
+
+def iter_ndjson(rows):
+    renderer = FastJSONRenderer()
+    for row in rows:
+        yield renderer.render(row) + b"\n"
+
+
+EXPORT_STREAMS = {
+    CSVExportRenderer.format: iter_csv,
+    NDJSONExportRenderer.format: iter_ndjson,
+}
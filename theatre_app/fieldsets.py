@@ -0,0 +1,64 @@
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+
+def _split_names(value):
+    return {name.strip() for name in value.split(",") if name.strip()}
+
+
+def get_fieldset(request):
+    """Return the (fields, omit) names requested with ?fields= and ?omit=.
+
+    ``fields`` is None when every field is wanted. Only reads are
+    trimmed, so writes always see every field.
+    """
+    if request is None or request.method not in SAFE_METHODS:
+        return None, set()
+
+    fields = request.query_params.get("fields")
+    omit = request.query_params.get("omit", "")
+    return (
+        _split_names(fields) if fields is not None else None,
+        _split_names(omit),
+    )
+
+
+def is_field_requested(request, name):
+    """Tell whether a top-level response field survives ?fields=/?omit=.
+
+    Views use it to skip the joins, prefetches and annotations that
+    only feed omitted fields.
+    """
+    fields, omit = get_fieldset(request)
+    return name not in omit and (fields is None or name in fields)
+
+
+class SparseFieldsetMixin:
+    """Drop top-level fields left out by ?fields= or named in ?omit=.
+
+    Side-loaded serializers that share the request but not the shape
+    of the response opt out with ``"sparse_fieldsets": False`` in their
+    context.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self.context.get("sparse_fieldsets", True):
+            return fields
+
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        if parent is not None:
+            return fields
+
+        request = self.context.get("request")
+        return {
+            name: field
+            for name, field in fields.items()
+            if is_field_requested(request, name)
+        }
+
+
+class SparseModelSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    pass
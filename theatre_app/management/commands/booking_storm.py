@@ -0,0 +1,255 @@
+import logging
+import random
+import statistics
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from theatre_app.analytics import performance_groups, refresh_occupancy
+from theatre_app.models import (Performance, Play, Reservation, TheatreHall,
+                                Ticket)
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds a hall, a play and performances, then fires concurrent "
+        "simulated buyers at the reservation endpoint and reports "
+        "throughput, latency, conflict rate and queries per request"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--buyers", type=int, default=500)
+        parser.add_argument("--concurrency", type=int, default=16)
+        parser.add_argument("--performances", type=int, default=1)
+        parser.add_argument("--rows", type=int, default=20)
+        parser.add_argument("--seats-per-row", type=int, default=30)
+        parser.add_argument("--seats-per-buyer", type=int, default=2)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--mode",
+            choices=("seats", "best-available"),
+            default="seats",
+            help="Pick random exact seats or ask for the best available",
+        )
+        parser.add_argument(
+            "--prefill",
+            type=float,
+            default=0.0,
+            help="Share of seats sold at random before the storm, "
+            "e.g. 0.95 for a nearly sold-out show",
+        )
+        parser.add_argument(
+            "--host",
+            default="localhost",
+            help="Host header sent with requests, must be in ALLOWED_HOSTS",
+        )
+        parser.add_argument(
+            "--keep",
+            action="store_true",
+            help="Keep the seeded data instead of deleting it afterwards",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError(
+                "booking_storm must run against PostgreSQL, "
+                f"got {connection.vendor}"
+            )
+        if options["buyers"] < 2:
+            raise CommandError("--buyers must be at least 2")
+        if options["seats_per_buyer"] > options["seats_per_row"]:
+            raise CommandError("--seats-per-buyer exceeds --seats-per-row")
+        if not 0 <= options["prefill"] < 1:
+            raise CommandError("--prefill must be in [0, 1)")
+
+        run_id = uuid.uuid4().hex[:8]
+        hall, play, performances, buyers = self._seed(run_id, options)
+        rng = random.Random(options["seed"])
+        sold = self._prefill(rng, hall, performances, buyers, options)
+        self.stdout.write(
+            f"Seeded {len(performances)} performance(s) of "
+            f"{hall.total_seats} seats ({sold} sold beforehand) and "
+            f"{len(buyers)} buyers"
+        )
+
+        jobs = [
+            (buyer, self._random_payload(rng, hall, performances, options))
+            for buyer in buyers
+        ]
+        chunks = [
+            jobs[index::options["concurrency"]]
+            for index in range(options["concurrency"])
+        ]
+
+        # Every lost race is logged as a 409 warning otherwise.
+        request_logger = logging.getLogger("django.request")
+        previous_level = request_logger.level
+        request_logger.setLevel(logging.ERROR)
+        try:
+            started = time.perf_counter()
+            with ThreadPoolExecutor(options["concurrency"]) as executor:
+                results = [
+                    result
+                    for chunk_results in executor.map(
+                        lambda chunk: self._buy(chunk, options["host"]),
+                        chunks,
+                    )
+                    for result in chunk_results
+                ]
+            elapsed = time.perf_counter() - started
+
+            self._report(results, elapsed)
+        finally:
+            request_logger.setLevel(previous_level)
+            if not options["keep"]:
+                get_user_model().objects.filter(
+                    id__in=[buyer.id for buyer in buyers]
+                ).delete()
+                play.delete()
+                hall.delete()
+
+    @staticmethod
+    def _seed(run_id, options):
+        hall = TheatreHall.objects.create(
+            name=f"Booking storm {run_id}",
+            rows=options["rows"],
+            seats_per_row=options["seats_per_row"],
+        )
+        play = Play.objects.create(
+            title=f"Booking storm {run_id}",
+            description="Seeded by the booking_storm command.",
+        )
+        show_time = timezone.now() + timedelta(days=30)
+        performances = Performance.objects.bulk_create(
+            Performance(
+                play=play,
+                theatre_hall=hall,
+                show_time=show_time + timedelta(hours=index),
+            )
+            for index in range(options["performances"])
+        )
+        user_model = get_user_model()
+        buyers = user_model.objects.bulk_create(
+            user_model(
+                email=f"storm-{run_id}-{index}@example.com",
+                password="!",
+            )
+            for index in range(options["buyers"])
+        )
+        # Sales update these rows, as they would in production.
+        refresh_occupancy(performance_groups(
+            Performance.objects.filter(
+                id__in=[performance.id for performance in performances]
+            )
+        ))
+        return hall, play, performances, buyers
+
+    @staticmethod
+    def _prefill(rng, hall, performances, buyers, options):
+        """Sell a random share of every performance's seats up front."""
+        seats = [
+            (row, seat_number)
+            for row in range(1, hall.rows + 1)
+            for seat_number in range(1, hall.seats_per_row + 1)
+        ]
+        count = int(len(seats) * options["prefill"])
+        if not count:
+            return 0
+
+        reservation = Reservation.objects.create(user=buyers[0])
+        for performance in performances:
+            Ticket.objects.bulk_create(
+                (
+                    Ticket(
+                        reservation=reservation,
+                        performance=performance,
+                        row=row,
+                        seat_number=seat_number,
+                    )
+                    for row, seat_number in rng.sample(seats, count)
+                ),
+                batch_size=5000,
+            )
+        Performance.objects.filter(
+            id__in=[performance.id for performance in performances]
+        ).update(tickets_sold=count)
+        return count * len(performances)
+
+    @staticmethod
+    def _random_payload(rng, hall, performances, options):
+        performance = rng.choice(performances)
+        if options["mode"] == "best-available":
+            return {
+                "best_available": {
+                    "performance": performance.id,
+                    "seats": options["seats_per_buyer"],
+                }
+            }
+        row = rng.randint(1, hall.rows)
+        first_seat = rng.randint(
+            1, hall.seats_per_row - options["seats_per_buyer"] + 1
+        )
+        return {
+            "tickets": [
+                {
+                    "row": row,
+                    "seat_number": seat_number,
+                    "performance": performance.id,
+                }
+                for seat_number in range(
+                    first_seat, first_seat + options["seats_per_buyer"]
+                )
+            ]
+        }
+
+    @staticmethod
+    def _buy(jobs, host):
+        url = reverse("theatre:reservation-list")
+        client = APIClient(HTTP_HOST=host)
+        results = []
+        try:
+            for buyer, payload in jobs:
+                client.force_authenticate(buyer)
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    response = client.post(url, payload, format="json")
+                    latency = time.perf_counter() - started
+                results.append(
+                    (response.status_code, latency, len(queries))
+                )
+        finally:
+            connections.close_all()
+        return results
+
+    def _report(self, results, elapsed):
+        statuses = [status_code for status_code, _, _ in results]
+        latencies = sorted(latency * 1000 for _, latency, _ in results)
+        booked = statuses.count(201)
+        conflicts = statuses.count(409)
+        errors = len(statuses) - booked - conflicts
+        percentiles = statistics.quantiles(
+            latencies, n=100, method="inclusive"
+        )
+
+        self.stdout.write(
+            f"Requests:        {len(results)} in {elapsed:.2f}s "
+            f"({len(results) / elapsed:.1f} req/s)\n"
+            f"Reservations:    {booked} ({booked / elapsed:.1f}/s)\n"
+            f"Conflict rate:   {conflicts / len(results):.1%} "
+            f"({conflicts} x 409)\n"
+            f"Other responses: {errors}\n"
+            f"Latency ms:      p50 {percentiles[49]:.1f}  "
+            f"p95 {percentiles[94]:.1f}  p99 {percentiles[98]:.1f}  "
+            f"max {latencies[-1]:.1f}\n"
+            f"Queries/request: "
+            f"{statistics.mean(count for _, _, count in results):.1f}"
+        )
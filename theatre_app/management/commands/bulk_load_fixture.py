@@ -0,0 +1,293 @@
+import json
+import re
+import tempfile
+import time
+from graphlib import TopologicalSorter
+from io import StringIO
+
+from django.apps import apps
+from django.core import serializers
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from theatre_app.analytics import refresh_occupancy
+from theatre_app.models import Performance, Play, Ticket
+from theatre_app.response_cache import bump_version
+from theatre_app.seat_map import invalidate_seat_maps
+
+NON_WHITESPACE = re.compile(r"\S")
+
+
+def iter_json_array(stream, chunk_size=1 << 16):
+    """Yield the objects of a top-level JSON array read in chunks.
+
+    Only the object being decoded and one chunk are held in memory.
+    """
+    decoder = json.JSONDecoder()
+    buffer, index, eof = "", 0, False
+
+    def next_char():
+        nonlocal buffer, index, eof
+        while True:
+            match = NON_WHITESPACE.search(buffer, index)
+            if match:
+                index = match.start()
+                return buffer[index]
+            if eof:
+                return ""
+            buffer, index = stream.read(chunk_size), 0
+            eof = not buffer
+
+    if next_char() != "[":
+        raise ValueError("Fixture must be a JSON array")
+    index += 1
+    if next_char() == "]":
+        return
+
+    while True:
+        next_char()
+        while True:
+            try:
+                obj, index = decoder.raw_decode(buffer, index)
+                break
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                chunk = stream.read(chunk_size)
+                eof = not chunk
+                buffer, index = buffer[index:] + chunk, 0
+        yield obj
+
+        separator = next_char()
+        if separator == "]":
+            return
+        if separator != ",":
+            raise ValueError(f"Expected ',' or ']' at {separator!r}")
+        index += 1
+
+
+def dependency_order(models):
+    """Sort models so every FK and M2M target loads before its users."""
+    graph = {}
+    for model in models:
+        graph[model] = {
+            field.related_model
+            for field in model._meta.get_fields()
+            if field.is_relation
+            and not field.auto_created
+            and field.related_model in models
+            and field.related_model is not model
+        }
+    return list(TopologicalSorter(graph).static_order())
+
+
+class Command(BaseCommand):
+    help = (
+        "Loads large fixtures without reading them into memory: objects "
+        "are spooled per model, then COPYed into a staging table and "
+        "merged in dependency order, skipping save(). Rows whose pk "
+        "already exists are overwritten, as loaddata does. Sequences, "
+        "sold-seat counters and play search vectors are rebuilt "
+        "afterwards"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("fixtures", nargs="+")
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        connection = connections[options["database"]]
+        if connection.vendor != "postgresql":
+            raise CommandError(
+                "bulk_load_fixture must run against PostgreSQL, "
+                f"got {connection.vendor}"
+            )
+
+        started = time.perf_counter()
+        spools = {}
+        try:
+            for fixture in options["fixtures"]:
+                with open(fixture, encoding="utf-8") as stream:
+                    for obj in iter_json_array(stream):
+                        model = apps.get_model(obj["model"])
+                        if obj.get("pk") is None:
+                            raise CommandError(
+                                f"{obj['model']} object without a pk in "
+                                f"{fixture}, use loaddata instead"
+                            )
+                        if model not in spools:
+                            spools[model] = tempfile.TemporaryFile(
+                                "w+", encoding="utf-8"
+                            )
+                        spools[model].write(json.dumps(obj) + "\n")
+
+            with transaction.atomic(using=options["database"]):
+                total = self._load(connection, spools, options)
+        finally:
+            for spool in spools.values():
+                spool.close()
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Loaded {total} rows in {elapsed:.2f}s "
+                f"({total / elapsed:.0f} rows/s)"
+            )
+        )
+
+    def _load(self, connection, spools, options):
+        total = 0
+        ticket_performance_ids = set()
+        for model in dependency_order(set(spools)):
+            spool = spools[model]
+            spool.seek(0)
+            started = time.perf_counter()
+            rows = 0
+            batch = []
+            for line in spool:
+                batch.append(json.loads(line))
+                if len(batch) >= options["batch_size"]:
+                    rows += self._copy_batch(
+                        connection, model, batch, ticket_performance_ids
+                    )
+                    batch = []
+            rows += self._copy_batch(
+                connection, model, batch, ticket_performance_ids
+            )
+            elapsed = time.perf_counter() - started
+            total += rows
+            self.stdout.write(
+                f"{model._meta.label}: {rows} rows in {elapsed:.2f}s "
+                f"({rows / elapsed if elapsed else rows:.0f} rows/s)"
+            )
+            bump_version(model)
+
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(
+                no_style(), list(spools)
+            ):
+                cursor.execute(sql)
+
+        if Performance in spools or ticket_performance_ids:
+            call_command("rebuild_seat_counters", stdout=StringIO())
+            self.stdout.write("Rebuilt sold-seat counters")
+            invalidate_seat_maps(ticket_performance_ids)
+            refresh_occupancy()
+            self.stdout.write("Rebuilt occupancy analytics")
+        if Play in spools:
+            Play.objects.update_search_vector()
+        return total
+
+    @staticmethod
+    def _copy_batch(connection, model, batch, ticket_performance_ids):
+        if not batch:
+            return 0
+
+        fields = model._meta.concrete_fields
+        pk_index = fields.index(model._meta.pk)
+        m2m_rows = {}
+        records = []
+        for deserialized in serializers.deserialize(
+            "python", batch, using=connection.alias
+        ):
+            obj = deserialized.object
+            records.append([
+                field.get_db_prep_save(
+                    getattr(obj, field.attname), connection
+                )
+                for field in fields
+            ])
+            if model is Ticket:
+                ticket_performance_ids.add(obj.performance_id)
+            for name, related_ids in (deserialized.m2m_data or {}).items():
+                obj_ids, rows = m2m_rows.setdefault(
+                    model._meta.get_field(name), (set(), [])
+                )
+                obj_ids.add(obj.pk)
+                rows.extend(
+                    [obj.pk, related_id] for related_id in related_ids
+                )
+
+        if model is Ticket:
+            # Seats freed by tickets the fixture moves elsewhere.
+            ticket_performance_ids.update(
+                Ticket.objects.using(connection.alias)
+                .filter(pk__in=[record[pk_index] for record in records])
+                .values_list("performance_id", flat=True)
+            )
+        upsert_rows(
+            connection,
+            model._meta.db_table,
+            model._meta.pk.column,
+            [field.column for field in fields],
+            records,
+        )
+        for field, (obj_ids, rows) in m2m_rows.items():
+            # Like loaddata, the fixture replaces the object's relations.
+            replace_relations(
+                connection,
+                field.remote_field.through._meta.db_table,
+                [field.m2m_column_name(), field.m2m_reverse_name()],
+                obj_ids,
+                rows,
+            )
+        return len(records)
+
+
+def upsert_rows(connection, table, pk_column, columns, rows):
+    """COPY ``rows`` into a staging table, then merge them on the pk.
+
+    A plain COPY into ``table`` would abort the whole load on the first
+    pk that already exists, so fixtures could only go into empty tables.
+    """
+    quote_name = connection.ops.quote_name
+    staging_table = f"bulk_load_{table}"
+    staging = quote_name(staging_table)
+    column_list = ", ".join(quote_name(column) for column in columns)
+    updates = ", ".join(
+        f"{quote_name(column)} = EXCLUDED.{quote_name(column)}"
+        for column in columns
+        if column != pk_column
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE TEMPORARY TABLE IF NOT EXISTS {staging} "
+            f"ON COMMIT DROP AS SELECT {column_list} "
+            f"FROM {quote_name(table)} WITH NO DATA"
+        )
+        copy_rows(connection, staging_table, columns, rows)
+        cursor.execute(
+            f"INSERT INTO {quote_name(table)} ({column_list}) "
+            f"SELECT {column_list} FROM {staging} "
+            f"ON CONFLICT ({quote_name(pk_column)}) DO "
+            + (f"UPDATE SET {updates}" if updates else "NOTHING")
+        )
+        cursor.execute(f"TRUNCATE {staging}")
+
+
+def replace_relations(connection, table, columns, obj_ids, rows):
+    """Swap the M2M rows of ``obj_ids`` in ``table`` for ``rows``."""
+    quote_name = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {quote_name(table)} "
+            f"WHERE {quote_name(columns[0])} = ANY(%s)",
+            [list(obj_ids)],
+        )
+    copy_rows(connection, table, columns, rows)
+
+
+def copy_rows(connection, table, columns, rows):
+    quote_name = connection.ops.quote_name
+    sql = (
+        f"COPY {quote_name(table)} "
+        f"({', '.join(quote_name(column) for column in columns)}) "
+        f"FROM STDIN"
+    )
+    with connection.cursor() as cursor:
+        with cursor.cursor.copy(sql) as copy:
+            for row in rows:
+                copy.write_row(row)
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from theatre_app.analytics import refresh_occupancy
+
+
+class Command(BaseCommand):
+    help = "Rebuilds occupancy analytics from the stored sold-seat counters"
+
+    def handle(self, *args, **options):
+        rows = refresh_occupancy()
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt {rows} occupancy row(s)")
+        )
@@ -0,0 +1,69 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from theatre_app.models import Performance, Ticket, tickets_sold_changed
+from theatre_app.seat_map import invalidate_seat_maps
+
+
+class Command(BaseCommand):
+    help = "Rebuilds Performance.tickets_sold counters from the Ticket table"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report drifted counters, do not fix them",
+        )
+
+    def handle(self, *args, **options):
+        actual_sold = Coalesce(
+            Subquery(
+                Ticket.objects.filter(performance=OuterRef("pk"))
+                .values("performance")
+                .annotate(count=Count("id"))
+                .values("count")
+            ),
+            0,
+        )
+
+        with transaction.atomic():
+            drifted = (
+                Performance.objects.select_for_update()
+                .annotate(actual_sold=actual_sold)
+                .exclude(tickets_sold=F("actual_sold"))
+                .values_list("id", "tickets_sold", "actual_sold")
+            )
+            drifted = list(drifted)
+
+            for performance_id, stored, actual in drifted:
+                self.stdout.write(
+                    f"Performance {performance_id}: "
+                    f"stored {stored}, actual {actual}"
+                )
+
+            if options["check"]:
+                self.stdout.write(
+                    f"{len(drifted)} performance counter(s) out of sync"
+                )
+                return
+
+            counts = {
+                performance_id: actual - stored
+                for performance_id, stored, actual in drifted
+            }
+            updated = Performance.objects.filter(
+                id__in=counts
+            ).update(tickets_sold=actual_sold)
+            # Cached seat maps and availability validators still show
+            # the drifted counts.
+            invalidate_seat_maps(counts)
+            if counts:
+                tickets_sold_changed.send(
+                    sender=Performance, counts=counts
+                )
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt {updated} performance counter(s)")
+        )
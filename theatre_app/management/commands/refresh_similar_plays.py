@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from theatre_app.recommendations import (CO_PURCHASE_WEIGHT,
+                                         MAX_COLUMN_PLAYS,
+                                         SIMILAR_PLAYS_TOP_K,
+                                         refresh_similar_plays)
+
+
+class Command(BaseCommand):
+    help = "Recomputes the top similar plays stored for every play"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--top-k",
+            type=int,
+            default=SIMILAR_PLAYS_TOP_K,
+            help="Neighbours kept per play",
+        )
+        parser.add_argument(
+            "--co-purchase-weight",
+            type=float,
+            default=CO_PURCHASE_WEIGHT,
+            help="Score per reservation holding both plays, 0 to ignore",
+        )
+        parser.add_argument(
+            "--max-column-plays",
+            type=int,
+            default=MAX_COLUMN_PLAYS,
+            help="Actors, genres or reservations with more plays only "
+            "add to pairs that something sparser links",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        rows = refresh_similar_plays(
+            options["top_k"],
+            options["co_purchase_weight"],
+            options["max_column_plays"],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Stored {rows} similar play(s) in "
+                f"{time.perf_counter() - started:.2f}s"
+            )
+        )
@@ -0,0 +1,123 @@
+import timeit
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from theatre_app.models import (Actor, Genre, Performance, Play, Reservation,
+                                TheatreHall, Ticket, play_cast_prefetches)
+from theatre_app.renderers import FastJSONRenderer, orjson
+from theatre_app.serializers import (PerformanceListSerializer,
+                                     ReservationDetailSerializer)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares stdlib and fast JSON render times for reservation "
+        "detail and performance list payloads. Seeded rows are rolled "
+        "back afterwards"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tickets", type=int, default=100)
+        parser.add_argument("--performances", type=int, default=500)
+        parser.add_argument("--cast", type=int, default=10)
+        parser.add_argument("--repeat", type=int, default=200)
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            raise CommandError(
+                "orjson is not installed, both renderers use stdlib json"
+            )
+
+        with transaction.atomic():
+            payloads = self._build_payloads(options)
+            transaction.set_rollback(True)
+
+        for name, data in payloads:
+            expected = JSONRenderer().render(data)
+            if FastJSONRenderer().render(data) != expected:
+                raise CommandError(f"{name}: renderers disagree")
+
+            timings = {
+                renderer_class.__name__: min(
+                    timeit.repeat(
+                        lambda: renderer_class().render(data),
+                        number=options["repeat"],
+                        repeat=3,
+                    )
+                ) / options["repeat"] * 1000
+                for renderer_class in (JSONRenderer, FastJSONRenderer)
+            }
+            self.stdout.write(
+                f"{name} ({len(expected)} bytes): "
+                f"JSONRenderer {timings['JSONRenderer']:.3f} ms, "
+                f"FastJSONRenderer {timings['FastJSONRenderer']:.3f} ms, "
+                f"{timings['JSONRenderer'] / timings['FastJSONRenderer']:.1f}x"
+            )
+
+    @staticmethod
+    def _build_payloads(options):
+        hall = TheatreHall.objects.create(
+            name="Render benchmark",
+            rows=max(1, options["tickets"] // 20 + 1),
+            seats_per_row=20,
+        )
+        play = Play.objects.create(
+            title="Render benchmark",
+            description="Seeded by the render_benchmark command. " * 10,
+        )
+        play.actors.add(*Actor.objects.bulk_create(
+            Actor(first_name="Actor", last_name=str(index))
+            for index in range(options["cast"])
+        ))
+        play.genres.add(*Genre.objects.bulk_create(
+            Genre(name=f"Genre {index}") for index in range(options["cast"])
+        ))
+        show_time = timezone.now() + timedelta(days=30)
+        performances = Performance.objects.bulk_create(
+            Performance(
+                play=play,
+                theatre_hall=hall,
+                show_time=show_time + timedelta(hours=index),
+            )
+            for index in range(max(1, options["performances"]))
+        )
+        user = get_user_model().objects.create_user(
+            email="render-benchmark@example.com", password="password"
+        )
+        reservation = Reservation.objects.create(user=user)
+        Ticket.objects.bulk_create(
+            Ticket(
+                reservation=reservation,
+                performance=performances[0],
+                row=index // 20 + 1,
+                seat_number=index % 20 + 1,
+            )
+            for index in range(options["tickets"])
+        )
+
+        reservation = Reservation.objects.prefetch_related(
+            "tickets__performance__play__actors",
+            "tickets__performance__play__genres",
+            "tickets__performance__theatre_hall",
+        ).get(pk=reservation.pk)
+        performance_list = Performance.objects.filter(
+            id__in=[performance.id for performance in performances]
+        ).select_related("play", "theatre_hall").prefetch_related(
+            *play_cast_prefetches("play__")
+        ).with_availability()
+
+        return [
+            (
+                "ReservationDetailSerializer",
+                ReservationDetailSerializer(reservation).data,
+            ),
+            (
+                "PerformanceListSerializer",
+                PerformanceListSerializer(performance_list, many=True).data,
+            ),
+        ]
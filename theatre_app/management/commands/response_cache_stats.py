@@ -0,0 +1,45 @@
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand
+
+from theatre_app.response_cache import (CachedResponseMixin, get_stats,
+                                        reset_stats)
+from theatre_app.urls import default_router
+
+# Backends whose counters live in, and die with, a single process.
+PROCESS_LOCAL_BACKENDS = (LocMemCache, DummyCache)
+
+
+class Command(BaseCommand):
+    help = "Reports response cache hits and misses per cached endpoint"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Reset the counters after reporting them",
+        )
+
+    def handle(self, *args, **options):
+        if isinstance(caches["default"], PROCESS_LOCAL_BACKENDS):
+            self.stderr.write(self.style.WARNING(
+                "The default cache is not shared between processes, so "
+                "these are this command's own counters, not the server's. "
+                "Set REDIS_URL to count the lookups of every worker."
+            ))
+
+        for _, viewset, basename in default_router.registry:
+            if not issubclass(viewset, CachedResponseMixin):
+                continue
+
+            stats = get_stats(basename)
+            lookups = stats["hit"] + stats["miss"]
+            hit_rate = stats["hit"] / lookups if lookups else 0
+            self.stdout.write(
+                f"{basename}: {stats['hit']} hit(s), {stats['miss']} "
+                f"miss(es), hit rate {hit_rate:.1%}"
+            )
+
+            if options["reset"]:
+                reset_stats(basename)
@@ -0,0 +1,86 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from theatre_app.seat_allocator import find_best_block
+
+
+def scan_best_block(rows, seats_per_row, taken, size):
+    """Seat-by-seat reference search, the baseline for the bitmaps."""
+    best = None
+    for row in range(1, rows + 1):
+        taken_row = taken.get(row, 0)
+        for start in range(seats_per_row - size + 1):
+            if any(
+                taken_row >> seat & 1 for seat in range(start, start + size)
+            ):
+                continue
+            cost = (
+                (2 * row - rows - 1) ** 2
+                + (2 * start + size - seats_per_row) ** 2
+            )
+            if best is None or cost < best[0]:
+                best = cost, row, start
+    return best
+
+
+class Command(BaseCommand):
+    help = (
+        "Times the in-memory best-available seat search on seeded halls "
+        "at several occupancy levels, against a seat-by-seat scan"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100)
+        parser.add_argument("--seats-per-row", type=int, default=120)
+        parser.add_argument("--seats", type=int, default=4)
+        parser.add_argument(
+            "--occupancy",
+            type=float,
+            nargs="+",
+            default=[0.0, 0.5, 0.9, 0.99],
+        )
+        parser.add_argument("--repeat", type=int, default=50)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        rows, seats_per_row = options["rows"], options["seats_per_row"]
+        if not 1 <= options["seats"] <= seats_per_row:
+            raise CommandError("--seats must fit in one row")
+
+        rng = random.Random(options["seed"])
+        seats = [
+            (row, seat_number)
+            for row in range(1, rows + 1)
+            for seat_number in range(1, seats_per_row + 1)
+        ]
+        self.stdout.write(
+            f"{rows} rows x {seats_per_row} seats, "
+            f"blocks of {options['seats']}"
+        )
+        for occupancy in options["occupancy"]:
+            taken = {}
+            for row, seat_number in rng.sample(
+                seats, int(len(seats) * occupancy)
+            ):
+                taken[row] = taken.get(row, 0) | 1 << (seat_number - 1)
+
+            timings = {}
+            for name, search in (
+                ("bitmap", find_best_block), ("scan", scan_best_block)
+            ):
+                samples = []
+                for _ in range(options["repeat"]):
+                    started = time.perf_counter()
+                    search(rows, seats_per_row, taken, options["seats"])
+                    samples.append(time.perf_counter() - started)
+                timings[name] = statistics.median(samples) * 1000
+
+            self.stdout.write(
+                f"Occupancy {occupancy:>6.1%}: "
+                f"bitmap {timings['bitmap']:8.3f} ms  "
+                f"scan {timings['scan']:8.3f} ms  "
+                f"({timings['scan'] / timings['bitmap']:.0f}x)"
+            )
@@ -0,0 +1,272 @@
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework.reverse import reverse
+
+from theatre_app.models import Performance, Play, TheatreHall
+
+ENDPOINTS = (
+    "performance-list",
+    "performance-detail",
+    "performance-seat-map",
+    "play-list",
+)
+SERVER_START_TIMEOUT = 30
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds performances, then serves the sync endpoints from one "
+        "single-threaded WSGI worker and their async twins from one "
+        "uvicorn worker, and reports throughput and latency of each "
+        "while some clients send their requests slowly"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--endpoint", choices=ENDPOINTS, default="performance-list"
+        )
+        parser.add_argument("--requests", type=int, default=1000)
+        parser.add_argument("--clients", type=int, default=16)
+        parser.add_argument(
+            "--slow-clients",
+            type=int,
+            default=4,
+            help="Connections that keep sending requests slowly while "
+            "the measured clients run",
+        )
+        parser.add_argument(
+            "--client-delay",
+            type=float,
+            default=0.2,
+            help="Seconds a slow client pauses halfway through a request",
+        )
+        parser.add_argument("--performances", type=int, default=50)
+        parser.add_argument("--wsgi-port", type=int, default=8101)
+        parser.add_argument("--asgi-port", type=int, default=8102)
+        parser.add_argument(
+            "--host",
+            default="localhost",
+            help="Host header sent with requests, must be in ALLOWED_HOSTS",
+        )
+        parser.add_argument(
+            "--keep",
+            action="store_true",
+            help="Keep the seeded data instead of deleting it afterwards",
+        )
+
+    def handle(self, *args, **options):
+        if options["requests"] < options["clients"] or options["clients"] < 1:
+            raise CommandError("--requests must be at least --clients >= 1")
+        if options["slow_clients"] < 0 or options["client_delay"] < 0:
+            raise CommandError(
+                "--slow-clients and --client-delay must not be negative"
+            )
+
+        run_id = uuid.uuid4().hex[:8]
+        hall, play, performances = self._seed(run_id, options)
+        self.stdout.write(
+            f"Seeded {len(performances)} performance(s); "
+            f"{options['requests']} requests from {options['clients']} "
+            f"client(s) alongside {options['slow_clients']} slow client(s) "
+            f"pausing {options['client_delay']}s per request"
+        )
+
+        try:
+            for label, port, command, endpoint in (
+                (
+                    "WSGI, 1 sync worker",
+                    options["wsgi_port"],
+                    [
+                        sys.executable, "manage.py", "runserver",
+                        "--noreload", "--nothreading",
+                        f"127.0.0.1:{options['wsgi_port']}",
+                    ],
+                    options["endpoint"],
+                ),
+                (
+                    "ASGI, 1 uvicorn worker",
+                    options["asgi_port"],
+                    [
+                        sys.executable, "-m", "uvicorn",
+                        "theatre.asgi:application", "--no-access-log",
+                        "--host", "127.0.0.1",
+                        "--port", str(options["asgi_port"]),
+                    ],
+                    f"async-{options['endpoint']}",
+                ),
+            ):
+                paths = self._paths(endpoint, play, performances)
+                with self._server(command, port):
+                    results, elapsed = self._run(port, paths, options)
+                self._report(label, paths[0], results, elapsed)
+        finally:
+            if not options["keep"]:
+                play.delete()
+                hall.delete()
+
+    @staticmethod
+    def _seed(run_id, options):
+        hall = TheatreHall.objects.create(
+            name=f"Serve benchmark {run_id}", rows=20, seats_per_row=30
+        )
+        play = Play.objects.create(
+            title=f"Serve benchmark {run_id}",
+            description="Seeded by the serve_benchmark command.",
+        )
+        show_time = timezone.now() + timedelta(days=30)
+        performances = Performance.objects.bulk_create(
+            Performance(
+                play=play,
+                theatre_hall=hall,
+                show_time=show_time + timedelta(hours=index),
+            )
+            for index in range(options["performances"])
+        )
+        return hall, play, performances
+
+    @staticmethod
+    def _paths(endpoint, play, performances):
+        name = f"theatre:{endpoint}"
+        if endpoint.endswith("performance-list"):
+            return [f"{reverse(name)}?play={play.id}&limit=20"]
+        if endpoint.endswith("play-list"):
+            return [f"{reverse(name)}?title={play.title}"]
+        return [
+            reverse(name, args=[performance.id])
+            for performance in performances
+        ]
+
+    @contextmanager
+    def _server(self, command, port):
+        env = dict(
+            os.environ,
+            DJANGO_ANON_THROTTLE_RATE="1000000/s",
+            DJANGO_USER_THROTTLE_RATE="1000000/s",
+        )
+        # runserver logs every request to stderr, which would fill a pipe.
+        log = tempfile.TemporaryFile()
+        server = subprocess.Popen(
+            command,
+            cwd=settings.BASE_DIR,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=log,
+        )
+        deadline = time.monotonic() + SERVER_START_TIMEOUT
+        while True:
+            if server.poll() is not None:
+                log.seek(0)
+                raise CommandError(
+                    f"{' '.join(command[1:3])} exited:\n{log.read().decode()}"
+                )
+            try:
+                socket.create_connection(("127.0.0.1", port), 0.1).close()
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    server.kill()
+                    raise CommandError(f"Nothing listens on port {port}")
+                time.sleep(0.1)
+
+        try:
+            yield server
+        finally:
+            server.terminate()
+            try:
+                server.wait(5)
+            except subprocess.TimeoutExpired:
+                server.kill()
+                server.wait()
+            log.close()
+
+    def _run(self, port, paths, options):
+        host = options["host"]
+        for path in paths[:options["clients"]]:
+            status_code, _ = fetch(port, host, path)
+            if status_code != 200:
+                raise CommandError(f"GET {path} answered {status_code}")
+
+        done = threading.Event()
+
+        def slow_client(index):
+            while not done.is_set():
+                fetch(
+                    port, host, paths[index % len(paths)],
+                    options["client_delay"],
+                )
+                index += options["slow_clients"]
+
+        def client(index):
+            return [
+                fetch(port, host, paths[number % len(paths)])
+                for number in range(
+                    index, options["requests"], options["clients"]
+                )
+            ]
+
+        pool_size = options["clients"] + options["slow_clients"]
+        with ThreadPoolExecutor(pool_size) as executor:
+            for index in range(options["slow_clients"]):
+                executor.submit(slow_client, index)
+            started = time.perf_counter()
+            results = [
+                result
+                for client_results in executor.map(
+                    client, range(options["clients"])
+                )
+                for result in client_results
+            ]
+            elapsed = time.perf_counter() - started
+            done.set()
+        return results, elapsed
+
+    def _report(self, label, path, results, elapsed):
+        latencies = sorted(latency * 1000 for _, latency in results)
+        failures = sum(status_code != 200 for status_code, _ in results)
+        percentiles = statistics.quantiles(
+            latencies, n=100, method="inclusive"
+        )
+        self.stdout.write(
+            f"{label} ({path})\n"
+            f"  Throughput: {len(results) / elapsed:.1f} req/s, "
+            f"{failures} non-200\n"
+            f"  Latency ms: p50 {percentiles[49]:.1f}  "
+            f"p95 {percentiles[94]:.1f}  p99 {percentiles[98]:.1f}  "
+            f"max {latencies[-1]:.1f}"
+        )
+
+
+def fetch(port, host, path, delay=0):
+    """GET ``path`` over a fresh connection; returns (status, seconds).
+
+    With ``delay`` the request line and headers are sent in two halves
+    that far apart, like a client on a slow network.
+    """
+    request = (
+        f"GET {path} HTTP/1.1\r\nHost: {host}\r\n"
+        "Connection: close\r\n\r\n"
+    ).encode()
+    started = time.perf_counter()
+    with socket.create_connection(("127.0.0.1", port)) as sock:
+        if delay:
+            sock.sendall(request[:len(request) // 2])
+            time.sleep(delay)
+            sock.sendall(request[len(request) // 2:])
+        else:
+            sock.sendall(request)
+        response = b"".join(iter(lambda: sock.recv(65536), b""))
+    return int(response[9:12] or 0), time.perf_counter() - started
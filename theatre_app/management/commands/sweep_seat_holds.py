@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from theatre_app.models import SeatHold
+
+
+class Command(BaseCommand):
+    help = "Deletes expired seat holds in bulk"
+
+    def handle(self, *args, **options):
+        deleted, _ = SeatHold.objects.expired().delete()
+        self.stdout.write(
+            self.style.SUCCESS(f"Swept {deleted} expired seat hold(s)")
+        )
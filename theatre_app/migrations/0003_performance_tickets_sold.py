@@ -0,0 +1,38 @@
+# Generated by Django 5.2.8 on 2026-10-18 03:08
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_tickets_sold(apps, schema_editor):
+    Performance = apps.get_model("theatre_app", "Performance")
+    Ticket = apps.get_model("theatre_app", "Ticket")
+
+    Performance.objects.update(
+        tickets_sold=Coalesce(
+            Subquery(
+                Ticket.objects.filter(performance=OuterRef("pk"))
+                .values("performance")
+                .annotate(count=Count("id"))
+                .values("count")
+            ),
+            0,
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("theatre_app", "0002_alter_reservation_user"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="performance",
+            name="tickets_sold",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_tickets_sold, migrations.RunPython.noop),
+    ]
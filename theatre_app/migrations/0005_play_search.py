@@ -0,0 +1,70 @@
+# Generated by Django 5.2.8 on 2026-10-18 03:22
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.operations import TrigramExtension
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Concat
+
+
+def fill_search_vector(apps, schema_editor):
+    Play = apps.get_model("theatre_app", "Play")
+
+    actor_names = Play.actors.through.objects.filter(
+        play_id=OuterRef("pk")
+    ).values("play_id").annotate(
+        names=StringAgg(
+            Concat("actor__first_name", Value(" "), "actor__last_name"),
+            delimiter=" ",
+        )
+    ).values("names")
+    genre_names = Play.genres.through.objects.filter(
+        play_id=OuterRef("pk")
+    ).values("play_id").annotate(
+        names=StringAgg("genre__name", delimiter=" ")
+    ).values("names")
+
+    Play.objects.update(
+        search_vector=(
+            SearchVector("title", weight="A", config="english")
+            + SearchVector(Subquery(actor_names), weight="B", config="english")
+            + SearchVector(Subquery(genre_names), weight="B", config="english")
+            + SearchVector("description", weight="C", config="english")
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("theatre_app", "0004_seathold"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name="play",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="play",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="play_search_vector_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="play",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["title"],
+                name="play_title_trgm_idx",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ),
+        migrations.RunPython(fill_search_vector, migrations.RunPython.noop),
+    ]
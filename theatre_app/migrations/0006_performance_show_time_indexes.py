@@ -0,0 +1,52 @@
+# Generated by Django 5.2.8 on 2026-10-18 03:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("theatre_app", "0005_play_search"),
+    ]
+
+    # Composite indexes are built before the single-column foreign key
+    # indexes they replace are dropped.
+    operations = [
+        migrations.AddIndex(
+            model_name="performance",
+            index=models.Index(
+                fields=["play", "show_time"], name="performance_play_time_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="performance",
+            index=models.Index(
+                fields=["theatre_hall", "show_time"],
+                name="performance_hall_time_idx",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="performance",
+            name="show_time",
+            field=models.DateTimeField(db_index=True),
+        ),
+        migrations.AlterField(
+            model_name="performance",
+            name="play",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                to="theatre_app.play",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="performance",
+            name="theatre_hall",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                to="theatre_app.theatrehall",
+            ),
+        ),
+    ]
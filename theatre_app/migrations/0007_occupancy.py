@@ -0,0 +1,59 @@
+# Generated by Django 5.2.8 on 2026-10-18 03:58
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("theatre_app", "0006_performance_show_time_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Occupancy",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "dimension",
+                    models.CharField(
+                        choices=[
+                            ("performance", "Performance"),
+                            ("play", "Play"),
+                            ("theatre_hall", "Theatre Hall"),
+                            ("genre", "Genre"),
+                            ("day", "Day"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("key", models.CharField(max_length=32)),
+                ("label", models.CharField(max_length=200)),
+                ("performances", models.PositiveIntegerField()),
+                ("seats_total", models.PositiveIntegerField()),
+                ("seats_sold", models.PositiveIntegerField()),
+                (
+                    "refreshed_at",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "occupancy",
+                "ordering": ("dimension", "key"),
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("dimension", "key"), name="occupancy_dimension_key_uniq"
+                    )
+                ],
+            },
+        ),
+    ]
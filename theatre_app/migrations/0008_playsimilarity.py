@@ -0,0 +1,58 @@
+# Generated by Django 5.2.8 on 2026-10-18 04:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("theatre_app", "0007_occupancy"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PlaySimilarity",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("rank", models.PositiveSmallIntegerField()),
+                ("score", models.FloatField()),
+                ("shared_actors", models.PositiveIntegerField()),
+                ("shared_genres", models.PositiveIntegerField()),
+                ("co_purchases", models.PositiveIntegerField()),
+                (
+                    "play",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="similarities",
+                        to="theatre_app.play",
+                    ),
+                ),
+                (
+                    "similar_play",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="theatre_app.play",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "play similarities",
+                "ordering": ("play", "rank"),
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("play", "rank"), name="play_similarity_rank_uniq"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.8 on 2026-10-18 05:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("theatre_app", "0008_playsimilarity"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OccupancyDelta",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("delta", models.IntegerField()),
+                (
+                    "performance",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to="theatre_app.performance",
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -1,13 +1,37 @@
 import os
 import uuid
+from collections import namedtuple
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
+from django.db import connections, models, transaction
+from django.db.models import Count, F, OuterRef, Prefetch, Subquery
+from django.db.models.functions import Coalesce, Concat
+from django.dispatch import Signal
+from django.utils import timezone
 from django.utils.text import slugify
 from rest_framework.exceptions import ValidationError
 
+from theatre_app.response_cache import get_versions
+from theatre_app.seat_map import invalidate_seat_maps
+
 user_model = get_user_model()
 
+SEARCH_CONFIG = "english"
+
+# Sent with ``counts``, {performance_id: delta}, after sold-seat
+# counters moved.
+tickets_sold_changed = Signal()
+
+PLACEMENT_COLUMNS = ("play_id", "theatre_hall_id", "show_time")
+
+HallGeometry = namedtuple("HallGeometry", ("rows", "seats_per_row"))
+# {hall_id: (TheatreHall version, HallGeometry)} of this process.
+_hall_geometries = {}
+
 
 class TheatreHall(models.Model):
     name = models.CharField(max_length=100)
@@ -17,6 +41,34 @@ class TheatreHall(models.Model):
     def __str__(self):
         return self.name
 
+    @staticmethod
+    def get_version():
+        (version,) = get_versions([TheatreHall])
+        return version
+
+    @staticmethod
+    def get_geometry(hall_id, version=None):
+        """Return the hall's (rows, seats_per_row), cached in process.
+
+        Entries carry the TheatreHall version, which every hall save or
+        delete bumps, so no worker keeps validating seats against the
+        geometry of a hall that has since been edited. Callers checking
+        many seats in one request pass the ``version`` they read once
+        and skip the shared cache altogether.
+        """
+        if version is None:
+            version = TheatreHall.get_version()
+        cached = _hall_geometries.get(hall_id)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        geometry = HallGeometry._make(
+            TheatreHall.objects.filter(pk=hall_id)
+            .values_list("rows", "seats_per_row")
+            .get()
+        )
+        _hall_geometries[hall_id] = (version, geometry)
+        return geometry
+
     @property
     def total_seats(self):
         return self.rows * self.seats_per_row
@@ -41,19 +93,233 @@ class Actor(models.Model):
         return f"{self.first_name} {self.last_name}"
 
 
+def play_cast_prefetches(prefix="", actors=True, genres=True):
+    """Prefetch a play's actors and genres, loading only rendered columns.
+
+    ``prefix`` is the lookup path to the play, e.g. "play__" when
+    prefetching for performances.
+    """
+    prefetches = []
+    if actors:
+        prefetches.append(
+            Prefetch(
+                f"{prefix}actors",
+                queryset=Actor.objects.only("id", "first_name", "last_name"),
+            )
+        )
+    if genres:
+        prefetches.append(
+            Prefetch(
+                f"{prefix}genres",
+                queryset=Genre.objects.only("id", "name"),
+            )
+        )
+    return prefetches
+
+
+def held_seats_count(performance_ref):
+    """Count a performance's active seat holds in a correlated subquery."""
+    return Coalesce(
+        Subquery(
+            SeatHold.objects.active()
+            .filter(performance=OuterRef(performance_ref))
+            .values("performance")
+            .annotate(count=Count("id"))
+            .values("count")
+        ),
+        0,
+    )
+
+
+class PerformanceQuerySet(models.QuerySet):
+
+    def with_availability(self):
+        """Annotate active seat holds so available_seats needs no query."""
+        return self.annotate(held_seats=held_seats_count("pk"))
+
+    def with_next_hold_expiry(self):
+        """Annotate when the first active hold of each row runs out."""
+        return self.annotate(
+            next_hold_expiry=Subquery(
+                SeatHold.objects.active()
+                .filter(performance=OuterRef("pk"))
+                .order_by("expires_at")
+                .values("expires_at")[:1]
+            )
+        )
+
+
 class Performance(models.Model):
-    play = models.ForeignKey("Play", on_delete=models.CASCADE)
-    theatre_hall = models.ForeignKey(TheatreHall, on_delete=models.CASCADE)
-    show_time = models.DateTimeField()
+    play = models.ForeignKey("Play", on_delete=models.CASCADE, db_index=False)
+    theatre_hall = models.ForeignKey(
+        TheatreHall, on_delete=models.CASCADE, db_index=False
+    )
+    show_time = models.DateTimeField(db_index=True)
+    tickets_sold = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = PerformanceQuerySet.as_manager()
+
+    class Meta:
+        # The composite indexes also serve plain play and hall lookups.
+        indexes = [
+            models.Index(
+                fields=["play", "show_time"],
+                name="performance_play_time_idx",
+            ),
+            models.Index(
+                fields=["theatre_hall", "show_time"],
+                name="performance_hall_time_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.play} at {self.show_time} in {self.theatre_hall.name}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_placement = instance.placement()
+        return instance
+
+    def placement(self):
+        """Return (play_id, theatre_hall_id, show_time), None if deferred.
+
+        These decide which occupancy groups the performance counts in.
+        """
+        placement = tuple(
+            self.__dict__.get(column) for column in PLACEMENT_COLUMNS
+        )
+        return None if None in placement else placement
+
+    def save(self, *args, **kwargs):
+        if self.pk is not None:
+            invalidate_seat_maps([self.pk])
+        return super().save(*args, **kwargs)
+
     @property
     def available_seats(self):
-        total_seats = self.theatre_hall.total_seats
-        booked_seats = Ticket.objects.filter(performance=self).count()
-        return total_seats - booked_seats
+        held_seats = getattr(self, "held_seats", None)
+        if held_seats is None:
+            held_seats = self.seat_holds.active().count()
+        return self.theatre_hall.total_seats - self.tickets_sold - held_seats
+
+    @staticmethod
+    def lock_for_booking(performance_ids):
+        """Lock performance rows until the current transaction ends.
+
+        Ticket sales, seat holds and best-available allocation take this
+        lock before checking the other table and claiming seats in their
+        own, so a hold and a sale of the same seat cannot both succeed.
+        Rows are locked in id order so multi-show bookings cannot
+        deadlock.
+        """
+        list(
+            Performance.objects.select_for_update()
+            .filter(id__in=performance_ids)
+            .order_by("id")
+            .values_list("id", flat=True)
+        )
+
+    @staticmethod
+    def update_tickets_sold(counts):
+        """Shift stored sold-seat counters by {performance_id: delta}.
+
+        Must run inside the transaction that writes the tickets so the
+        counter never disagrees with the Ticket table once committed.
+        """
+        for performance_id, delta in counts.items():
+            if delta:
+                Performance.objects.filter(id=performance_id).update(
+                    tickets_sold=F("tickets_sold") + delta
+                )
+        invalidate_seat_maps(counts)
+        if counts:
+            tickets_sold_changed.send(sender=Performance, counts=counts)
+
+
+SEAT_COLUMNS = ("performance_id", "row", "seat_number")
+
+
+def seats_filter(seats):
+    """Build a Q matching any of the given (performance_id, row, seat)."""
+    query = models.Q(pk__in=[])
+    for performance_id, row, seat_number in seats:
+        query |= models.Q(
+            performance_id=performance_id, row=row, seat_number=seat_number
+        )
+    return query
+
+
+def insert_seats(queryset, objs, columns, on_conflict, on_conflict_params=()):
+    """Insert seat rows in one statement, reporting conflicting seats.
+
+    ``on_conflict`` is the action for ON CONFLICT (performance, row,
+    seat_number); rows it leaves untouched are not RETURNed. Inserted
+    objects get their ids and the objects whose seats were taken are
+    returned.
+    """
+    if not objs:
+        return []
+
+    connection = connections[queryset.db]
+    quote_name = connection.ops.quote_name
+    seat_columns = ", ".join(quote_name(column) for column in SEAT_COLUMNS)
+    row_placeholder = f"({', '.join(['%s'] * len(columns))})"
+    sql = (
+        f"INSERT INTO {quote_name(queryset.model._meta.db_table)} "
+        f"({', '.join(quote_name(column) for column in columns)}) "
+        f"VALUES {', '.join([row_placeholder] * len(objs))} "
+        f"ON CONFLICT ({seat_columns}) {on_conflict} "
+        f"RETURNING {quote_name('id')}, {seat_columns}"
+    )
+    params = [getattr(obj, column) for obj in objs for column in columns]
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [*params, *on_conflict_params])
+        inserted = {
+            (performance_id, row, seat_number): obj_id
+            for obj_id, performance_id, row, seat_number in cursor.fetchall()
+        }
+
+    taken = []
+    for obj in objs:
+        obj_id = inserted.get((obj.performance_id, obj.row, obj.seat_number))
+        if obj_id is None:
+            taken.append(obj)
+        else:
+            obj.id = obj_id
+            obj._state.adding = False
+            obj._state.db = queryset.db
+    return taken
+
+
+class TicketQuerySet(models.QuerySet):
+
+    def with_performance(self):
+        """Join each ticket's performance, play and hall in one query.
+
+        Active holds are annotated as ``performance_held_seats``;
+        ``Ticket.performance_with_availability`` hands them to the
+        performance so its available_seats needs no query.
+        """
+        return self.select_related(
+            "performance__play", "performance__theatre_hall"
+        ).annotate(performance_held_seats=held_seats_count("performance"))
+
+    def claim_seats(self, tickets):
+        """Insert unsaved tickets, skipping seats that are already sold.
+
+        Uses INSERT ... ON CONFLICT DO NOTHING RETURNING so concurrent
+        buyers cannot both pass a check and then collide on the unique
+        constraint. Returns the tickets whose seats were taken. Seat
+        ranges are not validated.
+        """
+        return insert_seats(
+            self,
+            tickets,
+            ("row", "seat_number", "performance_id", "reservation_id"),
+            "DO NOTHING",
+        )
 
 
 class Ticket(models.Model):
@@ -64,19 +330,68 @@ class Ticket(models.Model):
         "Reservation", on_delete=models.CASCADE, related_name="tickets"
     )
 
+    objects = TicketQuerySet.as_manager()
+
     class Meta:
         unique_together = ("performance", "row", "seat_number")
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_seat = instance.seat_key()
+        return instance
+
+    def seat_key(self):
+        """Return (performance_id, row, seat_number), None if deferred."""
+        seat = tuple(self.__dict__.get(column) for column in SEAT_COLUMNS)
+        return None if None in seat else seat
+
+    @property
+    def performance_with_availability(self):
+        performance = self.performance
+        held_seats = getattr(self, "performance_held_seats", None)
+        if held_seats is not None:
+            performance.held_seats = held_seats
+        return performance
+
     def clean(self):
         Ticket.validate_ticket(
             self.row,
             self.seat_number,
-            self.performance.theatre_hall,
+            TheatreHall.get_geometry(self.performance.theatre_hall_id),
         )
 
-    def save(self, *args, **kwargs):
-        self.full_clean()
-        return super().save(*args, **kwargs)
+    def save(self, *args, validate=True, **kwargs):
+        """Save the ticket and keep the sold-seat counters in step.
+
+        ``validate=False`` skips ``full_clean()`` and is only meant for
+        callers that already checked the seat range and uniqueness, such
+        as the ticket serializer.
+        """
+        if validate:
+            self.full_clean()
+        with transaction.atomic():
+            previous_seat = None
+            if not self._state.adding:
+                previous_seat = getattr(self, "_loaded_seat", None)
+                if previous_seat is None:
+                    previous_seat = (
+                        Ticket.objects.filter(pk=self.pk)
+                        .values_list(*SEAT_COLUMNS)
+                        .first()
+                    )
+            result = super().save(*args, **kwargs)
+            previous_performance_id = previous_seat and previous_seat[0]
+            if previous_performance_id != self.performance_id:
+                counts = {self.performance_id: 1}
+                if previous_performance_id is not None:
+                    counts[previous_performance_id] = -1
+                Performance.update_tickets_sold(counts)
+            elif previous_seat != self.seat_key():
+                # A move within the show keeps the count but not the map.
+                invalidate_seat_maps([self.performance_id])
+            self._loaded_seat = self.seat_key()
+        return result
 
     @staticmethod
     def validate_ticket(row, seat, theatre_hall):
@@ -107,17 +422,110 @@ def create_custom_path(instance, filename):
     )
 
 
+class PlayQuerySet(models.QuerySet):
+
+    def with_cast(self, actors=True, genres=True):
+        return self.prefetch_related(
+            *play_cast_prefetches(actors=actors, genres=genres)
+        )
+
+    def update_search_vector(self):
+        """Recompute the stored search vector of the selected plays.
+
+        Title weighs most, then actor and genre names, then the
+        description. Names are aggregated in correlated subqueries so
+        the whole refresh is a single UPDATE.
+        """
+        actor_names = Play.actors.through.objects.filter(
+            play_id=OuterRef("pk")
+        ).values("play_id").annotate(
+            names=StringAgg(
+                Concat(
+                    "actor__first_name",
+                    models.Value(" "),
+                    "actor__last_name",
+                ),
+                delimiter=" ",
+            )
+        ).values("names")
+        genre_names = Play.genres.through.objects.filter(
+            play_id=OuterRef("pk")
+        ).values("play_id").annotate(
+            names=StringAgg("genre__name", delimiter=" ")
+        ).values("names")
+
+        return self.update(
+            search_vector=(
+                SearchVector("title", weight="A", config=SEARCH_CONFIG)
+                + SearchVector(
+                    Subquery(actor_names), weight="B", config=SEARCH_CONFIG
+                )
+                + SearchVector(
+                    Subquery(genre_names), weight="B", config=SEARCH_CONFIG
+                )
+                + SearchVector(
+                    "description", weight="C", config=SEARCH_CONFIG
+                )
+            )
+        )
+
+
 class Play(models.Model):
     title = models.CharField(max_length=200)
     description = models.TextField()
     actors = models.ManyToManyField(Actor, related_name="plays")
     genres = models.ManyToManyField(Genre, related_name="plays")
     image = models.ImageField(null=True, upload_to=create_custom_path)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = PlayQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=["search_vector"], name="play_search_vector_idx"),
+            GinIndex(
+                fields=["title"],
+                name="play_title_trgm_idx",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ]
 
     def __str__(self):
         return self.title
 
 
+class PlaySimilarity(models.Model):
+    """One of the precomputed nearest neighbours of a play.
+
+    Rows are rebuilt by ``theatre_app.recommendations`` and read by
+    ``play`` in ``rank`` order through the unique index.
+    """
+
+    play = models.ForeignKey(
+        Play, on_delete=models.CASCADE, related_name="similarities"
+    )
+    similar_play = models.ForeignKey(
+        Play, on_delete=models.CASCADE, related_name="+"
+    )
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+    shared_actors = models.PositiveIntegerField()
+    shared_genres = models.PositiveIntegerField()
+    co_purchases = models.PositiveIntegerField()
+
+    class Meta:
+        ordering = ("play", "rank")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["play", "rank"], name="play_similarity_rank_uniq"
+            ),
+        ]
+        verbose_name_plural = "play similarities"
+
+    def __str__(self):
+        return f"{self.similar_play_id} is #{self.rank} like {self.play_id}"
+
+
 class Reservation(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     user = models.ForeignKey(
@@ -126,3 +534,118 @@ class Reservation(models.Model):
 
     def __str__(self):
         return f"Reservation {self.id} by {self.user} at {self.created_at}"
+
+
+class SeatHoldQuerySet(models.QuerySet):
+
+    def active(self):
+        return self.filter(expires_at__gt=timezone.now())
+
+    def expired(self):
+        return self.filter(expires_at__lte=timezone.now())
+
+    def claim_seats(self, holds):
+        """Insert unsaved holds, taking over expired or own holds.
+
+        A seat held by another user whose hold has not expired yet is
+        left alone; the holds for such seats are returned.
+        """
+        quote_name = connections[self.db].ops.quote_name
+        table = quote_name(self.model._meta.db_table)
+        user_id = quote_name("user_id")
+        expires_at = quote_name("expires_at")
+        return insert_seats(
+            self,
+            holds,
+            ("row", "seat_number", "performance_id", "user_id", "expires_at"),
+            f"DO UPDATE SET {user_id} = EXCLUDED.{user_id}, "
+            f"{expires_at} = EXCLUDED.{expires_at} "
+            f"WHERE {table}.{expires_at} <= %s "
+            f"OR {table}.{user_id} = EXCLUDED.{user_id}",
+            [timezone.now()],
+        )
+
+
+class SeatHold(models.Model):
+    row = models.IntegerField()
+    seat_number = models.IntegerField()
+    performance = models.ForeignKey(
+        Performance, on_delete=models.CASCADE, related_name="seat_holds"
+    )
+    user = models.ForeignKey(
+        user_model, on_delete=models.CASCADE, related_name="seat_holds"
+    )
+    expires_at = models.DateTimeField(db_index=True)
+
+    objects = SeatHoldQuerySet.as_manager()
+
+    class Meta:
+        unique_together = ("performance", "row", "seat_number")
+
+    @staticmethod
+    def next_expiry():
+        return timezone.now() + settings.SEAT_HOLD_TTL
+
+    def __str__(self):
+        return (f"Hold on seat {self.seat_number} in row {self.row} "
+                f"for {self.performance} until {self.expires_at}")
+
+
+class Occupancy(models.Model):
+    """Sold seats rolled up per performance, play, hall, genre or day.
+
+    Rows are derived from ``Performance.tickets_sold`` and hall sizes by
+    ``theatre_app.analytics`` and are never edited directly.
+    """
+
+    class Dimension(models.TextChoices):
+        PERFORMANCE = "performance"
+        PLAY = "play"
+        THEATRE_HALL = "theatre_hall"
+        GENRE = "genre"
+        DAY = "day"
+
+    dimension = models.CharField(max_length=20, choices=Dimension.choices)
+    key = models.CharField(max_length=32)
+    label = models.CharField(max_length=200)
+    performances = models.PositiveIntegerField()
+    seats_total = models.PositiveIntegerField()
+    seats_sold = models.PositiveIntegerField()
+    refreshed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ("dimension", "key")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["dimension", "key"],
+                name="occupancy_dimension_key_uniq",
+            ),
+        ]
+        verbose_name_plural = "occupancy"
+
+    def __str__(self):
+        return f"{self.dimension} {self.label}: {self.occupancy:.1%}"
+
+    @property
+    def occupancy(self):
+        if not self.seats_total:
+            return 0.0
+        return self.seats_sold / self.seats_total
+
+
+class OccupancyDelta(models.Model):
+    """Sold seats of a performance not folded into Occupancy yet.
+
+    Sales only append these rows, so they never wait on the occupancy
+    rows other sales share; ``theatre_app.analytics`` folds them in
+    once the sale commits. Rows of a deleted performance are dropped
+    by the next fold.
+    """
+
+    performance = models.ForeignKey(
+        Performance,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="+",
+    )
+    delta = models.IntegerField()
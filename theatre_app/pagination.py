@@ -0,0 +1,68 @@
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+
+
+class ViewOrderingCursorPagination(CursorPagination):
+    """Keyset pagination over the view's ``cursor_ordering``.
+
+    No COUNT(*) is run and every page is fetched with a range filter
+    on the leading ordering column, so deep pages cost the same as the
+    first one as long as that ordering is indexed.
+    """
+
+    page_size_query_param = "limit"
+    max_page_size = 100
+
+    def get_ordering(self, request, queryset, view):
+        return view.cursor_ordering
+
+
+class OptInCursorPagination(LimitOffsetPagination):
+    """Limit/offset pagination that clients can switch to keyset paging.
+
+    Sending ``?pagination=cursor`` returns the first keyset page; the
+    ``next``/``previous`` links carry a ``cursor`` parameter which keeps
+    the request in keyset mode.
+    """
+
+    mode_query_param = "pagination"
+    cursor_class = ViewOrderingCursorPagination
+
+    def __init__(self):
+        self.cursor_paginator = None
+
+    def wants_cursor(self, request):
+        return (
+            request.query_params.get(self.mode_query_param) == "cursor"
+            or self.cursor_class.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.wants_cursor(request):
+            self.cursor_paginator = self.cursor_class()
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view
+            )
+
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+
+        return super().get_paginated_response(data)
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            *super().get_schema_operation_parameters(view),
+            {
+                "name": self.mode_query_param,
+                "required": False,
+                "in": "query",
+                "description": (
+                    "Set to 'cursor' for keyset pagination without a "
+                    "total count; follow the next/previous links."
+                ),
+                "schema": {"type": "string", "enum": ["cursor"]},
+            },
+            *self.cursor_class().get_schema_operation_parameters(view)[:1],
+        ]
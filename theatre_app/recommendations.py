@@ -0,0 +1,133 @@
+import heapq
+from collections import Counter, defaultdict
+from itertools import combinations, groupby
+from operator import itemgetter
+
+from django.db import transaction
+from django.db.models import Count
+
+from theatre_app.models import Play, PlaySimilarity, Ticket
+
+SIMILAR_PLAYS_TOP_K = 10
+ACTOR_WEIGHT = 2.0
+GENRE_WEIGHT = 1.0
+CO_PURCHASE_WEIGHT = 0.5
+# Up to ~500k pairs per actor, genre or reservation.
+MAX_COLUMN_PLAYS = 1000
+
+
+def co_occurrences(cells, max_column_plays=MAX_COLUMN_PLAYS):
+    """Multiply a sparse play incidence matrix by its transpose.
+
+    ``cells`` are the (column, play_id) non-zero entries sorted by
+    column, e.g. (actor_id, play_id) rows of the through table. Returns
+    the upper triangle of A @ A.T without its diagonal as
+    {(play_id, other_play_id): count} with play_id < other_play_id, so
+    only plays that actually share a column cost anything.
+
+    A column of n plays yields n * (n - 1) / 2 pairs, so columns of
+    more than ``max_column_plays`` plays are not expanded. They come
+    back as {play_id: {column, ...}} beside the counts, for callers to
+    add to pairs that sparser columns turn up.
+    """
+    counts = Counter()
+    dense = defaultdict(set)
+    for column_id, column in groupby(cells, key=itemgetter(0)):
+        play_ids = sorted({play_id for _, play_id in column})
+        if len(play_ids) > max_column_plays:
+            for play_id in play_ids:
+                dense[play_id].add(column_id)
+        else:
+            counts.update(combinations(play_ids, 2))
+    return counts, dense
+
+
+def co_purchase_cells():
+    """Yield (reservation_id, play_id) for reservations of several plays."""
+    multi_play = Ticket.objects.values("reservation_id").annotate(
+        plays=Count("performance__play_id", distinct=True)
+    ).filter(plays__gt=1).values("reservation_id")
+    return Ticket.objects.filter(
+        reservation_id__in=multi_play
+    ).values_list(
+        "reservation_id", "performance__play_id"
+    ).distinct().order_by("reservation_id").iterator()
+
+
+def similar_plays(top_k=SIMILAR_PLAYS_TOP_K,
+                  co_purchase_weight=CO_PURCHASE_WEIGHT,
+                  max_column_plays=MAX_COLUMN_PLAYS):
+    """Rank the neighbours of every play and keep the ``top_k`` best.
+
+    Scores weigh shared actors, shared genres and, unless
+    ``co_purchase_weight`` is 0, reservations holding both plays. Ties
+    go to the lower play id. Columns denser than ``max_column_plays``
+    still count for pairs that share a sparser column, but do not make
+    plays neighbours on their own.
+    """
+    relations = [
+        co_occurrences(
+            Play.actors.through.objects.values_list("actor_id", "play_id")
+            .order_by("actor_id").iterator(),
+            max_column_plays,
+        ),
+        co_occurrences(
+            Play.genres.through.objects.values_list("genre_id", "play_id")
+            .order_by("genre_id").iterator(),
+            max_column_plays,
+        ),
+        (Counter(), {}),
+    ]
+    if co_purchase_weight:
+        relations[2] = co_occurrences(co_purchase_cells(), max_column_plays)
+
+    candidates = defaultdict(list)
+    for pair in set().union(*(counts.keys() for counts, _ in relations)):
+        play_id, other_play_id = pair
+        shared = tuple(
+            counts[pair] + len(
+                dense.get(play_id, set()) & dense.get(other_play_id, set())
+            )
+            for counts, dense in relations
+        )
+        score = (
+            ACTOR_WEIGHT * shared[0]
+            + GENRE_WEIGHT * shared[1]
+            + co_purchase_weight * shared[2]
+        )
+        if score <= 0:
+            continue
+        candidates[play_id].append((score, -other_play_id, shared))
+        candidates[other_play_id].append((score, -play_id, shared))
+
+    return [
+        PlaySimilarity(
+            play_id=play_id,
+            similar_play_id=-negated_id,
+            rank=rank,
+            score=score,
+            shared_actors=shared_actors,
+            shared_genres=shared_genres,
+            co_purchases=bought_together,
+        )
+        for play_id, neighbours in candidates.items()
+        for rank, (
+            score,
+            negated_id,
+            (shared_actors, shared_genres, bought_together),
+        ) in enumerate(heapq.nlargest(top_k, neighbours), start=1)
+    ]
+
+
+def refresh_similar_plays(top_k=SIMILAR_PLAYS_TOP_K,
+                          co_purchase_weight=CO_PURCHASE_WEIGHT,
+                          max_column_plays=MAX_COLUMN_PLAYS):
+    """Replace every stored neighbour list; returns the rows written.
+
+    Readers keep seeing the previous lists until the swap commits.
+    """
+    rows = similar_plays(top_k, co_purchase_weight, max_column_plays)
+    with transaction.atomic():
+        PlaySimilarity.objects.all().delete()
+        PlaySimilarity.objects.bulk_create(rows, batch_size=5000)
+    return len(rows)
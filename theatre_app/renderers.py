@@ -0,0 +1,100 @@
+import decimal
+import io
+import json
+
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised without orjson only
+    orjson = None
+
+ORJSON_OPTIONS = (
+    orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+    if orjson is not None
+    else 0
+)
+
+LINE_SEPARATORS = (
+    ("\u2028".encode(), b"\\u2028"),
+    ("\u2029".encode(), b"\\u2029"),
+)
+
+_encoder = JSONEncoder()
+
+
+def _default(obj):
+    """Encode what orjson leaves out the way DRF's JSONEncoder does.
+
+    Datetimes are passed through so they keep DRF's "Z" suffix. Decimals
+    become floats as in DRF; where orjson supports fragments they keep
+    the stdlib float spelling, so large exponents match as well.
+    """
+    value = _encoder.default(obj)
+    if isinstance(obj, decimal.Decimal) and hasattr(orjson, "Fragment"):
+        return orjson.Fragment(json.dumps(value))
+    return value
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer backed by orjson, byte-for-byte compatible.
+
+    Falls back to the stdlib renderer when orjson is not installed, for
+    output orjson cannot reproduce (indented, non-compact or ASCII only
+    JSON) and for data it refuses, such as integers beyond 64 bits.
+    The one difference: NaN and infinite floats render as null, where
+    the stdlib renderer raises ValueError under STRICT_JSON.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+
+        try:
+            ret = orjson.dumps(
+                data, default=_default, option=ORJSON_OPTIONS
+            )
+        except orjson.JSONEncodeError:
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        for separator, escaped in LINE_SEPARATORS:
+            if separator in ret:
+                ret = ret.replace(separator, escaped)
+        return ret
+
+
+class FastJSONParser(JSONParser):
+    """JSONParser backed by orjson for UTF-8 bodies.
+
+    Bodies orjson rejects are handed to the stdlib parser, which either
+    accepts them (e.g. integers beyond 64 bits) or raises the usual
+    ParseError.
+    """
+
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower().replace("-", "") != "utf8":
+            return super().parse(stream, media_type, parser_context)
+
+        body = stream.read()
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            return super().parse(
+                io.BytesIO(body), media_type, parser_context
+            )
@@ -0,0 +1,195 @@
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.response import Response
+
+RESPONSE_CACHE_TIMEOUT = 60 * 60
+VERSION_TIMEOUT = 60 * 60 * 24 * 7
+CACHE_OUTCOMES = ("hit", "miss")
+
+
+def version_scope(source):
+    """Name versioned data by model class or by an explicit string."""
+    if isinstance(source, str):
+        return source
+    return source._meta.label_lower
+
+
+def get_version_state(sources):
+    """Return the version of every source and their latest change time.
+
+    Versions read as 0 for sources that did not change since the cache
+    was emptied or since their keys expired. Their change time is
+    unknown then and is recorded as now, which can only make clients
+    download a response again.
+    """
+    scopes = [version_scope(source) for source in sources]
+    version_keys = [f"theatre:version:{scope}" for scope in scopes]
+    modified_keys = [f"theatre:modified:{scope}" for scope in scopes]
+    values = cache.get_many(version_keys + modified_keys)
+
+    versions = [values.get(key, 0) for key in version_keys]
+    last_modified = None
+    for key in modified_keys:
+        modified = values.get(key)
+        if modified is None:
+            modified = int(time.time())
+            if not cache.add(key, modified, VERSION_TIMEOUT):
+                modified = cache.get(key, modified)
+        last_modified = max(last_modified or 0, modified)
+    return versions, last_modified
+
+
+def get_versions(sources):
+    """Return the version of every source, without their change time."""
+    version_keys = [
+        f"theatre:version:{version_scope(source)}" for source in sources
+    ]
+    values = cache.get_many(version_keys)
+    return [values.get(key, 0) for key in version_keys]
+
+
+async def aget_versions(sources):
+    """Async twin of ``get_versions``."""
+    version_keys = [
+        f"theatre:version:{version_scope(source)}" for source in sources
+    ]
+    values = await cache.aget_many(version_keys)
+    return [values.get(key, 0) for key in version_keys]
+
+
+def bump_version(source):
+    """Invalidate every cached response and validator built from ``source``.
+
+    The version is bumped straight away and again on commit, so a
+    response rendered from the old rows by a concurrent request while
+    the transaction was still open is not served afterwards.
+
+    Version keys expire after ``VERSION_TIMEOUT`` so the per-performance
+    ones do not pile up. A recreated version starts from the current
+    time in milliseconds, above any value the expired key reached, so
+    it never matches responses cached under the old one.
+    """
+    scope = version_scope(source)
+    version_key = f"theatre:version:{scope}"
+
+    def bump():
+        cache.set(
+            f"theatre:modified:{scope}", int(time.time()), VERSION_TIMEOUT
+        )
+        initial = int(time.time() * 1000)
+        if cache.add(version_key, initial, VERSION_TIMEOUT):
+            return
+        try:
+            cache.incr(version_key)
+        except ValueError:
+            cache.set(version_key, initial, VERSION_TIMEOUT)
+
+    bump()
+    transaction.on_commit(bump)
+
+
+def stats_key(basename, outcome):
+    return f"theatre:response-cache:{basename}:{outcome}"
+
+
+def record_lookup(basename, outcome):
+    key = stats_key(basename, outcome)
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        pass
+
+
+def get_stats(basename):
+    keys = {
+        outcome: stats_key(basename, outcome) for outcome in CACHE_OUTCOMES
+    }
+    values = cache.get_many(keys.values())
+    return {outcome: values.get(key, 0) for outcome, key in keys.items()}
+
+
+def reset_stats(basename):
+    cache.delete_many(
+        [stats_key(basename, outcome) for outcome in CACHE_OUTCOMES]
+    )
+
+
+class CachedResponseMixin:
+    """Serve list and retrieve responses from a versioned cache.
+
+    Keys combine the action, the absolute URL with sorted query
+    parameters, the current version of every model in ``cache_models``
+    and ``get_cache_extra``; signal handlers bump a version whenever one
+    of its rows changes, so stale entries are never read again and
+    simply expire. Only ``cached_actions`` go through the cache; other
+    actions can opt in by rendering through ``cached_response``.
+    """
+
+    cache_models = ()
+    cache_timeout = RESPONSE_CACHE_TIMEOUT
+    cached_actions = ("list", "retrieve")
+
+    def get_cache_models(self):
+        """Return the versioned sources of this response."""
+        return self.cache_models
+
+    def get_cache_extra(self):
+        """Return state the response depends on that has no version."""
+        return ()
+
+    def get_response_cache_key(self, request):
+        query = sorted(
+            (name, sorted(values))
+            for name, values in request.query_params.lists()
+        )
+        versions = get_versions(self.get_cache_models())
+        digest = hashlib.md5(
+            repr((
+                request.build_absolute_uri(request.path),
+                query,
+                self.get_cache_extra(),
+            )).encode(),
+            usedforsecurity=False,
+        ).hexdigest()
+        return (
+            f"theatre:response:{self.basename}:{self.action}:{digest}:"
+            f"{'.'.join(map(str, versions))}"
+        )
+
+    def cached_response(self, request, render):
+        key = self.get_response_cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            record_lookup(self.basename, "hit")
+            return Response(data, headers={"X-Cache": "HIT"})
+
+        record_lookup(self.basename, "miss")
+        response = render()
+        if response.status_code == 200:
+            cache.set(key, response.data, self.cache_timeout)
+        response["X-Cache"] = "MISS"
+        return response
+
+    def list(self, request, *args, **kwargs):
+        def render():
+            return super(CachedResponseMixin, self).list(
+                request, *args, **kwargs
+            )
+
+        if "list" not in self.cached_actions:
+            return render()
+        return self.cached_response(request, render)
+
+    def retrieve(self, request, *args, **kwargs):
+        def render():
+            return super(CachedResponseMixin, self).retrieve(
+                request, *args, **kwargs
+            )
+
+        if "retrieve" not in self.cached_actions:
+            return render()
+        return self.cached_response(request, render)
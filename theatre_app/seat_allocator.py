@@ -0,0 +1,150 @@
+from django.db import transaction
+
+from theatre_app.exceptions import NoAdjacentSeats, SeatsTaken
+from theatre_app.models import (Performance, SeatHold, TheatreHall, Ticket,
+                                seats_filter)
+
+ALLOCATION_ATTEMPTS = 5
+
+
+def taken_seat_bitmaps(performance, user=None):
+    """Return {row: int} with bit seat_number - 1 set for taken seats.
+
+    Sold seats and seats actively held by anybody but ``user`` are read
+    in one UNION query.
+    """
+    holds = performance.seat_holds.active()
+    if user is not None:
+        holds = holds.exclude(user=user)
+    seats = performance.ticket_set.values_list("row", "seat_number").union(
+        holds.values_list("row", "seat_number"), all=True
+    )
+
+    bitmaps = {}
+    for row, seat_number in seats:
+        if seat_number >= 1:
+            bitmaps[row] = bitmaps.get(row, 0) | 1 << (seat_number - 1)
+    return bitmaps
+
+
+def find_best_block(rows, seats_per_row, taken, size):
+    """Find ``size`` adjacent free seats closest to the hall's centre.
+
+    ``taken`` is a {row: bitmap} as built by ``taken_seat_bitmaps``.
+    Blocks are compared by the squared distance between their centre
+    and the grid's, ties going to the row nearer the middle, then to the
+    front row and then to the left. Each row costs a few bitwise
+    operations: the free mask ANDed with itself shifted ``size - 1``
+    times marks the seats that start a free block, and only the start
+    nearest to the middle on either side can be best. Rows are visited
+    from the middle out, stopping once the row distance alone is as
+    large as the best block's.
+
+    Returns (row, first seat number) or None if no row has such a block.
+    """
+    if not 1 <= size <= seats_per_row:
+        return None
+
+    full = (1 << seats_per_row) - 1
+    middle_start = (seats_per_row - size) // 2
+    # Distances are doubled so that centres between two seats or rows
+    # stay integers.
+    by_distance = sorted(
+        range(1, rows + 1), key=lambda row: (abs(2 * row - rows - 1), row)
+    )
+
+    best = None
+    for row in by_distance:
+        row_cost = (2 * row - rows - 1) ** 2
+        if best is not None and row_cost >= best[0]:
+            break
+
+        free = full & ~taken.get(row, 0)
+        starts = free
+        for shift in range(1, size):
+            starts &= free >> shift
+        if not starts:
+            continue
+
+        candidates = []
+        before = starts & ((1 << middle_start + 1) - 1)
+        if before:
+            candidates.append(before.bit_length() - 1)
+        after = starts >> middle_start
+        if after:
+            lowest = (after & -after).bit_length() - 1
+            candidates.append(middle_start + lowest)
+
+        for start in candidates:
+            cost = row_cost + (2 * start + size - seats_per_row) ** 2
+            if best is None or cost < best[0]:
+                best = cost, row, start
+
+    if best is None:
+        return None
+    _, row, start = best
+    return row, start + 1
+
+
+def book_best_available(reservation, performance, size,
+                        attempts=ALLOCATION_ATTEMPTS, hall_version=None):
+    """Sell ``size`` adjacent seats of ``performance`` to ``reservation``.
+
+    Must run inside a transaction. The performance row is locked first
+    (see Performance.lock_for_booking), so buyers of one show, who would
+    all race for the same block, queue up front instead of colliding
+    and no seat hold can slip in between. The taken seats are then read
+    once; a block still lost, e.g. to a ticket saved outside the
+    booking paths, is marked taken in memory and the next best block is
+    tried, each try in its own savepoint. Returns the saved tickets,
+    raises NoAdjacentSeats when no block is left and SeatsTaken when
+    every attempt lost a race. ``hall_version`` is the TheatreHall
+    version the caller already read, if any.
+    """
+    Performance.lock_for_booking([performance.pk])
+    geometry = TheatreHall.get_geometry(
+        performance.theatre_hall_id, hall_version
+    )
+    taken = taken_seat_bitmaps(performance, reservation.user)
+
+    conflict = None
+    for _ in range(attempts):
+        block = find_best_block(
+            geometry.rows, geometry.seats_per_row, taken, size
+        )
+        if block is None:
+            raise NoAdjacentSeats(size)
+
+        row, first_seat = block
+        tickets = [
+            Ticket(
+                reservation=reservation,
+                performance=performance,
+                row=row,
+                seat_number=seat_number,
+            )
+            for seat_number in range(first_seat, first_seat + size)
+        ]
+        try:
+            with transaction.atomic():
+                held_by_others = SeatHold.objects.active().filter(
+                    seats_filter(
+                        (performance.id, row, ticket.seat_number)
+                        for ticket in tickets
+                    )
+                ).exclude(user=reservation.user)
+                if held_by_others:
+                    raise SeatsTaken(held_by_others)
+                taken_seats = Ticket.objects.claim_seats(tickets)
+                if taken_seats:
+                    raise SeatsTaken(taken_seats)
+        except SeatsTaken as exc:
+            conflict = exc
+            for seat in exc.seats:
+                taken[seat.row] = (
+                    taken.get(seat.row, 0) | 1 << (seat.seat_number - 1)
+                )
+            continue
+        return tickets
+
+    raise conflict
@@ -0,0 +1,116 @@
+import base64
+
+from django.core.cache import cache
+from django.db import models
+from django.utils import timezone
+
+from theatre_app.response_cache import (aget_versions, bump_version,
+                                        get_versions)
+
+SEAT_MAP_CACHE_TIMEOUT = 60 * 5
+
+
+def seat_availability_scope(performance_id):
+    """Name the version bumped whenever seats of a performance change."""
+    return f"seat-availability:{performance_id}"
+
+
+def seat_map_cache_key(performance_id, version):
+    """Key the map by the seat availability version it was built under.
+
+    A map built from rows read before a sale commits is stored under
+    the version bumped by that sale, which nobody reads afterwards.
+    """
+    return f"theatre:seat-map:{performance_id}:{version}"
+
+
+def pack_seats(rows, seats_per_row, taken):
+    """Pack (row, seat_number) pairs into a row-major bitset.
+
+    Seat (row, seat_number) maps to bit (row - 1) * seats_per_row +
+    (seat_number - 1), most significant bit first within each byte.
+    Pairs outside the grid are ignored.
+    """
+    bitmap = bytearray((rows * seats_per_row + 7) // 8)
+    for row, seat_number in taken:
+        if 1 <= row <= rows and 1 <= seat_number <= seats_per_row:
+            index = (row - 1) * seats_per_row + seat_number - 1
+            bitmap[index >> 3] |= 0x80 >> (index & 7)
+    return bytes(bitmap)
+
+
+def build_seat_map(performance):
+    """Return the seat map and the time it stops being accurate.
+
+    Sold and actively held seats are read in one UNION query; the map
+    goes stale when the earliest of the holds expires.
+    """
+    hall = performance.theatre_hall
+    no_expiry = models.Value(None, output_field=models.DateTimeField())
+    seats = list(
+        performance.ticket_set.values_list(
+            "row", "seat_number", no_expiry
+        ).union(
+            performance.seat_holds.active().values_list(
+                "row", "seat_number", "expires_at"
+            ),
+            all=True,
+        )
+    )
+    bitmap = pack_seats(
+        hall.rows,
+        hall.seats_per_row,
+        [(row, seat_number) for row, seat_number, _ in seats],
+    )
+    taken_seats = sum(byte.bit_count() for byte in bitmap)
+    valid_until = min(
+        (expires_at for *_, expires_at in seats if expires_at is not None),
+        default=None,
+    )
+
+    seat_map = {
+        "performance": performance.id,
+        "rows": hall.rows,
+        "seats_per_row": hall.seats_per_row,
+        "available_seats": hall.total_seats - taken_seats,
+        "bitmap": base64.b64encode(bitmap).decode("ascii"),
+    }
+    return seat_map, valid_until
+
+
+def get_cached_seat_map(performance_id):
+    (version,) = get_versions([seat_availability_scope(performance_id)])
+    return cache.get(seat_map_cache_key(performance_id, version))
+
+
+async def aget_cached_seat_map(performance_id):
+    (version,) = await aget_versions(
+        [seat_availability_scope(performance_id)]
+    )
+    return await cache.aget(seat_map_cache_key(performance_id, version))
+
+
+def get_seat_map(performance):
+    (version,) = get_versions([seat_availability_scope(performance.id)])
+    key = seat_map_cache_key(performance.id, version)
+    seat_map = cache.get(key)
+    if seat_map is None:
+        seat_map, valid_until = build_seat_map(performance)
+        timeout = SEAT_MAP_CACHE_TIMEOUT
+        if valid_until is not None:
+            seconds_left = (valid_until - timezone.now()).total_seconds()
+            timeout = max(0, min(timeout, int(seconds_left)))
+        if timeout:
+            cache.set(key, seat_map, timeout)
+    return seat_map
+
+
+def invalidate_seat_maps(performance_ids):
+    """Bump the seat availability version of every performance.
+
+    Cached seat maps and validators of responses showing availability
+    are keyed by it, so the old entries are never read again and
+    simply expire.
+    """
+    for performance_id in performance_ids:
+        bump_version(seat_availability_scope(performance_id))
@@ -1,12 +1,33 @@
+from collections import Counter
+
 from django.db import transaction
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 
-from theatre_app.models import (Actor, Genre, Performance, Play, Reservation,
-                                TheatreHall, Ticket)
+from theatre_app.exceptions import SeatsTaken
+from theatre_app.fieldsets import SparseModelSerializer
+from theatre_app.models import (Actor, Genre, Occupancy, Performance, Play,
+                                PlaySimilarity, Reservation, SeatHold,
+                                TheatreHall, Ticket, seats_filter)
+from theatre_app.seat_allocator import book_best_available
+from theatre_app.seat_map import invalidate_seat_maps
+
+
+def hall_geometry(serializer, hall_id):
+    """Return the hall's geometry, reading its version once per request.
+
+    The version is kept in the context, which nested and list
+    serializers share with their root.
+    """
+    context = serializer.context
+    if "theatre_hall_version" not in context:
+        context["theatre_hall_version"] = TheatreHall.get_version()
+    return TheatreHall.get_geometry(
+        hall_id, context["theatre_hall_version"]
+    )
 
 
-class TheatreHallSerializer(serializers.ModelSerializer):
+class TheatreHallSerializer(SparseModelSerializer):
     count_seats = serializers.IntegerField(
         source="total_seats",
         read_only=True
@@ -17,21 +38,21 @@ class TheatreHallSerializer(serializers.ModelSerializer):
         fields = "id", "name", "rows", "seats_per_row", "count_seats"
 
 
-class ActorSerializer(serializers.ModelSerializer):
+class ActorSerializer(SparseModelSerializer):
 
     class Meta:
         model = Actor
         fields = "id", "first_name", "last_name", "full_name"
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(SparseModelSerializer):
 
     class Meta:
         model = Genre
         fields = "id", "name"
 
 
-class PlaySerializer(serializers.ModelSerializer):
+class PlaySerializer(SparseModelSerializer):
 
     class Meta:
         model = Play
@@ -57,14 +78,26 @@ class PlayListSerializer(PlaySerializer):
         fields = "id", "title", "genres", "actors", "image"
 
 
-class PerformanceSerializer(serializers.ModelSerializer):
+class PlaySimilaritySerializer(SparseModelSerializer):
+    id = serializers.IntegerField(source="similar_play_id", read_only=True)
+    title = serializers.CharField(source="similar_play.title", read_only=True)
+    image = serializers.ImageField(source="similar_play.image", read_only=True)
+
+    class Meta:
+        model = PlaySimilarity
+        fields = ("id", "title", "image", "score",
+                  "shared_actors", "shared_genres", "co_purchases")
+        read_only_fields = fields
+
+
+class PerformanceSerializer(SparseModelSerializer):
 
     class Meta:
         model = Performance
         fields = "id", "play", "theatre_hall", "show_time"
 
 
-class PerformanceListSerializer(serializers.ModelSerializer):
+class PerformanceListSerializer(SparseModelSerializer):
     play_title = serializers.CharField(source="play.title", read_only=True)
     theatre_hall_name = serializers.CharField(
         source="theatre_hall.name", read_only=True
@@ -76,12 +109,37 @@ class PerformanceListSerializer(serializers.ModelSerializer):
                   "theatre_hall_name", "show_time", "available_seats")
 
 
+class PerformanceCalendarDaySerializer(serializers.Serializer):
+    date = serializers.DateField()
+    performances = PerformanceListSerializer(many=True)
+
+
+class PerformanceCalendarSerializer(serializers.Serializer):
+    date_from = serializers.DateField()
+    date_to = serializers.DateField()
+    days = PerformanceCalendarDaySerializer(many=True)
+
+
 class PerformanceDetailSerializer(PerformanceSerializer):
     play = PlayDetailSerializer(read_only=True, many=False)
     theatre_hall = TheatreHallSerializer(read_only=True, many=False)
 
 
-class TicketSerializer(serializers.ModelSerializer):
+class SeatMapSerializer(serializers.Serializer):
+    performance = serializers.IntegerField()
+    rows = serializers.IntegerField()
+    seats_per_row = serializers.IntegerField()
+    available_seats = serializers.IntegerField()
+    bitmap = serializers.CharField(
+        help_text=(
+            "Base64 bitset of taken seats, row-major, most significant "
+            "bit first: seat (row, seat_number) is bit "
+            "(row - 1) * seats_per_row + seat_number - 1."
+        )
+    )
+
+
+class TicketSerializer(SparseModelSerializer):
     class Meta:
         model = Ticket
         fields = "id", "row", "seat_number", "performance"
@@ -89,25 +147,53 @@ class TicketSerializer(serializers.ModelSerializer):
     def validate(self, attrs):
         data = super().validate(attrs)
 
-        performance = attrs.get("performance")
-        row = attrs.get("row")
-        seat = attrs.get("seat_number")
+        performance = attrs.get(
+            "performance", getattr(self.instance, "performance", None)
+        )
+        row = attrs.get("row", getattr(self.instance, "row", None))
+        seat = attrs.get(
+            "seat_number", getattr(self.instance, "seat_number", None)
+        )
 
-        Ticket.validate_ticket(row, seat, performance.theatre_hall)
-
-        if Ticket.objects.filter(
-            performance=performance, row=row, seat_number=seat
-        ).exists():
-            raise ValidationError(
-                "Ticket with this Performance, "
-                "Row and Seat number already exists."
-            )
+        Ticket.validate_ticket(
+            row, seat, hall_geometry(self, performance.theatre_hall_id)
+        )
 
         return data
 
+    def update(self, instance, validated_data):
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        seat = instance.seat_key()
+        with transaction.atomic():
+            # Serializes with sales and holds, which claim seats the
+            # same way, then checks the seat both ways under the lock.
+            Performance.lock_for_booking([instance.performance_id])
+            taken = Ticket.objects.filter(seats_filter([seat])).exclude(
+                pk=instance.pk
+            )
+            if taken.exists():
+                raise ValidationError(
+                    "Ticket with this Performance, "
+                    "Row and Seat number already exists."
+                )
+            user_id = instance.reservation.user_id
+            held_by_others = SeatHold.objects.active().filter(
+                seats_filter([seat])
+            ).exclude(user_id=user_id)
+            if held_by_others:
+                raise SeatsTaken(held_by_others)
+            instance.save(validate=False)
+            SeatHold.objects.filter(
+                seats_filter([seat]), user_id=user_id
+            ).delete()
+        return instance
+
 
 class TicketListSerializer(TicketSerializer):
-    performance = PerformanceListSerializer(read_only=True, many=False)
+    performance = PerformanceListSerializer(
+        source="performance_with_availability", read_only=True, many=False
+    )
 
     class Meta:
         model = Ticket
@@ -118,7 +204,7 @@ class TicketDetailSerializer(TicketSerializer):
     performance = PerformanceDetailSerializer(read_only=True, many=False)
 
 
-class ReservationListSerializer(serializers.ModelSerializer):
+class ReservationListSerializer(SparseModelSerializer):
     tickets = TicketListSerializer(many=True, read_only=True)
 
     class Meta:
@@ -126,33 +212,353 @@ class ReservationListSerializer(serializers.ModelSerializer):
         fields = ("id", "user", "tickets", "created_at")
 
 
-class ReservationSerializer(serializers.ModelSerializer):
-    tickets = TicketSerializer(many=True, write_only=True, allow_empty=False)
+class SeatSerializer(serializers.Serializer):
+    row = serializers.IntegerField()
+    seat_number = serializers.IntegerField()
+
+
+class ReservationTicketSerializer(SeatSerializer):
+    performance = serializers.IntegerField()
+
+
+class BookedSeatSerializer(SeatSerializer):
+    performance = serializers.IntegerField(source="performance_id")
+
+
+class BestAvailableSerializer(serializers.Serializer):
+    performance = serializers.PrimaryKeyRelatedField(
+        queryset=Performance.objects.all()
+    )
+    seats = serializers.IntegerField(min_value=1)
+
+    def validate(self, attrs):
+        geometry = hall_geometry(self, attrs["performance"].theatre_hall_id)
+        if attrs["seats"] > geometry.seats_per_row:
+            raise ValidationError({
+                "seats": f"Rows of this hall have {geometry.seats_per_row} "
+                f"seats, {attrs['seats']} cannot sit together."
+            })
+        return attrs
+
+
+class ReservationSerializer(SparseModelSerializer):
+    tickets = ReservationTicketSerializer(
+        many=True, write_only=True, allow_empty=False, required=False
+    )
+    holds = serializers.ListField(
+        child=serializers.IntegerField(),
+        write_only=True,
+        allow_empty=False,
+        required=False,
+        help_text="Ids of your active seat holds to turn into tickets.",
+    )
+    best_available = BestAvailableSerializer(
+        write_only=True,
+        required=False,
+        help_text=(
+            "Book this many adjacent seats of the performance, as close "
+            "to the centre of the hall as possible."
+        ),
+    )
+
+    seats = BookedSeatSerializer(
+        source="tickets", many=True, read_only=True
+    )
 
     class Meta:
         model = Reservation
-        fields = "id", "created_at", "tickets"
+        fields = (
+            "id", "created_at", "tickets", "holds", "best_available", "seats"
+        )
+
+    default_error_messages = {
+        "performance_does_not_exist": (
+            'Invalid pk "{pk_value}" - object does not exist.'
+        ),
+        "duplicate_seat": "This seat is requested more than once.",
+        "hold_does_not_exist": (
+            'Hold "{pk_value}" does not exist or has expired.'
+        ),
+        "tickets_or_holds": (
+            "Provide exactly one of tickets, holds or best_available."
+        ),
+    }
+
+    @staticmethod
+    def _seat_key(ticket_data):
+        return (
+            ticket_data["performance"].id,
+            ticket_data["row"],
+            ticket_data["seat_number"],
+        )
+
+    def validate_tickets(self, tickets_data):
+        """Resolve performances in one query and check seats in memory."""
+        performances = Performance.objects.select_related(
+            "theatre_hall"
+        ).in_bulk({ticket_data["performance"] for ticket_data in tickets_data})
+
+        errors = []
+        requested_seats = set()
+        for ticket_data in tickets_data:
+            performance_id = ticket_data["performance"]
+            performance = performances.get(performance_id)
+            if performance is None:
+                errors.append({
+                    "performance": [
+                        self.error_messages[
+                            "performance_does_not_exist"
+                        ].format(pk_value=performance_id)
+                    ]
+                })
+                continue
+
+            ticket_data["performance"] = performance
+            try:
+                Ticket.validate_ticket(
+                    ticket_data["row"],
+                    ticket_data["seat_number"],
+                    performance.theatre_hall,
+                )
+            except ValidationError as exc:
+                errors.append(exc.detail)
+                continue
+
+            seat_key = self._seat_key(ticket_data)
+            if seat_key in requested_seats:
+                errors.append({
+                    "non_field_errors": [self.error_messages["duplicate_seat"]]
+                })
+                continue
+            requested_seats.add(seat_key)
+            errors.append({})
+
+        if any(errors):
+            raise ValidationError(errors)
+
+        return tickets_data
+
+    def validate_holds(self, hold_ids):
+        holds = SeatHold.objects.active().filter(
+            user=self.context["request"].user
+        ).in_bulk(hold_ids)
+
+        missing = [
+            self.error_messages["hold_does_not_exist"].format(pk_value=hold_id)
+            for hold_id in hold_ids
+            if hold_id not in holds
+        ]
+        if missing:
+            raise ValidationError(missing)
+
+        return list(holds.values())
+
+    def validate(self, attrs):
+        modes = ("tickets", "holds", "best_available")
+        if sum(mode in attrs for mode in modes) != 1:
+            raise ValidationError(self.error_messages["tickets_or_holds"])
+        return attrs
 
     def create(self, validated_data):
-        tickets_data = validated_data.pop("tickets")
+        tickets_data = validated_data.pop("tickets", None)
+        holds = validated_data.pop("holds", None)
+        best_available = validated_data.pop("best_available", None)
         with transaction.atomic():
             reservation = Reservation.objects.create(**validated_data)
-            for ticket_data in tickets_data:
-                performance = Performance.objects.get(
-                    id=(
-                        ticket_data["performance"].id
-                        if isinstance(ticket_data["performance"], Performance)
-                        else ticket_data["performance"]
-                    )
+            if best_available is not None:
+                tickets = book_best_available(
+                    reservation,
+                    best_available["performance"],
+                    best_available["seats"],
+                    hall_version=self.context.get("theatre_hall_version"),
                 )
-                Ticket.objects.create(
-                    reservation=reservation,
-                    row=ticket_data["row"],
-                    seat_number=ticket_data["seat_number"],
-                    performance=performance,
+            elif holds is None:
+                tickets = [
+                    Ticket(reservation=reservation, **ticket_data)
+                    for ticket_data in tickets_data
+                ]
+                Performance.lock_for_booking(
+                    {ticket.performance_id for ticket in tickets}
+                )
+                held_by_others = SeatHold.objects.active().filter(
+                    seats_filter(self._seat_key(ticket_data)
+                                 for ticket_data in tickets_data)
+                ).exclude(user=reservation.user)
+                if held_by_others:
+                    raise SeatsTaken(held_by_others)
+            else:
+                Performance.lock_for_booking(
+                    {hold.performance_id for hold in holds}
                 )
+                # Holds may have expired or been released since they
+                # were validated; once locked, nobody can take them over.
+                holds = self.validate_holds([hold.id for hold in holds])
+                tickets = [
+                    Ticket(
+                        reservation=reservation,
+                        performance_id=hold.performance_id,
+                        row=hold.row,
+                        seat_number=hold.seat_number,
+                    )
+                    for hold in holds
+                ]
+
+            if best_available is None:
+                taken_seats = Ticket.objects.claim_seats(tickets)
+                if taken_seats:
+                    raise SeatsTaken(taken_seats)
+
+            SeatHold.objects.filter(
+                seats_filter(
+                    (ticket.performance_id, ticket.row, ticket.seat_number)
+                    for ticket in tickets
+                ),
+                user=reservation.user,
+            ).delete()
+            Performance.update_tickets_sold(
+                Counter(ticket.performance_id for ticket in tickets)
+            )
+            # The booked seats are rendered without reading them back.
+            reservation._prefetched_objects_cache = {"tickets": tickets}
             return reservation
 
 
+class SeatHoldSerializer(SparseModelSerializer):
+
+    class Meta:
+        model = SeatHold
+        fields = "id", "performance", "row", "seat_number", "expires_at"
+        read_only_fields = fields
+
+
+class SeatHoldCreateSerializer(serializers.Serializer):
+    performance = serializers.PrimaryKeyRelatedField(
+        queryset=Performance.objects.all()
+    )
+    seats = SeatSerializer(many=True, allow_empty=False)
+
+    default_error_messages = {
+        "duplicate_seat": "This seat is requested more than once.",
+    }
+
+    def validate(self, attrs):
+        theatre_hall = hall_geometry(
+            self, attrs["performance"].theatre_hall_id
+        )
+
+        errors = []
+        requested_seats = set()
+        for seat in attrs["seats"]:
+            seat_key = (seat["row"], seat["seat_number"])
+            try:
+                Ticket.validate_ticket(*seat_key, theatre_hall)
+            except ValidationError as exc:
+                errors.append(exc.detail)
+                continue
+            if seat_key in requested_seats:
+                errors.append({
+                    "non_field_errors": [self.error_messages["duplicate_seat"]]
+                })
+                continue
+            requested_seats.add(seat_key)
+            errors.append({})
+
+        if any(errors):
+            raise ValidationError({"seats": errors})
+
+        return attrs
+
+    def create(self, validated_data):
+        performance = validated_data["performance"]
+        seat_keys = [
+            (performance.id, seat["row"], seat["seat_number"])
+            for seat in validated_data["seats"]
+        ]
+        expires_at = SeatHold.next_expiry()
+
+        with transaction.atomic():
+            # Serializes with ticket sales, which check holds the same way.
+            Performance.lock_for_booking([performance.id])
+            sold = Ticket.objects.filter(seats_filter(seat_keys)).only(
+                "performance_id", "row", "seat_number"
+            )
+            if sold:
+                raise SeatsTaken(sold)
+
+            holds = [
+                SeatHold(
+                    performance=performance,
+                    row=row,
+                    seat_number=seat_number,
+                    user=validated_data["user"],
+                    expires_at=expires_at,
+                )
+                for _, row, seat_number in seat_keys
+            ]
+            taken_seats = SeatHold.objects.claim_seats(holds)
+            if taken_seats:
+                raise SeatsTaken(taken_seats)
+
+            invalidate_seat_maps([performance.id])
+            return holds
+
+
+class SeatHoldExtendSerializer(serializers.Serializer):
+    performance = serializers.IntegerField(
+        required=False,
+        help_text="Only extend holds for this performance.",
+    )
+
+
 class ReservationDetailSerializer(ReservationListSerializer):
     tickets = TicketDetailSerializer(many=True, read_only=True)
+
+
+class ReservationNormalizedSerializer(ReservationListSerializer):
+    tickets = TicketSerializer(many=True, read_only=True)
+
+
+def serialize_included(performances, context=None):
+    """Serialize performances with their plays and halls once each.
+
+    Performances reference plays and halls by id, as tickets reference
+    performances in ReservationNormalizedSerializer.
+    """
+    context = {**(context or {}), "sparse_fieldsets": False}
+    plays = {}
+    theatre_halls = {}
+    for performance in performances:
+        plays.setdefault(performance.play_id, performance.play)
+        theatre_halls.setdefault(
+            performance.theatre_hall_id, performance.theatre_hall
+        )
+
+    return {
+        "performances": PerformanceSerializer(
+            performances, many=True, context=context
+        ).data,
+        "plays": PlayDetailSerializer(
+            plays.values(), many=True, context=context
+        ).data,
+        "theatre_halls": TheatreHallSerializer(
+            theatre_halls.values(), many=True, context=context
+        ).data,
+    }
+
+
+class OccupancySerializer(SparseModelSerializer):
+    occupancy = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = Occupancy
+        fields = (
+            "dimension",
+            "key",
+            "label",
+            "performances",
+            "seats_total",
+            "seats_sold",
+            "occupancy",
+            "refreshed_at",
+        )
+        read_only_fields = fields
@@ -0,0 +1,230 @@
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete, pre_save)
+from django.dispatch import receiver
+
+from theatre_app.analytics import (deleted_performance_groups,
+                                   performance_groups, record_sold_deltas,
+                                   relabel_occupancy,
+                                   schedule_occupancy_refresh)
+from theatre_app.models import (Actor, Genre, Occupancy, Performance, Play,
+                                TheatreHall, Ticket, tickets_sold_changed)
+from theatre_app.response_cache import bump_version
+
+SEARCHABLE_PLAY_FIELDS = {"title", "description"}
+
+
+@receiver(post_save, sender=Play)
+def refresh_play_search_vector(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or SEARCHABLE_PLAY_FIELDS & set(update_fields):
+        Play.objects.filter(pk=instance.pk).update_search_vector()
+
+
+@receiver(m2m_changed, sender=Play.actors.through)
+@receiver(m2m_changed, sender=Play.genres.through)
+def refresh_cast_search_vector(sender, instance, action, reverse, pk_set,
+                               **kwargs):
+    """Refresh plays whose actors or genres were added or removed.
+
+    With ``reverse`` the change was made from the actor or genre side,
+    so the affected plays are in ``pk_set``, or for a clear, in the ids
+    stashed before it.
+    """
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            Play.objects.filter(pk=instance.pk).update_search_vector()
+        return
+
+    if action == "pre_clear":
+        instance._search_play_ids = list(
+            instance.plays.values_list("id", flat=True)
+        )
+    elif action in ("post_add", "post_remove"):
+        Play.objects.filter(pk__in=pk_set).update_search_vector()
+    elif action == "post_clear":
+        Play.objects.filter(
+            pk__in=instance._search_play_ids
+        ).update_search_vector()
+
+
+@receiver(post_save, sender=Actor)
+@receiver(post_save, sender=Genre)
+def refresh_named_search_vector(sender, instance, created, **kwargs):
+    if not created:
+        Play.objects.filter(
+            pk__in=instance.plays.values("id")
+        ).update_search_vector()
+
+
+@receiver(pre_delete, sender=Actor)
+@receiver(pre_delete, sender=Genre)
+def stash_named_play_ids(sender, instance, **kwargs):
+    instance._search_play_ids = list(
+        instance.plays.values_list("id", flat=True)
+    )
+
+
+@receiver(post_delete, sender=Actor)
+@receiver(post_delete, sender=Genre)
+def refresh_deleted_search_vector(sender, instance, **kwargs):
+    Play.objects.filter(
+        pk__in=instance._search_play_ids
+    ).update_search_vector()
+
+
+@receiver(post_save, sender=TheatreHall)
+@receiver(post_save, sender=Actor)
+@receiver(post_save, sender=Genre)
+@receiver(post_save, sender=Play)
+@receiver(post_save, sender=Performance)
+@receiver(post_delete, sender=TheatreHall)
+@receiver(post_delete, sender=Actor)
+@receiver(post_delete, sender=Genre)
+@receiver(post_delete, sender=Play)
+@receiver(post_delete, sender=Performance)
+def bump_catalog_version(sender, **kwargs):
+    bump_version(sender)
+
+
+@receiver(m2m_changed, sender=Play.actors.through)
+@receiver(m2m_changed, sender=Play.genres.through)
+def bump_cast_version(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        bump_version(Play)
+
+
+@receiver(post_delete, sender=Ticket)
+def release_sold_seat(sender, instance, **kwargs):
+    """Count a deleted ticket out of its performance.
+
+    Also fires for tickets deleted in bulk or by cascade from their
+    user, reservation or performance, which skip Model.delete().
+    """
+    Performance.update_tickets_sold({instance.performance_id: -1})
+
+
+@receiver(tickets_sold_changed, sender=Performance)
+def log_sold_occupancy(sender, counts, **kwargs):
+    record_sold_deltas(counts)
+
+
+@receiver(pre_save, sender=Performance)
+def stash_performance_groups(sender, instance, **kwargs):
+    """Remember the groups of a performance that is about to move.
+
+    Saves that keep play, hall and show time leave every group as it
+    is and cost nothing here.
+    """
+    previous = getattr(instance, "_loaded_placement", None)
+    if previous is None or previous != instance.placement():
+        instance._left_groups = set() if instance.pk is None else (
+            performance_groups(Performance.objects.filter(pk=instance.pk))
+        )
+
+
+@receiver(post_save, sender=Performance)
+def refresh_performance_occupancy(sender, instance, **kwargs):
+    left_groups = instance.__dict__.pop("_left_groups", None)
+    if left_groups is not None:
+        schedule_occupancy_refresh(
+            left_groups
+            | performance_groups(Performance.objects.filter(pk=instance.pk))
+        )
+    instance._loaded_placement = instance.placement()
+
+
+@receiver(post_delete, sender=Performance)
+def refresh_deleted_performance_occupancy(sender, instance, **kwargs):
+    schedule_occupancy_refresh(deleted_performance_groups(instance))
+
+
+@receiver(post_save, sender=Play)
+def relabel_play_occupancy(sender, instance, created, update_fields=None,
+                           **kwargs):
+    if created or (update_fields is not None and "title" not in update_fields):
+        return
+    relabel_occupancy(
+        {(Occupancy.Dimension.PLAY, str(instance.pk))} | {
+            (Occupancy.Dimension.PERFORMANCE, str(performance_id))
+            for performance_id in Performance.objects.filter(
+                play=instance
+            ).values_list("id", flat=True)
+        },
+        instance.title,
+    )
+
+
+@receiver(pre_delete, sender=Play)
+def stash_play_genre_ids(sender, instance, **kwargs):
+    instance._occupancy_genre_ids = list(
+        instance.genres.values_list("id", flat=True)
+    )
+
+
+@receiver(post_delete, sender=Play)
+def refresh_deleted_play_occupancy(sender, instance, **kwargs):
+    """Recompute the genres of a deleted play.
+
+    Its performances refresh their own groups as they are deleted, but
+    by then the play's genre links are already gone.
+    """
+    schedule_occupancy_refresh(
+        (Occupancy.Dimension.GENRE, str(genre_id))
+        for genre_id in instance._occupancy_genre_ids
+    )
+
+
+@receiver(post_save, sender=TheatreHall)
+def refresh_hall_occupancy(sender, instance, created, **kwargs):
+    """Relabel a renamed hall and recompute the groups of a resized one."""
+    if created:
+        return
+    group = (Occupancy.Dimension.THEATRE_HALL, str(instance.pk))
+    relabel_occupancy({group}, instance.name)
+    counted = Occupancy.objects.filter(
+        dimension=group[0], key=group[1]
+    ).values_list("performances", "seats_total").first()
+    if counted and counted[1] != counted[0] * instance.total_seats:
+        schedule_occupancy_refresh(
+            performance_groups(
+                Performance.objects.filter(theatre_hall=instance)
+            )
+        )
+
+
+@receiver(post_save, sender=Genre)
+def relabel_genre_occupancy(sender, instance, created, **kwargs):
+    if not created:
+        relabel_occupancy(
+            {(Occupancy.Dimension.GENRE, str(instance.pk))}, instance.name
+        )
+
+
+@receiver(post_delete, sender=Genre)
+def refresh_deleted_genre_occupancy(sender, instance, **kwargs):
+    schedule_occupancy_refresh({(Occupancy.Dimension.GENRE, str(instance.pk))})
+
+
+@receiver(m2m_changed, sender=Play.genres.through)
+def refresh_genre_occupancy(sender, instance, action, reverse, pk_set,
+                            **kwargs):
+    """Recompute genres that gained or lost a play.
+
+    From the genre side only that genre changes; a clear from the play
+    side affects the genre ids stashed before it.
+    """
+    if reverse:
+        genre_ids = {instance.pk}
+    elif action == "pre_clear":
+        instance._occupancy_genre_ids = list(
+            instance.genres.values_list("id", flat=True)
+        )
+        return
+    elif action == "post_clear":
+        genre_ids = instance._occupancy_genre_ids
+    else:
+        genre_ids = pk_set
+    if action in ("post_add", "post_remove", "post_clear"):
+        schedule_occupancy_refresh(
+            (Occupancy.Dimension.GENRE, str(genre_id))
+            for genre_id in genre_ids
+        )
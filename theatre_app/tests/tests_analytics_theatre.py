@@ -0,0 +1,445 @@
+from datetime import datetime, timezone
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from theatre_app.analytics import (fold_occupancy_deltas, performance_groups,
+                                   refresh_occupancy)
+from theatre_app.models import Occupancy, OccupancyDelta, Performance
+from theatre_app.tests.tests_performance_theatre import (sample_performance,
+                                                         sample_theatre_hall)
+from theatre_app.tests.tests_play_theatre import sample_genre, sample_play
+from theatre_app.tests.tests_tickets_theatre import (sample_reservation,
+                                                     sample_ticket)
+
+OCCUPANCY_URL = reverse("theatre:occupancy-list")
+
+
+def occupancy_of(dimension, key):
+    return Occupancy.objects.get(dimension=dimension, key=str(key))
+
+
+class OccupancyRefreshTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test_user@example.com",
+            password="password",
+        )
+        self.reservation = sample_reservation(user=self.user)
+        self.genre = sample_genre(name="Drama")
+        self.play = sample_play(title="Hamlet")
+        self.play.genres.add(self.genre)
+        self.theatre_hall = sample_theatre_hall(rows=10, seats_per_row=10)
+        self.performances = [
+            sample_performance(
+                play=self.play,
+                theatre_hall=self.theatre_hall,
+                show_time=datetime(2026, 1, day, 19, tzinfo=timezone.utc),
+            )
+            for day in (1, 2)
+        ]
+
+    def sell(self, performance, seats, fold=True):
+        for seat_number in range(1, seats + 1):
+            sample_ticket(
+                reservation=self.reservation,
+                performance=performance,
+                row=1,
+                seat_number=seat_number,
+            )
+        if fold:
+            fold_occupancy_deltas()
+
+    def test_full_refresh_rolls_up_every_dimension(self):
+        self.sell(self.performances[0], 3)
+        self.sell(self.performances[1], 1)
+
+        refresh_occupancy()
+
+        play = occupancy_of(Occupancy.Dimension.PLAY, self.play.id)
+        self.assertEqual(
+            (play.label, play.performances, play.seats_total,
+             play.seats_sold),
+            ("Hamlet", 2, 200, 4),
+        )
+        self.assertEqual(play.occupancy, 0.02)
+        self.assertEqual(
+            occupancy_of(Occupancy.Dimension.GENRE, self.genre.id).label,
+            "Drama",
+        )
+        self.assertEqual(
+            occupancy_of(
+                Occupancy.Dimension.THEATRE_HALL, self.theatre_hall.id
+            ).seats_sold,
+            4,
+        )
+        self.assertEqual(
+            occupancy_of(Occupancy.Dimension.DAY, "2026-01-01").seats_sold,
+            3,
+        )
+        self.assertEqual(
+            occupancy_of(
+                Occupancy.Dimension.PERFORMANCE, self.performances[1].id
+            ).seats_sold,
+            1,
+        )
+
+    def test_sales_shift_counts_in_place(self):
+        refresh_occupancy()
+
+        with CaptureQueriesContext(connection) as queries:
+            self.sell(self.performances[0], 2)
+
+        for dimension, key, sold in (
+            (Occupancy.Dimension.PLAY, self.play.id, 2),
+            (Occupancy.Dimension.GENRE, self.genre.id, 2),
+            (Occupancy.Dimension.DAY, "2026-01-01", 2),
+            (Occupancy.Dimension.DAY, "2026-01-02", 0),
+            (Occupancy.Dimension.PERFORMANCE, self.performances[0].id, 2),
+        ):
+            with self.subTest(dimension=dimension, key=key):
+                self.assertEqual(occupancy_of(dimension, key).seats_sold, sold)
+        self.assertFalse(
+            any("SUM(" in query["sql"] for query in queries),
+            "sales must not re-aggregate occupancy",
+        )
+
+    def test_sales_only_append_to_the_log(self):
+        refresh_occupancy()
+        cache.clear()
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            with CaptureQueriesContext(connection) as queries:
+                self.sell(self.performances[0], 2, fold=False)
+
+        self.assertFalse(
+            any(
+                '"theatre_app_occupancy"' in query["sql"] for query in queries
+            )
+        )
+        self.assertEqual(OccupancyDelta.objects.count(), 2)
+        self.assertEqual(
+            occupancy_of(Occupancy.Dimension.PLAY, self.play.id).seats_sold,
+            0,
+        )
+
+        for callback in callbacks:
+            callback()
+
+        self.assertEqual(
+            occupancy_of(Occupancy.Dimension.PLAY, self.play.id).seats_sold,
+            2,
+        )
+        self.assertFalse(OccupancyDelta.objects.exists())
+
+    def test_folds_after_a_burst_of_sales_are_batched(self):
+        refresh_occupancy()
+        cache.clear()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.sell(self.performances[0], 1, fold=False)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.sell(self.performances[1], 1, fold=False)
+
+        self.assertEqual(
+            occupancy_of(Occupancy.Dimension.PLAY, self.play.id).seats_sold,
+            1,
+        )
+        self.assertEqual(fold_occupancy_deltas(), 1)
+        self.assertEqual(
+            occupancy_of(Occupancy.Dimension.PLAY, self.play.id).seats_sold,
+            2,
+        )
+
+    def test_refresh_leaves_unfolded_sales_to_the_fold(self):
+        refresh_occupancy()
+        self.sell(self.performances[0], 2, fold=False)
+
+        refresh_occupancy(
+            performance_groups(
+                Performance.objects.filter(id=self.performances[0].id)
+            )
+        )
+        fold_occupancy_deltas()
+
+        self.assertEqual(
+            occupancy_of(Occupancy.Dimension.PLAY, self.play.id).seats_sold,
+            2,
+        )
+
+    def test_full_refresh_empties_the_log(self):
+        self.sell(self.performances[0], 2, fold=False)
+        # Overwritten without logging, as a bulk load does.
+        Performance.objects.filter(id=self.performances[0].id).update(
+            tickets_sold=5
+        )
+
+        refresh_occupancy()
+
+        self.assertFalse(OccupancyDelta.objects.exists())
+        self.assertEqual(
+            occupancy_of(Occupancy.Dimension.PLAY, self.play.id).seats_sold,
+            5,
+        )
+
+    def test_partial_refresh_only_touches_affected_groups(self):
+        other = sample_performance(
+            show_time=datetime(2026, 2, 1, 19, tzinfo=timezone.utc)
+        )
+        refresh_occupancy()
+        untouched = occupancy_of(Occupancy.Dimension.PLAY, other.play_id)
+        Performance.objects.filter(id=other.id).update(tickets_sold=5)
+        Performance.objects.filter(id=self.performances[0].id).update(
+            tickets_sold=7
+        )
+
+        refresh_occupancy(
+            performance_groups(
+                Performance.objects.filter(id=self.performances[0].id)
+            )
+        )
+
+        self.assertEqual(
+            occupancy_of(Occupancy.Dimension.PLAY, self.play.id).seats_sold,
+            7,
+        )
+        self.assertEqual(
+            occupancy_of(Occupancy.Dimension.PLAY, other.play_id),
+            untouched,
+        )
+        self.assertEqual(
+            occupancy_of(
+                Occupancy.Dimension.PLAY, other.play_id
+            ).refreshed_at,
+            untouched.refreshed_at,
+        )
+
+    def test_day_refresh_filters_on_show_time_range(self):
+        with CaptureQueriesContext(connection) as queries:
+            refresh_occupancy({(Occupancy.Dimension.DAY, "2026-01-02")})
+
+        day = occupancy_of(Occupancy.Dimension.DAY, "2026-01-02")
+        self.assertEqual(day.performances, 1)
+        (aggregation,) = [
+            query["sql"] for query in queries if " GROUP BY " in query["sql"]
+        ]
+        where = aggregation.rsplit(" GROUP BY ", 1)[0].rsplit(" WHERE ", 1)[1]
+        self.assertIn('"show_time" >=', where)
+        self.assertNotIn("::date", where)
+
+    def test_refresh_locks_rows_in_key_order_before_aggregating(self):
+        refresh_occupancy()
+
+        with CaptureQueriesContext(connection) as queries:
+            refresh_occupancy(
+                performance_groups(
+                    Performance.objects.filter(id=self.performances[0].id)
+                )
+            )
+
+        statements = [query["sql"] for query in queries]
+        lock = next(
+            index for index, sql in enumerate(statements)
+            if sql.endswith("FOR UPDATE")
+        )
+        aggregation = next(
+            index for index, sql in enumerate(statements) if "SUM(" in sql
+        )
+        self.assertLess(lock, aggregation)
+        self.assertIn(
+            'ORDER BY "theatre_app_occupancy"."dimension" ASC, '
+            '"theatre_app_occupancy"."key" ASC',
+            statements[lock],
+        )
+
+    def test_catalog_change_drops_stale_groups(self):
+        refresh_occupancy()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.performances[1].delete()
+
+        self.assertFalse(
+            Occupancy.objects.filter(
+                dimension=Occupancy.Dimension.DAY, key="2026-01-02"
+            ).exists()
+        )
+        self.assertEqual(
+            occupancy_of(
+                Occupancy.Dimension.PLAY, self.play.id
+            ).performances,
+            1,
+        )
+
+    def test_moved_performance_refreshes_old_and_new_groups(self):
+        self.sell(self.performances[1], 2)
+        refresh_occupancy()
+        performance = Performance.objects.get(id=self.performances[1].id)
+        performance.show_time = datetime(2026, 1, 5, 19, tzinfo=timezone.utc)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            performance.save()
+
+        self.assertFalse(
+            Occupancy.objects.filter(
+                dimension=Occupancy.Dimension.DAY, key="2026-01-02"
+            ).exists()
+        )
+        self.assertEqual(
+            occupancy_of(Occupancy.Dimension.DAY, "2026-01-05").seats_sold,
+            2,
+        )
+
+    def test_edits_that_keep_groups_skip_refresh(self):
+        refresh_occupancy()
+        performance = Performance.objects.get(id=self.performances[0].id)
+
+        with CaptureQueriesContext(connection) as queries:
+            with self.captureOnCommitCallbacks(execute=True):
+                performance.save()
+
+        self.assertFalse(
+            any("theatre_app_occupancy" in query["sql"] for query in queries)
+        )
+
+    def test_renames_relabel_in_place(self):
+        refresh_occupancy()
+
+        self.play.title = "Macbeth"
+        self.play.save()
+        self.genre.name = "Tragedy"
+        self.genre.save()
+
+        self.assertEqual(
+            occupancy_of(Occupancy.Dimension.PLAY, self.play.id).label,
+            "Macbeth",
+        )
+        self.assertEqual(
+            occupancy_of(
+                Occupancy.Dimension.PERFORMANCE, self.performances[0].id
+            ).label,
+            "Macbeth",
+        )
+        self.assertEqual(
+            occupancy_of(Occupancy.Dimension.GENRE, self.genre.id).label,
+            "Tragedy",
+        )
+
+    def test_genre_membership_and_hall_size_refresh_their_groups(self):
+        refresh_occupancy()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.play.genres.remove(self.genre)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.theatre_hall.rows = 5
+            self.theatre_hall.save()
+
+        self.assertFalse(
+            Occupancy.objects.filter(
+                dimension=Occupancy.Dimension.GENRE, key=str(self.genre.id)
+            ).exists()
+        )
+        self.assertEqual(
+            occupancy_of(Occupancy.Dimension.PLAY, self.play.id).seats_total,
+            100,
+        )
+
+    def test_rebuild_command(self):
+        out = StringIO()
+
+        call_command("rebuild_occupancy", stdout=out)
+
+        # Two performances, one play, hall and genre, two days.
+        self.assertIn("Rebuilt 7 occupancy row(s)", out.getvalue())
+
+
+class OccupancyApiTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = get_user_model().objects.create_superuser(
+            email="admin@example.com",
+            password="password",
+        )
+        self.client.force_authenticate(self.admin)
+        for day, sold in ((1, 4), (2, 9), (3, 1)):
+            performance = sample_performance(
+                show_time=datetime(2026, 1, day, 19, tzinfo=timezone.utc)
+            )
+            Performance.objects.filter(id=performance.id).update(
+                tickets_sold=sold
+            )
+        refresh_occupancy()
+
+    def test_admin_only(self):
+        user = get_user_model().objects.create_user(
+            email="test_user@example.com",
+            password="password",
+        )
+        self.client.force_authenticate(user)
+
+        response = self.client.get(OCCUPANCY_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_unfolded_sales_folded_before_reading(self):
+        performance = Performance.objects.order_by("id").first()
+        OccupancyDelta.objects.create(performance=performance, delta=2)
+
+        response = self.client.get(
+            OCCUPANCY_URL,
+            {"dimension": "performance", "ordering": "-seats_sold"},
+        )
+
+        self.assertEqual(
+            [row["seats_sold"] for row in response.data["results"]],
+            [9, 6, 1],
+        )
+        self.assertFalse(OccupancyDelta.objects.exists())
+
+    def test_filter_by_dimension(self):
+        response = self.client.get(OCCUPANCY_URL, {"dimension": "play"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 3)
+        self.assertEqual(
+            {row["dimension"] for row in response.data["results"]}, {"play"}
+        )
+
+    def test_filter_days(self):
+        response = self.client.get(
+            OCCUPANCY_URL, {"date_from": "2026-01-02", "date_to": "2026-01-03"}
+        )
+
+        self.assertEqual(
+            [row["key"] for row in response.data["results"]],
+            ["2026-01-02", "2026-01-03"],
+        )
+
+    def test_order_by_occupancy(self):
+        response = self.client.get(
+            OCCUPANCY_URL, {"dimension": "day", "ordering": "-occupancy"}
+        )
+
+        self.assertEqual(
+            [row["seats_sold"] for row in response.data["results"]],
+            [9, 4, 1],
+        )
+        self.assertEqual(response.data["results"][0]["occupancy"], 9 / 160)
+
+    def test_invalid_parameters(self):
+        for params in ({"dimension": "actor"}, {"ordering": "label"}):
+            with self.subTest(params=params):
+                response = self.client.get(OCCUPANCY_URL, params)
+
+                self.assertEqual(
+                    response.status_code, status.HTTP_400_BAD_REQUEST
+                )
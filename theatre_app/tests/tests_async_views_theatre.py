@@ -0,0 +1,166 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from theatre_app.tests.tests_performance_theatre import sample_performance
+from theatre_app.tests.tests_play_theatre import (sample_actor, sample_genre,
+                                                  sample_play)
+from theatre_app.tests.tests_tickets_theatre import (sample_reservation,
+                                                     sample_ticket)
+
+ASYNC_PERFORMANCE_URL = reverse("theatre:async-performance-list")
+ASYNC_PLAY_URL = reverse("theatre:async-play-list")
+
+
+def get_async_performance_detail_url(performance_id):
+    return reverse("theatre:async-performance-detail", args=[performance_id])
+
+
+def get_async_seat_map_url(performance_id):
+    return reverse("theatre:async-performance-seat-map", args=[performance_id])
+
+
+class AsyncReadApiTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test_user@example.com",
+            password="password",
+        )
+        self.client.force_authenticate(self.user)
+
+        play = sample_play(title="Hamlet")
+        play.actors.add(sample_actor())
+        play.genres.add(sample_genre(name="Drama"))
+        self.performances = [
+            sample_performance(play=play) for _ in range(3)
+        ]
+        sample_ticket(
+            reservation=sample_reservation(user=self.user),
+            performance=self.performances[0],
+        )
+
+    def assertSameAsSync(self, async_url, sync_url, params=None):
+        with CaptureQueriesContext(connection) as sync_queries:
+            expected = self.client.get(sync_url, params)
+        with CaptureQueriesContext(connection) as async_queries:
+            response = self.client.get(async_url, params)
+
+        self.assertEqual(response.status_code, expected.status_code)
+        self.assertEqual(response["Content-Type"], "application/json")
+        # Pagination links point back at the endpoint that served them.
+        self.assertEqual(
+            json.loads(response.content.replace(b"/api/async/", b"/api/")),
+            expected.json(),
+        )
+        self.assertLessEqual(len(async_queries), len(sync_queries))
+        return response
+
+    def test_performance_list(self):
+        for params in (
+            None,
+            {"limit": 2, "offset": 1},
+            {"fields": "id,play_title,available_seats"},
+            {"pagination": "cursor", "limit": 2},
+            {"play": self.performances[0].play_id, "date": "2025-12-31"},
+        ):
+            with self.subTest(params=params):
+                self.assertSameAsSync(
+                    ASYNC_PERFORMANCE_URL,
+                    reverse("theatre:performance-list"),
+                    params,
+                )
+
+    def test_performance_detail(self):
+        performance = self.performances[0]
+
+        response = self.assertSameAsSync(
+            get_async_performance_detail_url(performance.id),
+            reverse("theatre:performance-detail", args=[performance.id]),
+        )
+
+        self.assertEqual(response.json()["play"]["title"], "Hamlet")
+
+    def test_seat_map(self):
+        performance = self.performances[0]
+        sync_url = reverse(
+            "theatre:performance-seat-map", args=[performance.id]
+        )
+
+        self.assertSameAsSync(get_async_seat_map_url(performance.id), sync_url)
+        with self.assertNumQueries(0):
+            response = self.client.get(get_async_seat_map_url(performance.id))
+
+        self.assertEqual(response.json()["available_seats"], 159)
+
+    def test_play_list(self):
+        for params in (None, {"genres": "1,2"}, {"fields": "id,actors"}):
+            with self.subTest(params=params):
+                self.assertSameAsSync(
+                    ASYNC_PLAY_URL, reverse("theatre:play-list"), params
+                )
+
+    def test_not_found(self):
+        missing = self.performances[-1].id + 1
+
+        for url in (
+            get_async_performance_detail_url(missing),
+            get_async_seat_map_url(missing),
+        ):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+
+                self.assertEqual(
+                    response.status_code, status.HTTP_404_NOT_FOUND
+                )
+                self.assertEqual(
+                    response.json(),
+                    {"detail": "No Performance matches the given query."},
+                )
+
+    def test_invalid_filter(self):
+        response = self.client.get(
+            ASYNC_PERFORMANCE_URL, {"date_from": "yesterday"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("date_from", response.json())
+
+    def test_read_only(self):
+        self.client.force_authenticate(
+            get_user_model().objects.create_superuser(
+                email="admin@example.com",
+                password="password",
+            )
+        )
+
+        response = self.client.post(ASYNC_PERFORMANCE_URL, {})
+
+        self.assertEqual(
+            response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED
+        )
+
+    def test_jwt_authentication(self):
+        self.client.force_authenticate(None)
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+
+        response = self.client.get(ASYNC_PERFORMANCE_URL)
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer invalid")
+        rejected = self.client.get(ASYNC_PERFORMANCE_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["count"], 3)
+        self.assertEqual(rejected.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIn("WWW-Authenticate", rejected)
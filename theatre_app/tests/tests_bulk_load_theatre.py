@@ -0,0 +1,117 @@
+import json
+import warnings
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+
+from theatre_app.management.commands.bulk_load_fixture import \
+    iter_json_array
+from theatre_app.models import Actor, Genre, Performance, Play, Ticket
+
+FIXTURE_PATH = settings.BASE_DIR / "theatre_fixture_en.json"
+
+
+class IterJsonArrayTests(SimpleTestCase):
+
+    def test_yields_objects_across_chunk_boundaries(self):
+        objects = [
+            {"model": "theatre_app.genre", "pk": pk, "fields": {"name": "[,]"}}
+            for pk in range(1, 20)
+        ]
+        text = json.dumps(objects, indent=2)
+
+        for chunk_size in (1, 7, 64, len(text)):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(
+                    list(iter_json_array(StringIO(text), chunk_size)),
+                    objects,
+                )
+
+    def test_empty_array(self):
+        self.assertEqual(list(iter_json_array(StringIO(" [ ] "))), [])
+
+    def test_rejects_non_array(self):
+        with self.assertRaises(ValueError):
+            list(iter_json_array(StringIO('{"model": "x"}')))
+
+    def test_rejects_truncated_array(self):
+        with self.assertRaises(ValueError):
+            list(iter_json_array(StringIO('[{"pk": 1}, {"pk": 2')))
+
+
+class BulkLoadFixtureTests(TestCase):
+
+    def load(self):
+        out = StringIO()
+        with warnings.catch_warnings():
+            # The sample fixture stores naive show times.
+            warnings.simplefilter("ignore", RuntimeWarning)
+            call_command(
+                "bulk_load_fixture", FIXTURE_PATH, "--batch-size", 7,
+                stdout=out,
+            )
+        return out.getvalue()
+
+    def test_loads_sample_fixture(self):
+        with open(FIXTURE_PATH, encoding="utf-8") as stream:
+            objects = json.load(stream)
+
+        output = self.load()
+
+        self.assertEqual(get_user_model().objects.count(), 10)
+        self.assertEqual(Ticket.objects.count(), 100)
+        self.assertEqual(
+            Play.actors.through.objects.count(),
+            sum(
+                len(obj["fields"]["actors"])
+                for obj in objects
+                if obj["model"] == "theatre_app.play"
+            ),
+        )
+        self.assertIn("theatre_app.Ticket: 100 rows", output)
+        self.assertIn("Loaded 205 rows", output)
+
+    def test_rebuilds_derived_state(self):
+        self.load()
+
+        performance = Performance.objects.order_by("id").first()
+        self.assertEqual(
+            performance.tickets_sold,
+            Ticket.objects.filter(performance=performance).count(),
+        )
+        self.assertFalse(
+            Play.objects.filter(search_vector__isnull=True).exists()
+        )
+        self.assertEqual(Actor.objects.create(first_name="A").id, 21)
+
+    def test_overwrites_existing_rows(self):
+        self.load()
+        play = Play.objects.order_by("id").first()
+        fixture_genres = set(play.genres.values_list("id", flat=True))
+        play.title = "Renamed"
+        play.save()
+        play.genres.set([Genre.objects.create(name="Extra")])
+        ticket = Ticket.objects.order_by("id").first()
+        moved_from = ticket.performance
+        ticket.performance = Performance.objects.exclude(
+            id=moved_from.id
+        ).order_by("id").first()
+        ticket.save()
+
+        output = self.load()
+
+        play.refresh_from_db()
+        self.assertNotEqual(play.title, "Renamed")
+        self.assertEqual(
+            set(play.genres.values_list("id", flat=True)), fixture_genres
+        )
+        self.assertEqual(Ticket.objects.count(), 100)
+        moved_from.refresh_from_db()
+        self.assertEqual(
+            moved_from.tickets_sold,
+            Ticket.objects.filter(performance=moved_from).count(),
+        )
+        self.assertIn("Loaded 205 rows", output)
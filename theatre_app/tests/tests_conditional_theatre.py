@@ -0,0 +1,200 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from theatre_app.tests.tests_performance_theatre import (
+    PERFORMANCE_CALENDAR_URL, sample_performance)
+from theatre_app.tests.tests_play_theatre import (get_play_detail_url,
+                                                  sample_play)
+from theatre_app.tests.tests_seat_hold_theatre import sample_seat_hold
+from theatre_app.tests.tests_tickets_theatre import (sample_reservation,
+                                                     sample_ticket)
+
+PERFORMANCE_URL = reverse("theatre:performance-list")
+PLAY_URL = reverse("theatre:play-list")
+
+
+class ConditionalGetTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test_user@example.com",
+            password="password",
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_matching_etag_returns_not_modified(self):
+        sample_play()
+        response = self.client.get(PLAY_URL)
+
+        with self.assertNumQueries(0):
+            not_modified = self.client.get(
+                PLAY_URL, HTTP_IF_NONE_MATCH=response["ETag"]
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            not_modified.status_code, status.HTTP_304_NOT_MODIFIED
+        )
+        self.assertEqual(not_modified["ETag"], response["ETag"])
+        self.assertEqual(not_modified.content, b"")
+
+    def test_if_modified_since_returns_not_modified(self):
+        play = sample_play()
+        response = self.client.get(get_play_detail_url(play))
+
+        not_modified = self.client.get(
+            get_play_detail_url(play),
+            HTTP_IF_MODIFIED_SINCE=response["Last-Modified"],
+        )
+
+        self.assertEqual(
+            not_modified.status_code, status.HTTP_304_NOT_MODIFIED
+        )
+
+    def test_etag_depends_on_query(self):
+        response = self.client.get(PLAY_URL)
+
+        filtered = self.client.get(
+            PLAY_URL, {"title": "x"}, HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+
+        self.assertEqual(filtered.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(filtered["ETag"], response["ETag"])
+
+    def test_change_invalidates_etag(self):
+        play = sample_play(title="Hamlet")
+        response = self.client.get(get_play_detail_url(play))
+
+        play.title = "Macbeth"
+        play.save()
+        changed = self.client.get(
+            get_play_detail_url(play), HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+
+        self.assertEqual(changed.status_code, status.HTTP_200_OK)
+        self.assertEqual(changed.data["title"], "Macbeth")
+
+    def test_ticket_sale_invalidates_performance_etag(self):
+        performance = sample_performance()
+        response = self.client.get(PERFORMANCE_URL)
+
+        sample_ticket(
+            performance=performance,
+            reservation=sample_reservation(user=self.user),
+        )
+        changed = self.client.get(
+            PERFORMANCE_URL, HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+
+        self.assertEqual(changed.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            changed.data["results"][0]["available_seats"],
+            response.data["results"][0]["available_seats"] - 1,
+        )
+
+    def test_sale_only_invalidates_responses_showing_that_performance(self):
+        performance = sample_performance()
+        other_performance = sample_performance()
+        params = {"play": other_performance.play_id}
+        listed = self.client.get(PERFORMANCE_URL, params)
+        detail_url = reverse(
+            "theatre:performance-detail", args=[other_performance.id]
+        )
+        detail = self.client.get(detail_url)
+        response = self.client.get(PERFORMANCE_URL)
+
+        sample_ticket(
+            performance=performance,
+            reservation=sample_reservation(user=self.user),
+        )
+
+        for url, params, etag, expected in (
+            (PERFORMANCE_URL, params, listed["ETag"],
+             status.HTTP_304_NOT_MODIFIED),
+            (detail_url, None, detail["ETag"], status.HTTP_304_NOT_MODIFIED),
+            (PERFORMANCE_URL, None, response["ETag"], status.HTTP_200_OK),
+        ):
+            with self.subTest(url=url, params=params):
+                self.assertEqual(
+                    self.client.get(
+                        url, params, HTTP_IF_NONE_MATCH=etag
+                    ).status_code,
+                    expected,
+                )
+
+    def test_hold_expiry_invalidates_performance_etag(self):
+        performance = sample_performance()
+        hold = sample_seat_hold(performance=performance, user=self.user)
+        response = self.client.get(PERFORMANCE_URL)
+
+        # The page is read to know whose availability the response shows.
+        with self.assertNumQueries(2):
+            not_modified = self.client.get(
+                PERFORMANCE_URL, HTTP_IF_NONE_MATCH=response["ETag"]
+            )
+        hold.expires_at = timezone.now() - timedelta(seconds=1)
+        hold.save()
+        changed = self.client.get(
+            PERFORMANCE_URL, HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+
+        self.assertEqual(
+            not_modified.status_code, status.HTTP_304_NOT_MODIFIED
+        )
+        self.assertEqual(changed.status_code, status.HTTP_200_OK)
+
+    def test_calendar_revalidated_without_queries_until_hold_expiry(self):
+        performance = sample_performance()
+        hold = sample_seat_hold(performance=performance, user=self.user)
+        params = {
+            "month": timezone.localtime(performance.show_time).strftime(
+                "%Y-%m"
+            )
+        }
+        self.client.get(PERFORMANCE_CALENDAR_URL, params)
+        response = self.client.get(PERFORMANCE_CALENDAR_URL, params)
+
+        with self.assertNumQueries(0):
+            not_modified = self.client.get(
+                PERFORMANCE_CALENDAR_URL,
+                params,
+                HTTP_IF_NONE_MATCH=response["ETag"],
+            )
+        # Holds run out silently, without bumping any version.
+        with mock.patch(
+            "django.utils.timezone.now",
+            return_value=hold.expires_at + timedelta(seconds=1),
+        ):
+            changed = self.client.get(
+                PERFORMANCE_CALENDAR_URL,
+                params,
+                HTTP_IF_NONE_MATCH=response["ETag"],
+            )
+
+        self.assertEqual(
+            not_modified.status_code, status.HTTP_304_NOT_MODIFIED
+        )
+        self.assertEqual(changed.status_code, status.HTTP_200_OK)
+        (shown,) = [
+            shown
+            for day in changed.data["days"]
+            for shown in day["performances"]
+        ]
+        self.assertEqual(
+            shown["available_seats"], performance.theatre_hall.total_seats
+        )
+
+    def test_user_scoped_endpoints_have_no_validators(self):
+        response = self.client.get(reverse("theatre:reservation-list"))
+
+        self.assertNotIn("ETag", response)
@@ -0,0 +1,114 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from theatre_app.tests.tests_performance_theatre import sample_performance
+from theatre_app.tests.tests_play_theatre import (sample_actor, sample_genre,
+                                                  sample_play)
+from theatre_app.tests.tests_tickets_theatre import (sample_reservation,
+                                                     sample_ticket)
+
+GENRE_URL = reverse("theatre:genre-list")
+PERFORMANCE_URL = reverse("theatre:performance-list")
+PLAY_URL = reverse("theatre:play-list")
+
+
+class SparseFieldsetTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test_user@example.com",
+            password="password",
+        )
+        self.client.force_authenticate(self.user)
+
+    def get_sql(self, url, params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, "\n".join(query["sql"] for query in queries)
+
+    def test_fields_trims_play_list_and_prefetches(self):
+        play = sample_play()
+        play.actors.add(sample_actor())
+        play.genres.add(sample_genre())
+
+        # COUNT and SELECT, no actor or genre prefetch.
+        with self.assertNumQueries(2):
+            response = self.client.get(PLAY_URL, {"fields": "id,title,image"})
+
+        self.assertEqual(
+            set(response.data["results"][0]), {"id", "title", "image"}
+        )
+
+    def test_omit_skips_one_prefetch(self):
+        sample_play()
+
+        response, sql = self.get_sql(PLAY_URL, {"omit": "actors"})
+
+        self.assertNotIn("actors", response.data["results"][0])
+        self.assertIn("genres", response.data["results"][0])
+        self.assertNotIn("theatre_app_actor", sql)
+        self.assertIn("theatre_app_genre", sql)
+
+    def test_performance_list_skips_joins_and_annotation(self):
+        sample_performance()
+
+        response, sql = self.get_sql(
+            PERFORMANCE_URL, {"fields": "id,show_time"}
+        )
+
+        self.assertEqual(
+            set(response.data["results"][0]), {"id", "show_time"}
+        )
+        self.assertNotIn("theatre_app_play", sql)
+        self.assertNotIn("theatre_app_theatrehall", sql)
+        self.assertNotIn("theatre_app_seathold", sql)
+
+    def test_performance_availability_keeps_its_annotation(self):
+        sample_performance()
+
+        response, sql = self.get_sql(
+            PERFORMANCE_URL, {"fields": "id,show_time,available_seats"}
+        )
+
+        self.assertEqual(
+            set(response.data["results"][0]),
+            {"id", "show_time", "available_seats"},
+        )
+        self.assertNotIn("theatre_app_play", sql)
+        self.assertIn("theatre_app_seathold", sql)
+
+    def test_nested_serializers_keep_their_fields(self):
+        performance = sample_performance()
+        sample_ticket(
+            reservation=sample_reservation(user=self.user),
+            performance=performance,
+        )
+
+        response = self.client.get(
+            reverse("theatre:ticket-list"), {"fields": "id,performance"}
+        )
+
+        ticket = response.data["results"][0]
+        self.assertEqual(set(ticket), {"id", "performance"})
+        self.assertIn("available_seats", ticket["performance"])
+
+    def test_writes_ignore_fieldsets(self):
+        admin = get_user_model().objects.create_superuser(
+            email="admin@example.com",
+            password="password",
+        )
+        self.client.force_authenticate(admin)
+
+        response = self.client.post(
+            f"{GENRE_URL}?fields=id", {"name": "Drama"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["name"], "Drama")
@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta, timezone
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from theatre_app.tests.tests_performance_theatre import (sample_performance,
+                                                         sample_theatre_hall)
+from theatre_app.tests.tests_play_theatre import sample_play
+from theatre_app.tests.tests_tickets_theatre import sample_reservation
+
+PERFORMANCE_URL = reverse("theatre:performance-list")
+RESERVATION_URL = reverse("theatre:reservation-list")
+
+
+class CursorPaginationTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test_user@example.com",
+            password="password",
+        )
+        self.client.force_authenticate(self.user)
+
+    def walk_pages(self, url, params):
+        ids = []
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn("count", response.data)
+            ids.extend(item["id"] for item in response.data["results"])
+            if response.data["next"] is None:
+                return ids
+            response = self.client.get(response.data["next"])
+
+    def test_performances_cursor_pages_follow_show_time(self):
+        play_obj = sample_play()
+        theatre_hall_obj = sample_theatre_hall()
+        start = datetime(2025, 12, 31, tzinfo=timezone.utc)
+        performances = [
+            sample_performance(
+                play=play_obj,
+                theatre_hall=theatre_hall_obj,
+                show_time=start - timedelta(hours=hours),
+            )
+            for hours in (0, 3, 3, 1, 2, 5, 4)
+        ]
+        expected = [
+            performance.id
+            for performance in sorted(
+                performances, key=lambda obj: (obj.show_time, obj.id)
+            )
+        ]
+
+        ids = self.walk_pages(
+            PERFORMANCE_URL, {"pagination": "cursor", "limit": 2}
+        )
+
+        self.assertEqual(ids, expected)
+
+    def test_reservations_cursor_page_runs_no_count(self):
+        for _ in range(3):
+            sample_reservation(user=self.user)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                RESERVATION_URL, {"pagination": "cursor"}
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Availability subqueries count holds, the page must not count rows.
+        self.assertFalse(
+            any('AS "__count"' in query["sql"] for query in queries)
+        )
+
+    def test_limit_offset_stays_default(self):
+        sample_reservation(user=self.user)
+
+        response = self.client.get(RESERVATION_URL)
+
+        self.assertEqual(response.data["count"], 1)
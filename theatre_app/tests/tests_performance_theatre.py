@@ -9,9 +9,10 @@ from rest_framework.test import APIClient
 from theatre_app.models import Performance, TheatreHall
 from theatre_app.serializers import (PerformanceDetailSerializer,
                                      PerformanceListSerializer)
-from theatre_app.tests.tests_play_theatre import sample_play
+from theatre_app.tests.tests_play_theatre import sample_genre, sample_play
 
 PERFORMANCE_URL = reverse("theatre:performance-list")
+PERFORMANCE_CALENDAR_URL = reverse("theatre:performance-calendar")
 THEATRE_HALL_URL = reverse("theatre:theatrehall-list")
 
 
@@ -137,6 +138,84 @@ class AuthenticatedPerformanceApiTests(TestCase):
             serialized_performances.data
         )
 
+    def assertFilteredPerformances(self, params, expected):
+        response = self.client.get(PERFORMANCE_URL, params)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            sorted(
+                performance["id"] for performance in response.data["results"]
+            ),
+            sorted(performance.id for performance in expected),
+        )
+
+    def test_filtered_performances_by_date_range(self):
+        performances = [
+            sample_performance(
+                show_time=datetime(*show_time, tzinfo=timezone.utc)
+            )
+            for show_time in (
+                (2025, 12, 30, 23), (2025, 12, 31, 0),
+                (2025, 12, 31, 23), (2026, 1, 1, 0),
+            )
+        ]
+
+        self.assertFilteredPerformances(
+            {"date": "2025-12-31"}, performances[1:3]
+        )
+        self.assertFilteredPerformances(
+            {"date_from": "2025-12-31"}, performances[1:]
+        )
+        self.assertFilteredPerformances(
+            {"date_to": "2025-12-30"}, performances[:1]
+        )
+        self.assertFilteredPerformances(
+            {"date_from": "2025-12-01", "date_to": "2025-12-31"},
+            performances[:3],
+        )
+        self.assertFilteredPerformances(
+            {
+                "show_time_from": "2025-12-30T23:00:00Z",
+                "show_time_to": "2025-12-31T23:00:00Z",
+            },
+            performances[:2],
+        )
+
+    def test_filtered_performances_by_invalid_date(self):
+        response = self.client.get(PERFORMANCE_URL, {"date": "2025-13-01"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_filtered_performances_by_invalid_ids(self):
+        for params in (
+            {"play": "abc"},
+            {"theatre_hall": "abc"},
+            {"genres": "1,x"},
+        ):
+            with self.subTest(params=params):
+                response = self.client.get(PERFORMANCE_URL, params)
+
+                self.assertEqual(
+                    response.status_code, status.HTTP_400_BAD_REQUEST
+                )
+                self.assertIn(next(iter(params)), response.data)
+
+    def test_filtered_performances_by_hall_and_genre(self):
+        drama = sample_genre(name="Drama")
+        drama_play = sample_play()
+        drama_play.genres.add(drama)
+        theatre_hall = sample_theatre_hall()
+        performance_obj = sample_performance(
+            play=drama_play, theatre_hall=theatre_hall
+        )
+        sample_performance(play=drama_play)
+        sample_performance(theatre_hall=theatre_hall)
+
+        self.assertFilteredPerformances(
+            {"theatre_hall": theatre_hall.id, "genres": f"{drama.id}"},
+            [performance_obj],
+        )
+
     def test_retrieve_performance_detail(self):
         performance_obj = sample_performance()
 
@@ -176,6 +255,118 @@ class AuthenticatedPerformanceApiTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
 
+class PerformanceCalendarTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test_user@example.com",
+            password="password",
+        )
+        self.client.force_authenticate(self.user)
+        self.performances = [
+            sample_performance(
+                show_time=datetime(*show_time, tzinfo=timezone.utc)
+            )
+            for show_time in (
+                (2026, 1, 31, 20), (2026, 2, 1, 19),
+                (2026, 2, 1, 12), (2026, 2, 28, 23), (2026, 3, 1, 0),
+            )
+        ]
+
+    def test_month_groups_performances_by_day(self):
+        response = self.client.get(
+            PERFORMANCE_CALENDAR_URL, {"month": "2026-02"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["date_from"], "2026-02-01")
+        self.assertEqual(response.data["date_to"], "2026-02-28")
+        days = response.data["days"]
+        self.assertEqual(len(days), 28)
+        self.assertEqual(
+            [performance["id"] for performance in days[0]["performances"]],
+            [self.performances[2].id, self.performances[1].id],
+        )
+        self.assertEqual(days[1], {"date": "2026-02-02", "performances": []})
+        self.assertEqual(
+            days[-1]["performances"],
+            PerformanceListSerializer([self.performances[3]], many=True).data,
+        )
+
+    def test_date_range_in_two_queries(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                PERFORMANCE_CALENDAR_URL,
+                {"date_from": "2026-01-31", "date_to": "2026-02-01"},
+            )
+
+        self.assertEqual(
+            [len(day["performances"]) for day in response.data["days"]],
+            [1, 2],
+        )
+
+    def test_served_from_cache_until_seats_change(self):
+        params = {"month": "2026-02"}
+        self.client.get(PERFORMANCE_CALENDAR_URL, params)
+        # Looks up the next hold expiry, now under known versions.
+        with self.assertNumQueries(1):
+            self.client.get(PERFORMANCE_CALENDAR_URL, params)
+
+        with self.assertNumQueries(0):
+            cached = self.client.get(PERFORMANCE_CALENDAR_URL, params)
+        Performance.update_tickets_sold({self.performances[1].id: 3})
+        fresh = self.client.get(PERFORMANCE_CALENDAR_URL, params)
+
+        self.assertEqual(cached["X-Cache"], "HIT")
+        self.assertEqual(fresh["X-Cache"], "MISS")
+        self.assertEqual(
+            fresh.data["days"][0]["performances"][1]["available_seats"],
+            self.performances[1].theatre_hall.total_seats - 3,
+        )
+
+    def test_filters_by_play_within_the_range(self):
+        response = self.client.get(
+            PERFORMANCE_CALENDAR_URL,
+            {"month": "2026-02", "play": self.performances[1].play_id},
+        )
+
+        self.assertEqual(
+            [
+                performance["id"]
+                for day in response.data["days"]
+                for performance in day["performances"]
+            ],
+            [self.performances[1].id],
+        )
+
+    def test_sales_outside_the_range_keep_the_cache(self):
+        params = {"month": "2026-02"}
+        self.client.get(PERFORMANCE_CALENDAR_URL, params)
+
+        Performance.update_tickets_sold({self.performances[4].id: 3})
+        response = self.client.get(PERFORMANCE_CALENDAR_URL, params)
+
+        self.assertEqual(response["X-Cache"], "HIT")
+
+    def test_invalid_ranges(self):
+        for params in (
+            {"month": "2026-13"},
+            {"month": "2026-02", "date_from": "2026-02-01"},
+            {"date_from": "2026-02-01"},
+            {"date_from": "2026-02-01", "date_to": "2026-01-31"},
+            {"date_from": "2026-01-01", "date_to": "2026-03-31"},
+            {"month": "2026-02", "date": "2026-02-01"},
+            {"month": "2026-02", "show_time_from": "2026-02-01T18:00"},
+        ):
+            with self.subTest(params=params):
+                response = self.client.get(PERFORMANCE_CALENDAR_URL, params)
+
+                self.assertEqual(
+                    response.status_code, status.HTTP_400_BAD_REQUEST
+                )
+
+
 class AdminPerformanceTests(TestCase):
     def setUp(self):
         self.client = APIClient()
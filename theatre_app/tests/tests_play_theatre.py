@@ -137,6 +137,77 @@ class AuthenticatedPlayApiTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["results"], serializer.data)
 
+    def test_filtered_plays_by_several_genres_and_actors(self):
+        play_obj = sample_play()
+        other_play_obj = sample_play(title="Other Title")
+        genres = [sample_genre(), sample_genre()]
+        actors = [sample_actor(), sample_actor()]
+        play_obj.genres.add(*genres)
+        play_obj.actors.add(*actors)
+        other_play_obj.genres.add(genres[0])
+
+        response = self.client.get(
+            PLAY_URL,
+            {
+                "genres": ",".join(str(genre.id) for genre in genres),
+                "actors": ",".join(str(actor.id) for actor in actors),
+            },
+        )
+
+        serializer = PlayListSerializer([play_obj], many=True)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"], serializer.data)
+
+    def test_filtered_plays_by_invalid_ids(self):
+        for params in ({"genres": "drama"}, {"actors": "1,,2"}):
+            with self.subTest(params=params):
+                response = self.client.get(PLAY_URL, params)
+
+                self.assertEqual(
+                    response.status_code, status.HTTP_400_BAD_REQUEST
+                )
+                self.assertIn(next(iter(params)), response.data)
+
+    def test_search_plays(self):
+        hamlet = sample_play(
+            title="Hamlet", description="The prince of Denmark."
+        )
+        macbeth = sample_play(
+            title="Macbeth", description="A Scottish tragedy of Denmark."
+        )
+        sample_play(title="Cats", description="A musical.")
+        hamlet.actors.add(sample_actor(first_name="Ian", last_name="McKellen"))
+        macbeth.genres.add(sample_genre(name="Tragedy"))
+
+        for search, expected in (
+            ("Denmark", [hamlet, macbeth]),
+            ("mckellen", [hamlet]),
+            ("tragedy", [macbeth]),
+            ("Hamlett", [hamlet]),
+        ):
+            with self.subTest(search=search):
+                response = self.client.get(PLAY_URL, {"q": search})
+
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(
+                    [play["id"] for play in response.data["results"]],
+                    [play.id for play in expected],
+                )
+
+    def test_search_vector_follows_renamed_actor(self):
+        play_obj = sample_play()
+        actor_obj = sample_actor(first_name="Ian", last_name="McKellen")
+        actor_obj.plays.add(play_obj)
+
+        actor_obj.last_name = "Holm"
+        actor_obj.save()
+
+        self.assertFalse(
+            Play.objects.filter(search_vector="mckellen").exists()
+        )
+        self.assertTrue(Play.objects.filter(search_vector="holm").exists())
+
     def test_retrieve_play_detail(self):
         play_obj = sample_play()
         actor_obj = sample_actor()
@@ -0,0 +1,340 @@
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from theatre_app.analytics import refresh_occupancy
+from theatre_app.models import Performance, SeatHold
+from theatre_app.tests.tests_performance_theatre import (sample_performance,
+                                                         sample_theatre_hall)
+from theatre_app.tests.tests_play_theatre import (sample_actor, sample_genre,
+                                                  sample_play)
+from theatre_app.tests.tests_tickets_theatre import (sample_reservation,
+                                                     sample_ticket)
+from theatre_app.urls import default_router
+
+DATASET_SIZES = (1, 3, 9)
+
+# Maximum number of queries per (router basename, action), whatever the
+# dataset size. A page is requested with a limit above the largest
+# dataset so every seeded row is rendered. Variants of an action, such
+# as a request shape or booking mode, follow it after a colon.
+QUERY_BUDGETS = {
+    ("theatrehall", "list"): 2,
+    ("theatrehall", "retrieve"): 1,
+    ("actor", "list"): 2,
+    ("actor", "retrieve"): 1,
+    ("genre", "list"): 2,
+    ("genre", "retrieve"): 1,
+    ("play", "list"): 4,
+    ("play", "retrieve"): 3,
+    ("performance", "list"): 3,
+    ("performance", "retrieve"): 3,
+    ("performance", "calendar"): 2,
+    ("performance", "seat_map"): 3,
+    ("ticket", "list"): 2,
+    ("ticket", "retrieve"): 6,
+    ("ticket", "export"): 1,
+    ("reservation", "list"): 3,
+    ("reservation", "retrieve"): 4,
+    ("reservation", "list:normalized"): 6,
+    ("reservation", "retrieve:normalized"): 5,
+    ("reservation", "create:best_available"): 13,
+    ("reservation", "create:holds"): 10,
+    ("seathold", "list"): 2,
+    ("seathold", "create"): 6,
+    ("occupancy", "list"): 3,
+}
+
+
+def seed_dataset(size, user):
+    """Seed `size` objects of every kind, nesting `size` deep.
+
+    Every play has `size` actors and genres and every reservation holds
+    `size` tickets spread over `size` performances, so nested
+    collections grow with the dataset as well.
+    """
+    theatre_hall = sample_theatre_hall(rows=size + 1, seats_per_row=size)
+    actors = [sample_actor() for _ in range(size)]
+    genres = [sample_genre() for _ in range(size)]
+
+    performances = []
+    for _ in range(size):
+        play = sample_play()
+        play.actors.add(*actors)
+        play.genres.add(*genres)
+        performances.append(
+            sample_performance(play=play, theatre_hall=theatre_hall)
+        )
+
+    for row in range(1, size + 1):
+        reservation = sample_reservation(user=user)
+        for performance in performances:
+            sample_ticket(
+                reservation=reservation,
+                performance=performance,
+                row=row,
+                seat_number=1,
+            )
+
+    for seat_number in range(1, size + 1):
+        SeatHold.objects.create(
+            performance=performances[0],
+            user=user,
+            row=size + 1,
+            seat_number=seat_number,
+            expires_at=SeatHold.next_expiry(),
+        )
+    refresh_occupancy()
+
+
+class QueryBudgetTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test_user@example.com",
+            password="password",
+        )
+        self.client.force_authenticate(self.user)
+
+    def assertWithinBudget(self, basename, action, get_url):
+        self.assertRequestWithinBudget(
+            basename, action, lambda size: ("get", *get_url())
+        )
+
+    def assertRequestWithinBudget(
+        self, basename, action, get_request,
+        expected_status=status.HTTP_200_OK,
+    ):
+        """Check the request ``get_request(size)`` returns as
+        (method, url, data) against the budget of every dataset size.
+
+        Streamed responses are consumed while queries are captured.
+        """
+        budget = QUERY_BUDGETS[(basename, action)]
+
+        for size in DATASET_SIZES:
+            with self.subTest(size=size), transaction.atomic():
+                seed_dataset(size, self.user)
+                method, url, data = get_request(size)
+
+                with CaptureQueriesContext(connection) as queries:
+                    if method == "get":
+                        response = self.client.get(url, data)
+                    else:
+                        response = self.client.post(url, data, format="json")
+                    if response.streaming:
+                        b"".join(response.streaming_content)
+
+                self.assertEqual(response.status_code, expected_status)
+                sql = "\n".join(
+                    f"{number}. {query['sql']}"
+                    for number, query in enumerate(queries, start=1)
+                )
+                self.assertLessEqual(
+                    len(queries),
+                    budget,
+                    f"{basename}-{action} ran {len(queries)} queries "
+                    f"with {size} seeded objects, budget is {budget}:\n{sql}",
+                )
+                transaction.set_rollback(True)
+
+    def assertListWithinBudget(self, basename):
+        self.assertWithinBudget(
+            basename,
+            "list",
+            lambda: (
+                reverse(f"theatre:{basename}-list"),
+                {"limit": max(DATASET_SIZES) ** 2},
+            ),
+        )
+
+    def assertRetrieveWithinBudget(self, basename):
+        viewset = self.get_viewset(basename)
+
+        def get_url():
+            obj = viewset.queryset.model.objects.order_by("id").first()
+            return reverse(f"theatre:{basename}-detail", args=[obj.id]), {}
+
+        self.assertWithinBudget(basename, "retrieve", get_url)
+
+    @staticmethod
+    def get_viewset(basename):
+        for _, viewset, registered_basename in default_router.registry:
+            if registered_basename == basename:
+                return viewset
+
+    def test_every_read_action_has_budget(self):
+        for _, viewset, basename in default_router.registry:
+            for action in ("list", "retrieve"):
+                if hasattr(viewset, action):
+                    self.assertIn((basename, action), QUERY_BUDGETS)
+
+    def test_theatre_hall_list(self):
+        self.assertListWithinBudget("theatrehall")
+
+    def test_theatre_hall_retrieve(self):
+        self.assertRetrieveWithinBudget("theatrehall")
+
+    def test_actor_list(self):
+        self.assertListWithinBudget("actor")
+
+    def test_actor_retrieve(self):
+        self.assertRetrieveWithinBudget("actor")
+
+    def test_genre_list(self):
+        self.assertListWithinBudget("genre")
+
+    def test_genre_retrieve(self):
+        self.assertRetrieveWithinBudget("genre")
+
+    def test_play_list(self):
+        self.assertListWithinBudget("play")
+
+    def test_play_retrieve(self):
+        self.assertRetrieveWithinBudget("play")
+
+    def test_performance_list(self):
+        self.assertListWithinBudget("performance")
+
+    def test_performance_retrieve(self):
+        self.assertRetrieveWithinBudget("performance")
+
+    def test_ticket_list(self):
+        self.assertListWithinBudget("ticket")
+
+    def test_ticket_retrieve(self):
+        self.assertRetrieveWithinBudget("ticket")
+
+    def test_reservation_list(self):
+        self.assertListWithinBudget("reservation")
+
+    def test_reservation_retrieve(self):
+        self.assertRetrieveWithinBudget("reservation")
+
+    def test_seat_hold_list(self):
+        self.assertListWithinBudget("seathold")
+
+    def test_occupancy_list(self):
+        self.user.is_staff = True
+        self.user.save()
+
+        self.assertListWithinBudget("occupancy")
+
+    def test_performance_calendar(self):
+        self.assertWithinBudget(
+            "performance",
+            "calendar",
+            lambda: (
+                reverse("theatre:performance-calendar"),
+                {"date_from": "2025-12-30", "date_to": "2026-01-01"},
+            ),
+        )
+
+    def test_performance_seat_map(self):
+        self.assertWithinBudget(
+            "performance",
+            "seat_map",
+            lambda: (
+                reverse(
+                    "theatre:performance-seat-map",
+                    args=[Performance.objects.order_by("id").first().id],
+                ),
+                {},
+            ),
+        )
+
+    def test_ticket_export(self):
+        self.user.is_staff = True
+        self.user.save()
+
+        self.assertWithinBudget(
+            "ticket",
+            "export",
+            lambda: (reverse("theatre:ticket-export"), {"format": "csv"}),
+        )
+
+    def test_reservation_list_normalized(self):
+        self.assertWithinBudget(
+            "reservation",
+            "list:normalized",
+            lambda: (
+                reverse("theatre:reservation-list"),
+                {"shape": "normalized", "limit": max(DATASET_SIZES) ** 2},
+            ),
+        )
+
+    def test_reservation_retrieve_normalized(self):
+        def get_url():
+            reservation = self.user.reservations.order_by("id").first()
+            return (
+                reverse("theatre:reservation-detail", args=[reservation.id]),
+                {"shape": "normalized"},
+            )
+
+        self.assertWithinBudget(
+            "reservation", "retrieve:normalized", get_url
+        )
+
+    def test_best_available_booking(self):
+        def get_request(size):
+            performance = Performance.objects.order_by("id").first()
+            return (
+                "post",
+                reverse("theatre:reservation-list"),
+                {
+                    "best_available": {
+                        "performance": performance.id, "seats": size
+                    }
+                },
+            )
+
+        self.assertRequestWithinBudget(
+            "reservation",
+            "create:best_available",
+            get_request,
+            status.HTTP_201_CREATED,
+        )
+
+    def test_booking_from_holds(self):
+        def get_request(size):
+            return (
+                "post",
+                reverse("theatre:reservation-list"),
+                {
+                    "holds": list(
+                        SeatHold.objects.filter(user=self.user)
+                        .values_list("id", flat=True)
+                    )
+                },
+            )
+
+        self.assertRequestWithinBudget(
+            "reservation",
+            "create:holds",
+            get_request,
+            status.HTTP_201_CREATED,
+        )
+
+    def test_seat_hold_create(self):
+        def get_request(size):
+            performance = Performance.objects.order_by("id").last()
+            return (
+                "post",
+                reverse("theatre:seathold-list"),
+                {
+                    "performance": performance.id,
+                    "seats": [
+                        {"row": size + 1, "seat_number": seat_number}
+                        for seat_number in range(1, size + 1)
+                    ],
+                },
+            )
+
+        self.assertRequestWithinBudget(
+            "seathold", "create", get_request, status.HTTP_201_CREATED
+        )
@@ -0,0 +1,141 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from theatre_app.models import PlaySimilarity
+from theatre_app.recommendations import (co_occurrences,
+                                         refresh_similar_plays)
+from theatre_app.tests.tests_performance_theatre import sample_performance
+from theatre_app.tests.tests_play_theatre import (sample_actor, sample_genre,
+                                                  sample_play)
+from theatre_app.tests.tests_tickets_theatre import (sample_reservation,
+                                                     sample_ticket)
+
+
+def get_similar_plays_url(play_id):
+    return reverse("theatre:play-similar", args=[play_id])
+
+
+class CoOccurrenceTests(SimpleTestCase):
+
+    def test_counts_shared_columns_once_per_pair(self):
+        cells = [(1, 10), (1, 20), (1, 30), (2, 20), (2, 10), (2, 10), (3, 40)]
+
+        counts, dense = co_occurrences(iter(cells))
+
+        self.assertEqual(counts, {(10, 20): 2, (10, 30): 1, (20, 30): 1})
+        self.assertEqual(dense, {})
+
+    def test_dense_columns_are_not_expanded(self):
+        cells = [(1, 10), (1, 20), (1, 30), (2, 20), (2, 10)]
+
+        counts, dense = co_occurrences(iter(cells), max_column_plays=2)
+
+        self.assertEqual(counts, {(10, 20): 1})
+        self.assertEqual(dense, {10: {1}, 20: {1}, 30: {1}})
+
+
+class SimilarPlaysTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test_user@example.com",
+            password="password",
+        )
+        self.client.force_authenticate(self.user)
+
+        actors = [sample_actor() for _ in range(3)]
+        drama, comedy = sample_genre(name="Drama"), sample_genre(name="Comedy")
+        self.hamlet = sample_play(title="Hamlet")
+        self.hamlet.actors.add(*actors)
+        self.hamlet.genres.add(drama)
+        self.macbeth = sample_play(title="Macbeth")
+        self.macbeth.actors.add(*actors[:2])
+        self.macbeth.genres.add(drama)
+        self.lear = sample_play(title="King Lear")
+        self.lear.genres.add(drama)
+        self.farce = sample_play(title="Farce")
+        self.farce.genres.add(comedy)
+
+    def test_ranks_by_shared_actors_then_genres(self):
+        refresh_similar_plays()
+
+        response = self.client.get(get_similar_plays_url(self.hamlet.id))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(play["title"], play["shared_actors"], play["shared_genres"])
+             for play in response.data],
+            [("Macbeth", 2, 1), ("King Lear", 0, 1)],
+        )
+        self.assertEqual(response.data[0]["score"], 5.0)
+
+    def test_co_purchases_boost(self):
+        reservation = sample_reservation(user=self.user)
+        for play, row in ((self.hamlet, 1), (self.farce, 2)):
+            sample_ticket(
+                reservation=reservation,
+                performance=sample_performance(play=play),
+                row=row,
+            )
+
+        refresh_similar_plays(co_purchase_weight=1.5)
+        with_boost = self.client.get(get_similar_plays_url(self.farce.id))
+        refresh_similar_plays(co_purchase_weight=0)
+        without_boost = self.client.get(get_similar_plays_url(self.farce.id))
+
+        self.assertEqual(
+            [(play["id"], play["co_purchases"], play["score"])
+             for play in with_boost.data],
+            [(self.hamlet.id, 1, 1.5)],
+        )
+        self.assertEqual(without_boost.data, [])
+
+    def test_dense_genre_only_counts_for_otherwise_linked_plays(self):
+        # Drama holds three plays, above the limit of two.
+        refresh_similar_plays(max_column_plays=2)
+
+        response = self.client.get(get_similar_plays_url(self.hamlet.id))
+
+        self.assertEqual(
+            [(play["title"], play["shared_actors"], play["shared_genres"])
+             for play in response.data],
+            [("Macbeth", 2, 1)],
+        )
+        self.assertEqual(response.data[0]["score"], 5.0)
+
+    def test_top_k(self):
+        refresh_similar_plays(top_k=1)
+
+        self.assertEqual(
+            PlaySimilarity.objects.filter(play=self.hamlet).count(), 1
+        )
+
+    def test_served_in_one_query(self):
+        refresh_similar_plays()
+
+        with self.assertNumQueries(1):
+            self.client.get(get_similar_plays_url(self.macbeth.id))
+
+    def test_unknown_play(self):
+        response = self.client.get(get_similar_plays_url(self.farce.id + 1))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_refresh_command_replaces_lists(self):
+        refresh_similar_plays()
+        self.lear.genres.clear()
+        out = StringIO()
+
+        call_command("refresh_similar_plays", stdout=out)
+
+        self.assertIn("Stored 2 similar play(s)", out.getvalue())
+        self.assertFalse(
+            PlaySimilarity.objects.filter(similar_play=self.lear).exists()
+        )
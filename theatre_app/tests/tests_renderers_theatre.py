@@ -0,0 +1,102 @@
+import datetime
+import decimal
+import io
+import uuid
+from collections import OrderedDict
+from zoneinfo import ZoneInfo
+
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from theatre_app.renderers import FastJSONParser, FastJSONRenderer
+
+SAMPLE_DATA = OrderedDict(
+    [
+        ("id", 1),
+        ("aware", datetime.datetime(
+            2025, 12, 31, 19, 30, tzinfo=datetime.timezone.utc
+        )),
+        ("aware_micro", datetime.datetime(
+            2025, 12, 31, 19, 30, 0, 1500, tzinfo=datetime.timezone.utc
+        )),
+        ("kyiv", datetime.datetime(
+            2025, 6, 1, 19, 30, tzinfo=ZoneInfo("Europe/Kyiv")
+        )),
+        ("naive", datetime.datetime(2025, 12, 31, 19, 30)),
+        ("date", datetime.date(2025, 12, 31)),
+        ("time", datetime.time(19, 30, 15)),
+        ("duration", datetime.timedelta(hours=2, seconds=5)),
+        ("price", decimal.Decimal("12.50")),
+        ("lazy", gettext_lazy("This field is required.")),
+        ("uuid", uuid.UUID("12345678-1234-5678-1234-567812345678")),
+        ("unicode", "Лебедине озеро –     \x1f"),
+        ("numbers", {1: "one", 2: [None, True, False, 0.5]}),
+        ("tickets", [OrderedDict(row=1, seat_number=2)]),
+    ]
+)
+
+
+class FastJSONRendererTests(SimpleTestCase):
+
+    def test_output_matches_stdlib_renderer(self):
+        self.assertEqual(
+            FastJSONRenderer().render(SAMPLE_DATA),
+            JSONRenderer().render(SAMPLE_DATA),
+        )
+
+    def test_indented_output_matches_stdlib_renderer(self):
+        media_type = "application/json; indent=4"
+
+        self.assertEqual(
+            FastJSONRenderer().render(SAMPLE_DATA, media_type),
+            JSONRenderer().render(SAMPLE_DATA, media_type),
+        )
+
+    def test_none_renders_empty(self):
+        self.assertEqual(FastJSONRenderer().render(None), b"")
+
+    def test_integers_beyond_64_bits_match_stdlib_renderer(self):
+        data = {"big": 2 ** 64, "negative": -(2 ** 70)}
+
+        self.assertEqual(
+            FastJSONRenderer().render(data), JSONRenderer().render(data)
+        )
+
+    def test_non_finite_floats_render_as_null(self):
+        for value in (float("nan"), float("inf"), float("-inf")):
+            with self.subTest(value=value):
+                with self.assertRaises(ValueError):
+                    JSONRenderer().render({"value": value})
+
+                self.assertEqual(
+                    FastJSONRenderer().render({"value": value}),
+                    b'{"value":null}',
+                )
+
+
+class FastJSONParserTests(SimpleTestCase):
+
+    def parse(self, parser, body):
+        return parser.parse(io.BytesIO(body), "application/json", {})
+
+    def test_parse_matches_stdlib_parser(self):
+        body = JSONRenderer().render(SAMPLE_DATA)
+
+        self.assertEqual(
+            self.parse(FastJSONParser(), body),
+            self.parse(JSONParser(), body),
+        )
+
+    def test_parse_beyond_64_bit_integers(self):
+        self.assertEqual(
+            self.parse(FastJSONParser(), b'{"row": 18446744073709551616}'),
+            {"row": 18446744073709551616},
+        )
+
+    def test_invalid_body_raises_parse_error(self):
+        for body in (b"{", b'{"row": NaN}'):
+            with self.subTest(body=body), self.assertRaises(ParseError):
+                self.parse(FastJSONParser(), body)
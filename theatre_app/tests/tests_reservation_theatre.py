@@ -1,10 +1,16 @@
+from io import StringIO
+from unittest import mock
+
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
 from rest_framework import status
 from rest_framework.reverse import reverse
 from rest_framework.test import APIClient
 
-from theatre_app.models import Reservation
+from theatre_app.models import (Performance, Reservation, SeatHold,
+                                TheatreHall, Ticket)
+from theatre_app.seat_allocator import find_best_block
 from theatre_app.serializers import (ReservationDetailSerializer,
                                      ReservationListSerializer)
 from theatre_app.tests.tests_performance_theatre import sample_performance
@@ -90,6 +96,470 @@ class AuthenticatedTicketApiTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
 
 
+class BulkReservationTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test_user@example.com",
+            password="password",
+        )
+        self.client.force_authenticate(self.user)
+        self.performance = sample_performance()
+
+    def sample_payload(self, *seats):
+        return {
+            "tickets": [
+                {"row": row, "seat_number": seat_number,
+                 "performance": self.performance.id}
+                for row, seat_number in seats
+            ]
+        }
+
+    def test_group_booking_query_count_is_constant(self):
+        small_payload = self.sample_payload((1, 1))
+        large_payload = self.sample_payload(
+            *[(2, seat_number) for seat_number in range(1, 9)]
+        )
+
+        with self.assertNumQueries(10):
+            response = self.client.post(
+                RESERVATION_URL, small_payload, format="json"
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        with self.assertNumQueries(10):
+            response = self.client.post(
+                RESERVATION_URL, large_payload, format="json"
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            Reservation.objects.get(id=response.data["id"]).tickets.count(), 8
+        )
+
+    def test_halls_loaded_with_performances_skip_the_cache(self):
+        payload = self.sample_payload(*[(3, seat) for seat in range(1, 6)])
+
+        with mock.patch.object(
+            TheatreHall, "get_version", wraps=TheatreHall.get_version
+        ) as get_version:
+            response = self.client.post(
+                RESERVATION_URL, payload, format="json"
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        get_version.assert_not_called()
+
+    def test_seat_out_of_range_reported_per_ticket(self):
+        payload = self.sample_payload((1, 1), (99, 1))
+
+        response = self.client.post(RESERVATION_URL, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["tickets"][0], {})
+        self.assertIn(
+            "row number must be in range",
+            str(response.data["tickets"][1]["row"]),
+        )
+
+    def test_duplicate_seat_rejected(self):
+        payload = self.sample_payload((1, 1), (1, 1))
+
+        response = self.client.post(RESERVATION_URL, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Reservation.objects.exists())
+
+    def test_unknown_performance_rejected(self):
+        payload = {
+            "tickets": [{"row": 1, "seat_number": 1, "performance": 0}]
+        }
+
+        response = self.client.post(RESERVATION_URL, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("performance", response.data["tickets"][0])
+
+    def test_taken_seats_conflict(self):
+        reservation_obj = sample_reservation(user=self.user)
+        for seat_number in (2, 3):
+            sample_ticket(
+                reservation=reservation_obj,
+                performance=self.performance,
+                row=1,
+                seat_number=seat_number,
+            )
+        payload = self.sample_payload((1, 1), (1, 2), (1, 3))
+
+        response = self.client.post(RESERVATION_URL, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(
+            response.data["taken_seats"],
+            [
+                {"performance": self.performance.id,
+                 "row": 1, "seat_number": seat_number}
+                for seat_number in (2, 3)
+            ],
+        )
+        self.assertEqual(Reservation.objects.count(), 1)
+        self.performance.refresh_from_db()
+        self.assertEqual(self.performance.tickets_sold, 2)
+
+
+class FindBestBlockTests(SimpleTestCase):
+
+    def test_empty_hall_centre(self):
+        self.assertEqual(find_best_block(5, 9, {}, 3), (3, 4))
+        # Between two middle rows and seats the front and left win.
+        self.assertEqual(find_best_block(4, 8, {}, 3), (2, 3))
+
+    def test_skips_taken_seats(self):
+        # Only the middle seat is taken: its neighbours are as close as
+        # the middle seat of the next row, the middle row wins the tie.
+        self.assertEqual(find_best_block(5, 9, {3: 0b10000}, 1), (3, 4))
+        # Seats 4 and 6 of the middle row are taken.
+        self.assertEqual(find_best_block(5, 9, {3: 0b101000}, 2), (2, 4))
+
+    def test_nearly_sold_out(self):
+        full_row = (1 << 200) - 1
+        taken = {row: full_row for row in range(1, 201)}
+        taken[200] = full_row & ~(0b111 << 5)
+
+        self.assertEqual(find_best_block(200, 200, taken, 3), (200, 6))
+        self.assertIsNone(find_best_block(200, 200, taken, 4))
+
+    def test_block_wider_than_row(self):
+        self.assertIsNone(find_best_block(5, 9, {}, 10))
+
+
+class BestAvailableReservationTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test_user@example.com",
+            password="password",
+        )
+        self.client.force_authenticate(self.user)
+        # 20 rows of 8 seats, the middle is rows 10 and 11, seats 4 and 5.
+        self.performance = sample_performance()
+        self.other_reservation = sample_reservation(
+            user=get_user_model().objects.create_user(
+                email="other_user@example.com",
+                password="password",
+            )
+        )
+
+    def book(self, seats):
+        return self.client.post(
+            RESERVATION_URL,
+            {"best_available": {
+                "performance": self.performance.id, "seats": seats
+            }},
+            format="json",
+        )
+
+    def sell(self, row, *seat_numbers):
+        for seat_number in seat_numbers:
+            sample_ticket(
+                reservation=self.other_reservation,
+                performance=self.performance,
+                row=row,
+                seat_number=seat_number,
+            )
+
+    def booked_seats(self, response):
+        return [
+            (seat["row"], seat["seat_number"])
+            for seat in response.data["seats"]
+        ]
+
+    def test_books_centre_block(self):
+        response = self.book(2)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.booked_seats(response), [(10, 4), (10, 5)])
+        self.performance.refresh_from_db()
+        self.assertEqual(self.performance.tickets_sold, 2)
+
+    def test_avoids_sold_and_held_seats(self):
+        self.sell(10, 4, 6)
+        SeatHold.objects.create(
+            performance=self.performance,
+            user=self.other_reservation.user,
+            row=11,
+            seat_number=5,
+            expires_at=SeatHold.next_expiry(),
+        )
+        SeatHold.objects.create(
+            performance=self.performance,
+            user=self.user,
+            row=11,
+            seat_number=3,
+            expires_at=SeatHold.next_expiry(),
+        )
+
+        response = self.book(3)
+
+        # Row 9 scores the same but row 11 is nearer the middle; the
+        # own hold does not block.
+        self.assertEqual(
+            self.booked_seats(response), [(11, 2), (11, 3), (11, 4)]
+        )
+        self.assertFalse(SeatHold.objects.filter(user=self.user).exists())
+
+    def test_retries_after_losing_a_race(self):
+        self.sell(10, 4)
+        self.sell(11, 3)
+
+        # Every seat looked free when the map was read.
+        with mock.patch(
+            "theatre_app.seat_allocator.taken_seat_bitmaps", return_value={}
+        ):
+            response = self.book(2)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.booked_seats(response), [(11, 4), (11, 5)])
+        self.assertEqual(Ticket.objects.count(), 4)
+
+    def test_conflict_when_no_block_left(self):
+        for row in range(1, 21):
+            self.sell(row, 2, 5, 8)
+
+        response = self.book(3)
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data["detail"].code, "no_adjacent_seats")
+        self.assertEqual(Reservation.objects.count(), 1)
+        self.assertEqual(self.book(2).status_code, status.HTTP_201_CREATED)
+
+    def test_party_wider_than_row_rejected(self):
+        response = self.book(9)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("seats", response.data["best_available"])
+
+    def test_one_mode_only(self):
+        response = self.client.post(
+            RESERVATION_URL,
+            {
+                "best_available": {
+                    "performance": self.performance.id, "seats": 1
+                },
+                "holds": [1],
+            },
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_query_count_is_constant(self):
+        self.book(1)
+
+        with self.assertNumQueries(13):
+            response = self.book(6)
+
+        self.assertEqual(len(response.data["seats"]), 6)
+
+    def test_hall_version_read_once_per_booking(self):
+        with mock.patch.object(
+            TheatreHall, "get_version", wraps=TheatreHall.get_version
+        ) as get_version:
+            response = self.book(2)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        get_version.assert_called_once_with()
+
+
+class NormalizedReservationTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test_user@example.com",
+            password="password",
+        )
+        self.client.force_authenticate(self.user)
+        self.performance = sample_performance()
+        self.reservation = sample_reservation(user=self.user)
+        for seat_number in range(1, 6):
+            sample_ticket(
+                reservation=self.reservation,
+                performance=self.performance,
+                row=1,
+                seat_number=seat_number,
+            )
+
+    def test_retrieve_side_loads_each_object_once(self):
+        # Reservation, tickets, performances, actors and genres.
+        with self.assertNumQueries(5):
+            response = self.client.get(
+                get_reservation_detail_url(self.reservation),
+                {"shape": "normalized"},
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            {ticket["performance"] for ticket in response.data["tickets"]},
+            {self.performance.id},
+        )
+        included = response.data["included"]
+        self.assertEqual(
+            [performance["id"] for performance in included["performances"]],
+            [self.performance.id],
+        )
+        self.assertEqual(
+            included["performances"][0]["play"], self.performance.play_id
+        )
+        self.assertEqual(
+            [play["id"] for play in included["plays"]],
+            [self.performance.play_id],
+        )
+        self.assertEqual(
+            [hall["id"] for hall in included["theatre_halls"]],
+            [self.performance.theatre_hall_id],
+        )
+
+    def test_list_side_loads_performances_of_page(self):
+        other_performance = sample_performance()
+        sample_ticket(
+            reservation=sample_reservation(user=self.user),
+            performance=other_performance,
+        )
+
+        response = self.client.get(RESERVATION_URL, {"shape": "normalized"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertEqual(
+            [
+                performance["id"]
+                for performance in response.data["included"]["performances"]
+            ],
+            [self.performance.id, other_performance.id],
+        )
+
+    def test_default_shape_unchanged(self):
+        response = self.client.get(
+            get_reservation_detail_url(self.reservation)
+        )
+
+        self.assertNotIn("included", response.data)
+        self.assertEqual(
+            response.data["tickets"][0]["performance"]["id"],
+            self.performance.id,
+        )
+
+
+class PerformanceSeatCounterTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test_user@example.com",
+            password="password",
+        )
+        self.client.force_authenticate(self.user)
+        self.performance = sample_performance()
+
+    def assertTicketsSold(self, expected):
+        self.performance.refresh_from_db()
+        self.assertEqual(self.performance.tickets_sold, expected)
+        self.assertEqual(
+            self.performance.available_seats,
+            self.performance.theatre_hall.total_seats - expected,
+        )
+
+    def test_reservation_create_increments_counter(self):
+        payload = {
+            "tickets": [
+                {"row": 1, "seat_number": seat,
+                 "performance": self.performance.id}
+                for seat in (1, 2, 3)
+            ]
+        }
+
+        response = self.client.post(RESERVATION_URL, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTicketsSold(3)
+
+    def test_reservation_delete_decrements_counter(self):
+        reservation_obj = sample_reservation(user=self.user)
+        sample_ticket(
+            reservation=reservation_obj, performance=self.performance, row=1
+        )
+        sample_ticket(
+            reservation=reservation_obj, performance=self.performance, row=2
+        )
+        self.assertTicketsSold(2)
+
+        response = self.client.delete(
+            get_reservation_detail_url(reservation_obj)
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertTicketsSold(0)
+
+    def test_ticket_delete_decrements_counter(self):
+        reservation_obj = sample_reservation(user=self.user)
+        ticket_obj = sample_ticket(
+            reservation=reservation_obj, performance=self.performance
+        )
+
+        response = self.client.delete(
+            reverse("theatre:ticket-detail", args=[ticket_obj.id])
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertTicketsSold(0)
+
+    def test_cascading_deletes_decrement_counter(self):
+        buyer = get_user_model().objects.create_user(
+            email="buyer@example.com",
+            password="password",
+        )
+        for row, user in ((1, buyer), (2, self.user), (3, self.user)):
+            sample_ticket(
+                reservation=sample_reservation(user=user),
+                performance=self.performance,
+                row=row,
+            )
+        self.assertTicketsSold(3)
+
+        buyer.delete()
+        self.assertTicketsSold(2)
+
+        Reservation.objects.filter(user=self.user).delete()
+        self.assertTicketsSold(0)
+
+    def test_rebuild_seat_counters_command(self):
+        reservation_obj = sample_reservation(user=self.user)
+        sample_ticket(
+            reservation=reservation_obj, performance=self.performance
+        )
+        Performance.objects.update(tickets_sold=7)
+        performance_url = reverse("theatre:performance-list")
+        listed = self.client.get(performance_url)
+
+        out = StringIO()
+        call_command("rebuild_seat_counters", "--check", stdout=out)
+        self.assertIn("1 performance counter(s) out of sync", out.getvalue())
+        self.assertTicketsSold(7)
+
+        call_command("rebuild_seat_counters", stdout=StringIO())
+        self.assertTicketsSold(1)
+        response = self.client.get(
+            performance_url, HTTP_IF_NONE_MATCH=listed["ETag"]
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["results"][0]["available_seats"],
+            self.performance.theatre_hall.total_seats - 1,
+        )
+
+
 class AdminPlayTests(TestCase):
     def setUp(self):
         self.client = APIClient()
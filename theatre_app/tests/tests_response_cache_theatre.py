@@ -0,0 +1,145 @@
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from theatre_app.response_cache import get_stats
+from theatre_app.tests.tests_performance_theatre import sample_performance
+from theatre_app.tests.tests_play_theatre import (get_play_detail_url,
+                                                  sample_actor, sample_genre,
+                                                  sample_play)
+
+ACTOR_URL = reverse("theatre:actor-list")
+PLAY_URL = reverse("theatre:play-list")
+
+
+class ResponseCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test_user@example.com",
+            password="password",
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_repeated_read_served_from_cache(self):
+        sample_actor()
+
+        first = self.client.get(ACTOR_URL)
+        with self.assertNumQueries(0):
+            second = self.client.get(ACTOR_URL)
+
+        self.assertEqual(first["X-Cache"], "MISS")
+        self.assertEqual(second["X-Cache"], "HIT")
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.data, first.data)
+
+    def test_query_params_are_part_of_key(self):
+        sample_play(title="Hamlet")
+        sample_play(title="Macbeth")
+
+        self.client.get(PLAY_URL, {"title": "hamlet"})
+        response = self.client.get(PLAY_URL, {"title": "macbeth"})
+
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(
+            [play["title"] for play in response.data["results"]],
+            ["Macbeth"],
+        )
+
+    def test_save_invalidates_cached_list(self):
+        sample_actor(first_name="Anna")
+        self.client.get(ACTOR_URL)
+
+        sample_actor(first_name="Boris")
+        response = self.client.get(ACTOR_URL)
+
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(len(response.data["results"]), 2)
+
+    def test_recreated_version_does_not_match_old_responses(self):
+        sample_actor(first_name="Anna")
+        self.client.get(ACTOR_URL)
+
+        cache.delete("theatre:version:theatre_app.actor")
+        sample_actor(first_name="Boris")
+        response = self.client.get(ACTOR_URL)
+
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(len(response.data["results"]), 2)
+
+    def test_related_model_change_invalidates_plays(self):
+        actor = sample_actor(first_name="Anna", last_name="Petrova")
+        play = sample_play()
+        play.actors.add(actor)
+        self.client.get(get_play_detail_url(play))
+
+        actor.last_name = "Ivanova"
+        actor.save()
+        response = self.client.get(get_play_detail_url(play))
+
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data["actors"], ["Anna Ivanova"])
+
+    def test_m2m_change_invalidates_plays(self):
+        play = sample_play()
+        self.client.get(get_play_detail_url(play))
+
+        play.genres.add(sample_genre(name="Drama"))
+        response = self.client.get(get_play_detail_url(play))
+
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data["genres"], ["Drama"])
+
+    def test_performances_not_cached(self):
+        performance = sample_performance()
+
+        response = self.client.get(
+            reverse("theatre:performance-detail", args=[performance.id])
+        )
+
+        self.assertNotIn("X-Cache", response)
+
+    def test_hit_and_miss_counters(self):
+        for _ in range(3):
+            self.client.get(ACTOR_URL)
+
+        self.assertEqual(get_stats("actor"), {"hit": 2, "miss": 1})
+
+        out = StringIO()
+        call_command("response_cache_stats", "--reset", stdout=out)
+
+        self.assertIn("actor: 2 hit(s), 1 miss(es), hit rate 66.7%",
+                      out.getvalue())
+        self.assertEqual(get_stats("actor"), {"hit": 0, "miss": 0})
+
+    def test_stats_warn_when_cache_is_not_shared(self):
+        err = StringIO()
+        call_command("response_cache_stats", stdout=StringIO(), stderr=err)
+
+        self.assertIn("not shared between processes", err.getvalue())
+
+    def test_stats_do_not_warn_for_a_shared_cache(self):
+        with tempfile.TemporaryDirectory() as location:
+            shared = {
+                "default": {
+                    "BACKEND": "django.core.cache.backends.filebased."
+                               "FileBasedCache",
+                    "LOCATION": location,
+                }
+            }
+            err = StringIO()
+            with override_settings(CACHES=shared):
+                call_command(
+                    "response_cache_stats", stdout=StringIO(), stderr=err
+                )
+
+        self.assertEqual(err.getvalue(), "")
@@ -0,0 +1,327 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from theatre_app.models import Performance, SeatHold
+from theatre_app.tests.tests_performance_theatre import sample_performance
+from theatre_app.tests.tests_seat_map_theatre import (decode_taken_seats,
+                                                      get_seat_map_url)
+from theatre_app.tests.tests_tickets_theatre import (sample_reservation,
+                                                     sample_ticket)
+
+SEAT_HOLD_URL = reverse("theatre:seathold-list")
+SEAT_HOLD_EXTEND_URL = reverse("theatre:seathold-extend")
+RESERVATION_URL = reverse("theatre:reservation-list")
+
+
+def sample_seat_hold(**params) -> SeatHold:
+    seat_hold_defaults = {
+        "row": 1,
+        "seat_number": 1,
+        "expires_at": SeatHold.next_expiry(),
+    }
+    seat_hold_defaults.update(params)
+
+    return SeatHold.objects.create(**seat_hold_defaults)
+
+
+class UnauthenticatedSeatHoldApiTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_auth_required(self):
+        response = self.client.get(SEAT_HOLD_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class AuthenticatedSeatHoldApiTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test_user@example.com",
+            password="password",
+        )
+        self.other_user = get_user_model().objects.create_user(
+            email="other_user@example.com",
+            password="password",
+        )
+        self.client.force_authenticate(self.user)
+        self.performance = sample_performance()
+
+    def hold_seats(self, *seats):
+        payload = {
+            "performance": self.performance.id,
+            "seats": [
+                {"row": row, "seat_number": seat_number}
+                for row, seat_number in seats
+            ],
+        }
+        return self.client.post(SEAT_HOLD_URL, payload, format="json")
+
+    def test_create_holds(self):
+        response = self.hold_seats((1, 1), (1, 2))
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), 2)
+        self.assertEqual(
+            SeatHold.objects.filter(user=self.user).count(), 2
+        )
+
+    def test_hold_seat_held_by_other_user_conflict(self):
+        sample_seat_hold(performance=self.performance, user=self.other_user)
+
+        response = self.hold_seats((1, 1), (1, 2))
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(
+            response.data["taken_seats"],
+            [{"performance": self.performance.id, "row": 1, "seat_number": 1}],
+        )
+        self.assertFalse(SeatHold.objects.filter(user=self.user).exists())
+
+    def test_hold_sold_seat_conflict(self):
+        sample_ticket(
+            reservation=sample_reservation(user=self.other_user),
+            performance=self.performance,
+            row=1,
+            seat_number=1,
+        )
+
+        response = self.hold_seats((1, 1))
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+    def test_expired_hold_is_taken_over(self):
+        sample_seat_hold(
+            performance=self.performance,
+            user=self.other_user,
+            expires_at=timezone.now() - timedelta(seconds=1),
+        )
+
+        response = self.hold_seats((1, 1))
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(SeatHold.objects.get().user, self.user)
+
+    def test_hold_seat_out_of_range(self):
+        response = self.hold_seats((99, 1))
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("row number must be in range", str(response.data))
+
+    def test_extend_holds(self):
+        hold = sample_seat_hold(
+            performance=self.performance,
+            user=self.user,
+            expires_at=timezone.now() + timedelta(seconds=30),
+        )
+
+        response = self.client.post(
+            SEAT_HOLD_EXTEND_URL, {"performance": self.performance.id}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        hold.refresh_from_db()
+        self.assertGreater(
+            hold.expires_at, timezone.now() + timedelta(minutes=1)
+        )
+
+    def test_release_hold(self):
+        hold = sample_seat_hold(performance=self.performance, user=self.user)
+
+        response = self.client.delete(
+            reverse("theatre:seathold-detail", args=[hold.id])
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(SeatHold.objects.exists())
+
+    def test_reservation_from_holds(self):
+        holds = [
+            sample_seat_hold(
+                performance=self.performance,
+                user=self.user,
+                seat_number=seat_number,
+            )
+            for seat_number in (1, 2)
+        ]
+
+        response = self.client.post(
+            RESERVATION_URL,
+            {"holds": [hold.id for hold in holds]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(SeatHold.objects.exists())
+        self.performance.refresh_from_db()
+        self.assertEqual(self.performance.tickets_sold, 2)
+
+    def test_reservation_from_other_users_hold_rejected(self):
+        hold = sample_seat_hold(
+            performance=self.performance, user=self.other_user
+        )
+
+        response = self.client.post(
+            RESERVATION_URL, {"holds": [hold.id]}, format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_reservation_of_seat_held_by_other_user_conflict(self):
+        sample_seat_hold(performance=self.performance, user=self.other_user)
+        payload = {
+            "tickets": [
+                {"row": 1, "seat_number": 1,
+                 "performance": self.performance.id}
+            ]
+        }
+
+        response = self.client.post(RESERVATION_URL, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+    def test_holds_and_sales_lock_the_performance_before_checking(self):
+        payload = {
+            "tickets": [
+                {"row": 2, "seat_number": 1,
+                 "performance": self.performance.id}
+            ]
+        }
+
+        for post, checked_table in (
+            (lambda: self.hold_seats((1, 1)), '"theatre_app_ticket"'),
+            (
+                lambda: self.client.post(
+                    RESERVATION_URL, payload, format="json"
+                ),
+                '"theatre_app_seathold"',
+            ),
+        ):
+            with self.subTest(checked_table=checked_table):
+                with CaptureQueriesContext(connection) as queries:
+                    response = post()
+                sql = [query["sql"] for query in queries]
+                lock = next(
+                    index for index, statement in enumerate(sql)
+                    if statement.endswith("FOR UPDATE")
+                    and '"theatre_app_performance"' in statement
+                )
+                check = next(
+                    index for index, statement in enumerate(sql)
+                    if statement.startswith("SELECT")
+                    and checked_table in statement
+                )
+
+                self.assertEqual(
+                    response.status_code, status.HTTP_201_CREATED
+                )
+                self.assertLess(lock, check)
+
+    def test_reservation_from_holds_rechecks_them_under_the_lock(self):
+        hold = sample_seat_hold(performance=self.performance, user=self.user)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                RESERVATION_URL, {"holds": [hold.id]}, format="json"
+            )
+        sql = [query["sql"] for query in queries]
+        lock = next(
+            index for index, statement in enumerate(sql)
+            if statement.endswith("FOR UPDATE")
+            and '"theatre_app_performance"' in statement
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(
+            any(
+                statement.startswith("SELECT")
+                and '"theatre_app_seathold"' in statement
+                for statement in sql[lock:]
+            )
+        )
+
+    def test_ticket_move_to_seat_held_by_other_user_conflict(self):
+        ticket = sample_ticket(
+            reservation=sample_reservation(user=self.user),
+            performance=self.performance,
+            row=1,
+            seat_number=1,
+        )
+        sample_seat_hold(
+            performance=self.performance, user=self.other_user, seat_number=2
+        )
+        sample_seat_hold(
+            performance=self.performance, user=self.user, seat_number=3
+        )
+        url = reverse("theatre:ticket-detail", args=[ticket.id])
+
+        held = self.client.patch(url, {"seat_number": 2})
+        own_hold = self.client.patch(url, {"seat_number": 3})
+
+        self.assertEqual(held.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(own_hold.status_code, status.HTTP_200_OK)
+        ticket.refresh_from_db()
+        self.assertEqual(ticket.seat_number, 3)
+        self.assertEqual(SeatHold.objects.count(), 1)
+
+    def test_holds_reduce_available_seats(self):
+        sample_seat_hold(performance=self.performance, user=self.other_user)
+        sample_seat_hold(
+            performance=self.performance,
+            user=self.other_user,
+            seat_number=2,
+            expires_at=timezone.now() - timedelta(seconds=1),
+        )
+        total_seats = self.performance.theatre_hall.total_seats
+
+        self.assertEqual(
+            Performance.objects.get(id=self.performance.id).available_seats,
+            total_seats - 1,
+        )
+        self.assertEqual(
+            Performance.objects.with_availability()
+            .get(id=self.performance.id)
+            .available_seats,
+            total_seats - 1,
+        )
+
+        response = self.client.get(get_seat_map_url(self.performance))
+        self.assertEqual(decode_taken_seats(response.data), {(1, 1)})
+
+
+class SweepSeatHoldsCommandTests(TestCase):
+
+    def test_sweep_seat_holds(self):
+        user = get_user_model().objects.create_user(
+            email="test_user@example.com",
+            password="password",
+        )
+        performance = sample_performance()
+        sample_seat_hold(performance=performance, user=user)
+        sample_seat_hold(
+            performance=performance,
+            user=user,
+            seat_number=2,
+            expires_at=timezone.now() - timedelta(seconds=1),
+        )
+
+        out = StringIO()
+        call_command("sweep_seat_holds", stdout=out)
+
+        self.assertIn("Swept 1 expired seat hold(s)", out.getvalue())
+        self.assertEqual(SeatHold.objects.count(), 1)
@@ -0,0 +1,151 @@
+import base64
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from theatre_app.models import Performance
+from theatre_app.response_cache import get_versions
+from theatre_app.seat_map import (pack_seats, seat_availability_scope,
+                                  seat_map_cache_key)
+from theatre_app.tests.tests_performance_theatre import (sample_performance,
+                                                         sample_theatre_hall)
+from theatre_app.tests.tests_tickets_theatre import (sample_reservation,
+                                                     sample_ticket)
+
+
+def get_seat_map_url(performance: Performance):
+    return reverse("theatre:performance-seat-map", args=[performance.id])
+
+
+def decode_taken_seats(seat_map):
+    bitmap = base64.b64decode(seat_map["bitmap"])
+    seats_per_row = seat_map["seats_per_row"]
+    taken = set()
+    for index in range(seat_map["rows"] * seats_per_row):
+        if bitmap[index >> 3] & (0x80 >> (index & 7)):
+            taken.add((index // seats_per_row + 1,
+                       index % seats_per_row + 1))
+    return taken
+
+
+class PackSeatsTests(TestCase):
+
+    def test_pack_seats_row_major_msb_first(self):
+        bitmap = pack_seats(2, 5, [(1, 1), (2, 5), (3, 1)])
+
+        self.assertEqual(bitmap, bytes([0b10000000, 0b01000000]))
+
+
+class SeatMapApiTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test_user@example.com",
+            password="password",
+        )
+        self.performance = sample_performance(
+            theatre_hall=sample_theatre_hall(rows=3, seats_per_row=4)
+        )
+        self.reservation = sample_reservation(user=self.user)
+
+    def test_seat_map(self):
+        sample_ticket(
+            reservation=self.reservation,
+            performance=self.performance,
+            row=2,
+            seat_number=3,
+        )
+
+        response = self.client.get(get_seat_map_url(self.performance))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["rows"], 3)
+        self.assertEqual(response.data["seats_per_row"], 4)
+        self.assertEqual(response.data["available_seats"], 11)
+        self.assertEqual(decode_taken_seats(response.data), {(2, 3)})
+
+    def test_seat_map_is_cached(self):
+        url = get_seat_map_url(self.performance)
+        self.client.get(url)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_seat_map_invalidated_on_ticket_change(self):
+        url = get_seat_map_url(self.performance)
+        self.client.get(url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ticket_obj = sample_ticket(
+                reservation=self.reservation,
+                performance=self.performance,
+                row=1,
+                seat_number=1,
+            )
+        response = self.client.get(url)
+        self.assertEqual(decode_taken_seats(response.data), {(1, 1)})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ticket_obj.delete()
+        response = self.client.get(url)
+        self.assertEqual(decode_taken_seats(response.data), set())
+
+    def test_seat_map_invalidated_on_seat_move(self):
+        ticket_obj = sample_ticket(
+            reservation=self.reservation,
+            performance=self.performance,
+            row=1,
+            seat_number=1,
+        )
+        url = get_seat_map_url(self.performance)
+        self.client.get(url)
+        self.client.force_authenticate(self.user)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            patched = self.client.patch(
+                reverse("theatre:ticket-detail", args=[ticket_obj.id]),
+                {"row": 2, "seat_number": 3},
+            )
+        response = self.client.get(url)
+
+        self.assertEqual(patched.status_code, status.HTTP_200_OK)
+        self.assertEqual(decode_taken_seats(response.data), {(2, 3)})
+        self.assertEqual(response.data["available_seats"], 11)
+
+    def test_stale_map_written_after_commit_is_not_served(self):
+        url = get_seat_map_url(self.performance)
+        stale = self.client.get(url).data
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            sample_ticket(
+                reservation=self.reservation,
+                performance=self.performance,
+                row=1,
+                seat_number=1,
+            )
+        (version,) = get_versions(
+            [seat_availability_scope(self.performance.id)]
+        )
+        for callback in callbacks:
+            callback()
+        # A reader that fetched the version before the sale committed
+        # stores the map it built from the old snapshot.
+        cache.set(seat_map_cache_key(self.performance.id, version), stale)
+        response = self.client.get(url)
+
+        self.assertEqual(decode_taken_seats(response.data), {(1, 1)})
+
+    def test_seat_map_not_found(self):
+        response = self.client.get(
+            reverse("theatre:performance-seat-map", args=[0])
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -1,15 +1,22 @@
+import json
+from datetime import datetime, timezone
+
 from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError as DjangoValidationError
 from django.test import TestCase
 from rest_framework import status
+from rest_framework.exceptions import ValidationError
 from rest_framework.reverse import reverse
 from rest_framework.test import APIClient
 
-from theatre_app.models import Reservation, Ticket
+from theatre_app.models import Reservation, SeatHold, TheatreHall, Ticket
+from theatre_app.response_cache import bump_version
 from theatre_app.serializers import (TicketDetailSerializer,
                                      TicketListSerializer, TicketSerializer)
 from theatre_app.tests.tests_performance_theatre import sample_performance
 
 TICKET_URL = reverse("theatre:ticket-list")
+TICKET_EXPORT_URL = reverse("theatre:ticket-export")
 
 
 def sample_reservation(**params) -> Reservation:
@@ -77,6 +84,80 @@ class AuthenticatedTicketApiTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["results"], serializer.data)
 
+    def test_tickets_list_scoped_to_user(self):
+        other_user = get_user_model().objects.create_user(
+            email="other_user@example.com",
+            password="password",
+        )
+        performance_obj = sample_performance()
+        own_ticket = sample_ticket(
+            reservation=sample_reservation(user=self.user),
+            performance=performance_obj,
+            row=1,
+        )
+        other_ticket = sample_ticket(
+            reservation=sample_reservation(user=other_user),
+            performance=performance_obj,
+            row=2,
+        )
+
+        response = self.client.get(TICKET_URL)
+        detail_response = self.client.get(get_ticket_detail_url(other_ticket))
+
+        self.assertEqual(
+            [ticket["id"] for ticket in response.data["results"]],
+            [own_ticket.id],
+        )
+        self.assertEqual(
+            detail_response.status_code, status.HTTP_404_NOT_FOUND
+        )
+
+    def test_tickets_list_all_requires_admin(self):
+        response = self.client.get(TICKET_URL, {"scope": "all"})
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_tickets_list_all_for_admin(self):
+        admin = get_user_model().objects.create_superuser(
+            email="admin@example.com",
+            password="password",
+        )
+        performance_obj = sample_performance()
+        for row, user in enumerate((self.user, admin), start=1):
+            sample_ticket(
+                reservation=sample_reservation(user=user),
+                performance=performance_obj,
+                row=row,
+            )
+        self.client.force_authenticate(admin)
+
+        response = self.client.get(TICKET_URL, {"scope": "all"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 2)
+
+    def test_tickets_list_counts_held_seats(self):
+        performance_obj = sample_performance()
+        sample_ticket(
+            reservation=sample_reservation(user=self.user),
+            performance=performance_obj,
+        )
+        SeatHold.objects.create(
+            performance=performance_obj,
+            user=self.user,
+            row=1,
+            seat_number=1,
+            expires_at=SeatHold.next_expiry(),
+        )
+
+        with self.assertNumQueries(2):
+            response = self.client.get(TICKET_URL)
+
+        self.assertEqual(
+            response.data["results"][0]["performance"]["available_seats"],
+            performance_obj.theatre_hall.total_seats - 2,
+        )
+
     def test_retrieve_ticket_detail(self):
         reservation_obj = sample_reservation(user=self.user)
         performance_obj = sample_performance()
@@ -170,3 +251,191 @@ class AdminPlayTests(TestCase):
             is_staff=True,
         )
         self.client.force_authenticate(self.user)
+
+
+class TicketValidatedSaveTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test_user@example.com",
+            password="password",
+        )
+        self.performance = sample_performance()
+        self.reservation = sample_reservation(user=self.user)
+
+    def test_orm_save_still_validates(self):
+        ticket = Ticket(
+            reservation=self.reservation,
+            performance=self.performance,
+            row=self.performance.theatre_hall.rows + 1,
+            seat_number=1,
+        )
+
+        with self.assertRaises(ValidationError):
+            ticket.save()
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_orm_save_rejects_taken_seat(self):
+        sample_ticket(
+            reservation=self.reservation, performance=self.performance
+        )
+
+        with self.assertRaises(DjangoValidationError):
+            sample_ticket(
+                reservation=self.reservation, performance=self.performance
+            )
+
+    def test_validated_save_skips_lookups(self):
+        ticket = sample_ticket(
+            reservation=self.reservation, performance=self.performance
+        )
+        ticket = Ticket.objects.get(pk=ticket.pk)
+        ticket.row = 1
+
+        # The UPDATE inside its savepoint, the performance did not change.
+        with self.assertNumQueries(3):
+            ticket.save(validate=False)
+
+    def test_geometry_cached_until_hall_saved(self):
+        theatre_hall = self.performance.theatre_hall
+        TheatreHall.get_geometry(theatre_hall.id)
+
+        with self.assertNumQueries(0):
+            geometry = TheatreHall.get_geometry(theatre_hall.id)
+        self.assertEqual(
+            geometry, (theatre_hall.rows, theatre_hall.seats_per_row)
+        )
+
+        theatre_hall.rows = 3
+        theatre_hall.save()
+
+        self.assertEqual(TheatreHall.get_geometry(theatre_hall.id).rows, 3)
+
+    def test_geometry_follows_hall_edits_of_other_workers(self):
+        theatre_hall = self.performance.theatre_hall
+        TheatreHall.get_geometry(theatre_hall.id)
+
+        # Another worker saving the hall updates the row and bumps the
+        # shared TheatreHall version; nothing is cleared in this one.
+        TheatreHall.objects.filter(pk=theatre_hall.pk).update(rows=3)
+        bump_version(TheatreHall)
+
+        self.assertEqual(TheatreHall.get_geometry(theatre_hall.id).rows, 3)
+
+
+class TicketExportTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = get_user_model().objects.create_superuser(
+            email="admin@example.com",
+            password="password",
+        )
+        self.client.force_authenticate(self.admin)
+        self.user = get_user_model().objects.create_user(
+            email="buyer@example.com",
+            password="password",
+        )
+        self.reservation = sample_reservation(user=self.user)
+        self.performance = sample_performance()
+        self.tickets = [
+            sample_ticket(
+                reservation=self.reservation,
+                performance=self.performance,
+                row=1,
+                seat_number=seat_number,
+            )
+            for seat_number in (2, 1)
+        ]
+
+    def export(self, **params):
+        response = self.client.get(TICKET_EXPORT_URL, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return response, b"".join(response.streaming_content).decode()
+
+    def test_export_csv(self):
+        response, content = self.export(format="csv")
+
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertIn("tickets.csv", response["Content-Disposition"])
+        lines = content.splitlines()
+        self.assertEqual(
+            lines[0],
+            "ticket,performance,show_time,row,seat,reservation,user_email",
+        )
+        self.assertEqual(
+            lines[1],
+            f"{self.tickets[1].id},{self.performance.id},"
+            f"2025-12-31T00:00:00Z,1,1,{self.reservation.id},"
+            f"buyer@example.com",
+        )
+        self.assertEqual(len(lines), 3)
+
+    def test_export_ndjson(self):
+        response, content = self.export(format="ndjson")
+
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertEqual(
+            [row["seat"] for row in rows], [1, 2]
+        )
+        self.assertEqual(rows[0]["user_email"], "buyer@example.com")
+        self.assertEqual(rows[0]["show_time"], "2025-12-31T00:00:00Z")
+
+    def test_export_filters(self):
+        other_performance = sample_performance(
+            show_time=datetime(2026, 1, 2, 19, tzinfo=timezone.utc)
+        )
+        sample_ticket(
+            reservation=self.reservation, performance=other_performance
+        )
+
+        _, by_performance = self.export(
+            format="ndjson", performance=other_performance.id
+        )
+        _, by_date = self.export(
+            format="ndjson", date_from="2026-01-01", date_to="2026-01-02"
+        )
+
+        self.assertEqual(len(by_performance.splitlines()), 1)
+        self.assertEqual(by_date, by_performance)
+
+    def test_export_invalid_filter(self):
+        response = self.client.get(
+            TICKET_EXPORT_URL, {"format": "csv", "performance": "abc"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_errors_are_json(self):
+        for export_format, field in (
+            ("csv", "date_from"),
+            ("ndjson", "date_to"),
+        ):
+            with self.subTest(export_format=export_format):
+                response = self.client.get(
+                    TICKET_EXPORT_URL, {"format": export_format, field: "x"}
+                )
+
+                self.assertEqual(
+                    response.status_code, status.HTTP_400_BAD_REQUEST
+                )
+                self.assertEqual(
+                    response["Content-Type"], "application/json"
+                )
+                self.assertIn(field, response.json())
+
+        self.client.force_authenticate(self.user)
+        response = self.client.get(TICKET_EXPORT_URL, {"format": "csv"})
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertIn("detail", response.json())
+
+    def test_export_admin_only(self):
+        self.client.force_authenticate(self.user)
+
+        response = self.client.get(TICKET_EXPORT_URL, {"format": "csv"})
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
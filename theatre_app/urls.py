@@ -3,9 +3,14 @@ from drf_spectacular.views import (SpectacularAPIView, SpectacularRedocView,
                                    SpectacularSwaggerView)
 from rest_framework import routers
 
-from theatre_app.views import (ActorViewSet, GenreViewSet, PerformanceViewSet,
-                               PlayViewSet, ReservationViewSet,
-                               TheatreHallViewSet, TicketViewSet)
+from theatre_app.async_views import (AsyncPerformanceDetailView,
+                                     AsyncPerformanceListView,
+                                     AsyncPlayListView, AsyncSeatMapView)
+from theatre_app.views import (ActorViewSet, GenreViewSet, OccupancyViewSet,
+                               PerformanceViewSet, PlayViewSet,
+                               ReservationViewSet,
+                               SeatHoldViewSet, TheatreHallViewSet,
+                               TicketViewSet)
 
 app_name = "theatre"
 
@@ -18,6 +23,8 @@ default_router.register("plays", PlayViewSet)
 default_router.register("performances", PerformanceViewSet)
 default_router.register("tickets", TicketViewSet)
 default_router.register("reservations", ReservationViewSet)
+default_router.register("seat-holds", SeatHoldViewSet, basename="seathold")
+default_router.register("analytics/occupancy", OccupancyViewSet)
 
 urlpatterns = [
     path("schema/", SpectacularAPIView.as_view(), name="schema"),
@@ -31,4 +38,24 @@ urlpatterns = [
       SpectacularRedocView.as_view(url_name="theatre:schema"),
       name="redoc",
     ),
+    path(
+      "async/performances/",
+      AsyncPerformanceListView.as_view(),
+      name="async-performance-list",
+    ),
+    path(
+      "async/performances/<int:pk>/",
+      AsyncPerformanceDetailView.as_view(),
+      name="async-performance-detail",
+    ),
+    path(
+      "async/performances/<int:pk>/seat-map/",
+      AsyncSeatMapView.as_view(),
+      name="async-performance-seat-map",
+    ),
+    path(
+      "async/plays/",
+      AsyncPlayListView.as_view(),
+      name="async-play-list",
+    ),
 ] + default_router.urls
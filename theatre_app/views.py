@@ -1,59 +1,273 @@
-from datetime import datetime
+import hashlib
+from calendar import monthrange
+from datetime import datetime, time, timedelta
 
+from django.contrib.postgres.search import (SearchQuery, SearchRank,
+                                            TrigramSimilarity)
+from django.core.cache import cache
+from django.db.models import (Exists, F, FloatField, Min, OuterRef, Prefetch,
+                              Q)
+from django.db.models.functions import Cast, NullIf
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import OpenApiParameter, extend_schema
-from rest_framework import mixins, viewsets
-from rest_framework.permissions import IsAuthenticated
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import (NotFound, PermissionDenied,
+                                       ValidationError)
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 
-from theatre_app.models import (Actor,
+from theatre_app.analytics import fold_occupancy_deltas
+from theatre_app.conditional import ConditionalGetMixin
+from theatre_app.exports import (EXPORT_STREAMS, CSVExportRenderer,
+                                 NDJSONExportRenderer, iter_ticket_rows)
+from theatre_app.fieldsets import is_field_requested
+from theatre_app.models import (SEARCH_CONFIG,
+                                Actor,
                                 Genre,
+                                Occupancy,
+                                OccupancyDelta,
                                 Performance,
                                 Play,
+                                PlaySimilarity,
                                 Reservation,
+                                SeatHold,
                                 TheatreHall,
-                                Ticket)
+                                Ticket,
+                                play_cast_prefetches)
+from theatre_app.pagination import OptInCursorPagination
 from theatre_app.permissions import IsAdminOrIfAuthenticatedReadOnly
+from theatre_app.response_cache import (RESPONSE_CACHE_TIMEOUT,
+                                        CachedResponseMixin, get_versions)
+from theatre_app.seat_map import (get_cached_seat_map, get_seat_map,
+                                  invalidate_seat_maps,
+                                  seat_availability_scope)
 from theatre_app.serializers import (ActorSerializer, GenreSerializer,
+                                     OccupancySerializer,
+                                     PerformanceCalendarSerializer,
                                      PerformanceDetailSerializer,
                                      PerformanceListSerializer,
                                      PerformanceSerializer,
                                      PlayDetailSerializer, PlayListSerializer,
                                      PlaySerializer,
+                                     PlaySimilaritySerializer,
                                      ReservationDetailSerializer,
                                      ReservationListSerializer,
+                                     ReservationNormalizedSerializer,
                                      ReservationSerializer,
+                                     SeatHoldCreateSerializer,
+                                     SeatHoldExtendSerializer,
+                                     SeatHoldSerializer,
+                                     SeatMapSerializer,
                                      TheatreHallSerializer,
                                      TicketDetailSerializer,
                                      TicketListSerializer,
-                                     TicketSerializer)
+                                     TicketSerializer, serialize_included)
 
 
-class TheatreHallViewSet(viewsets.ModelViewSet):
+NORMALIZED_SHAPE_PARAMETER = OpenApiParameter(
+    name="shape",
+    description=(
+        "Return tickets with performance ids and each performance, play "
+        "and hall once in a top-level `included` section "
+        "(ex. ?shape=normalized)"
+    ),
+    type=OpenApiTypes.STR,
+    enum=["normalized"],
+)
+
+
+def _params_to_ints(qs):
+    return [int(str_id) for str_id in qs.split(",")]
+
+
+def _day_start(date):
+    return timezone.make_aware(datetime.combine(date, time.min))
+
+
+def _parse_month(value):
+    return datetime.strptime(value, "%Y-%m").date()
+
+
+def _query_param(request, name, parse):
+    value = request.query_params.get(name)
+    if not value:
+        return None
+
+    try:
+        parsed = parse(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValidationError({name: f"Invalid value {value!r}."})
+    if isinstance(parsed, datetime) and timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def filter_plays(request, queryset):
+    """Apply the play list filters and search of the query string."""
+    title = request.query_params.get("title")
+    genres_ids = _query_param(request, "genres", _params_to_ints)
+    actors_ids = _query_param(request, "actors", _params_to_ints)
+    search = request.query_params.get("q")
+
+    if title:
+        queryset = queryset.filter(title__icontains=title)
+
+    if search:
+        query = SearchQuery(
+            search, config=SEARCH_CONFIG, search_type="websearch"
+        )
+        queryset = queryset.filter(
+            Q(search_vector=query) | Q(title__trigram_similar=search)
+        ).annotate(
+            rank=SearchRank(F("search_vector"), query),
+            similarity=TrigramSimilarity("title", search),
+        ).order_by("-rank", "-similarity", "id")
+
+    if genres_ids:
+        queryset = queryset.filter(
+            Exists(
+                Play.genres.through.objects.filter(
+                    play_id=OuterRef("pk"), genre_id__in=genres_ids
+                )
+            )
+        )
+
+    if actors_ids:
+        queryset = queryset.filter(
+            Exists(
+                Play.actors.through.objects.filter(
+                    play_id=OuterRef("pk"), actor_id__in=actors_ids
+                )
+            )
+        )
+
+    return queryset
+
+
+def filter_performances(request, queryset):
+    """Apply the performance filters of the query string.
+
+    Date filters compile to half-open show_time ranges so they can
+    use the (play, show_time) and (theatre_hall, show_time) indexes.
+    """
+    date = _query_param(request, "date", parse_date)
+    date_from = _query_param(request, "date_from", parse_date)
+    date_to = _query_param(request, "date_to", parse_date)
+    show_time_from = _query_param(request, "show_time_from", parse_datetime)
+    show_time_to = _query_param(request, "show_time_to", parse_datetime)
+
+    if date:
+        date_from = date_to = date
+
+    if date_from:
+        queryset = queryset.filter(show_time__gte=_day_start(date_from))
+
+    if date_to:
+        queryset = queryset.filter(
+            show_time__lt=_day_start(date_to + timedelta(days=1))
+        )
+
+    if show_time_from:
+        queryset = queryset.filter(show_time__gte=show_time_from)
+
+    if show_time_to:
+        queryset = queryset.filter(show_time__lt=show_time_to)
+
+    return filter_performance_catalog(request, queryset)
+
+
+def filter_performance_catalog(request, queryset):
+    """Apply the play, theatre hall and genre filters of the query string."""
+    play_id = _query_param(request, "play", int)
+    theatre_hall_id = _query_param(request, "theatre_hall", int)
+    genres_ids = _query_param(request, "genres", _params_to_ints)
+
+    if play_id is not None:
+        queryset = queryset.filter(play_id=play_id)
+
+    if theatre_hall_id is not None:
+        queryset = queryset.filter(theatre_hall_id=theatre_hall_id)
+
+    if genres_ids:
+        queryset = queryset.filter(
+            Exists(
+                Play.genres.through.objects.filter(
+                    play_id=OuterRef("play_id"), genre_id__in=genres_ids
+                )
+            )
+        )
+
+    return queryset
+
+
+def select_performance_list_fields(request, queryset):
+    """Join and annotate only what the requested list fields need."""
+    with_availability = is_field_requested(request, "available_seats")
+    if is_field_requested(request, "play_title"):
+        queryset = queryset.select_related("play")
+    if with_availability or is_field_requested(request, "theatre_hall_name"):
+        queryset = queryset.select_related("theatre_hall")
+    if with_availability:
+        queryset = queryset.with_availability()
+    return queryset
+
+
+def select_performance_detail_fields(request, queryset):
+    """Join and prefetch only what the requested detail fields need."""
+    if is_field_requested(request, "play"):
+        queryset = queryset.select_related("play").prefetch_related(
+            *play_cast_prefetches("play__")
+        )
+    if is_field_requested(request, "theatre_hall"):
+        queryset = queryset.select_related("theatre_hall")
+    return queryset
+
+
+class TheatreHallViewSet(
+    ConditionalGetMixin, CachedResponseMixin, viewsets.ModelViewSet
+):
     queryset = TheatreHall.objects.all()
+    cache_models = (TheatreHall,)
+    validator_sources = (TheatreHall,)
     serializer_class = TheatreHallSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
 
 
-class ActorViewSet(viewsets.ModelViewSet):
+class ActorViewSet(
+    ConditionalGetMixin, CachedResponseMixin, viewsets.ModelViewSet
+):
     queryset = Actor.objects.all()
+    cache_models = (Actor,)
+    validator_sources = (Actor,)
     serializer_class = ActorSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
 
 
-class GenreViewSet(viewsets.ModelViewSet):
+class GenreViewSet(
+    ConditionalGetMixin, CachedResponseMixin, viewsets.ModelViewSet
+):
     queryset = Genre.objects.all()
+    cache_models = (Genre,)
+    validator_sources = (Genre,)
     serializer_class = GenreSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
 
 
-class PlayViewSet(viewsets.ModelViewSet):
+class PlayViewSet(
+    ConditionalGetMixin, CachedResponseMixin, viewsets.ModelViewSet
+):
     queryset = Play.objects.all()
+    cache_models = (Play, Actor, Genre)
+    validator_sources = (Play, Actor, Genre)
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
-
-    @staticmethod
-    def _params_to_ints(qs):
-        return [int(str_id) for str_id in qs.split(",")]
+    lookup_value_regex = r"\d+"
 
     @extend_schema(
         parameters=[
@@ -72,8 +286,17 @@ class PlayViewSet(viewsets.ModelViewSet):
                 description="Filter by movie title (ex. ?title=fiction)",
                 type=OpenApiTypes.STR,
             ),
+            OpenApiParameter(
+                name="q",
+                description=(
+                    "Full-text search over title, description, actors and "
+                    "genres, tolerant to typos in the title; results are "
+                    "ranked by relevance (ex. ?q=hamlet)"
+                ),
+                type=OpenApiTypes.STR,
+            ),
         ],
-        description="Filters plays by genres, actors and title.",
+        description="Filters plays by genres, actors, title and search.",
         auth=None,
         operation_id=None,
         operation=None,
@@ -81,11 +304,30 @@ class PlayViewSet(viewsets.ModelViewSet):
     def list(self, request):
         return super().list(request)
 
+    @extend_schema(
+        responses=PlaySimilaritySerializer(many=True),
+        description=(
+            "Plays sharing the most actors, genres and reservations with "
+            "this one, best first, as of the last refresh_similar_plays."
+        ),
+    )
+    @action(detail=True, methods=["get"])
+    def similar(self, request, pk=None):
+        similarities = PlaySimilarity.objects.filter(
+            play_id=pk
+        ).select_related("similar_play").order_by("rank")
+        serializer = self.get_serializer(similarities, many=True)
+        if not serializer.data and not Play.objects.filter(pk=pk).exists():
+            raise NotFound
+        return Response(serializer.data)
+
     def get_serializer(self, *args, **kwargs):
         if self.action == "retrieve":
             self.serializer_class = PlayDetailSerializer
         elif self.action == "list":
             self.serializer_class = PlayListSerializer
+        elif self.action == "similar":
+            self.serializer_class = PlaySimilaritySerializer
         else:
             self.serializer_class = PlaySerializer
 
@@ -93,42 +335,103 @@ class PlayViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         """Retrieve the play with filters"""
-        title = self.request.query_params.get("title")
-        genres = self.request.query_params.get("genres")
-        actors = self.request.query_params.get("actors")
+        queryset = filter_plays(self.request, self.queryset)
 
-        queryset = self.queryset
+        if self.action in ("list", "retrieve"):
+            queryset = queryset.with_cast(
+                actors=is_field_requested(self.request, "actors"),
+                genres=is_field_requested(self.request, "genres"),
+            )
 
-        if title:
-            queryset = queryset.filter(title__icontains=title)
+        return queryset
 
-        if genres:
-            genres_ids = self._params_to_ints(genres)
-            queryset = queryset.filter(genres__id__in=genres_ids)
 
-        if actors:
-            actors_ids = self._params_to_ints(actors)
-            queryset = queryset.filter(actors__id__in=actors_ids)
+class PerformanceViewSet(
+    ConditionalGetMixin, CachedResponseMixin, viewsets.ModelViewSet
+):
+    queryset = Performance.objects.all()
+    permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    pagination_class = OptInCursorPagination
+    cursor_ordering = ("show_time", "id")
+    validator_sources = (Performance, Play, TheatreHall, Actor, Genre)
+    cache_models = validator_sources
+    cached_actions = ("calendar",)
+    calendar_max_days = 62
 
-        return queryset.distinct()
+    def shows_availability(self):
+        return self.action == "calendar" or (
+            self.action == "list"
+            and is_field_requested(self.request, "available_seats")
+        )
 
+    def get_shown_availability(self):
+        """Return the ids of performances whose availability is rendered.
 
-class PerformanceViewSet(viewsets.ModelViewSet):
-    queryset = Performance.objects.all()
-    permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+        Comes with the count and next expiry of their active holds,
+        which lower availability until they silently expire. The list
+        page is read here and reused by ``paginate_queryset``; the
+        calendar's come from ``get_calendar_state``.
+        """
+        if hasattr(self, "_shown_availability"):
+            return self._shown_availability
+        if self.action == "calendar":
+            self._shown_availability = self.get_calendar_state()
+            return self._shown_availability
 
-    def get_queryset(self):
-        date = self.request.query_params.get("date")
-        play_id_str = self.request.query_params.get("play")
+        performances = ()
+        if self.shows_availability():
+            performances = [
+                (performance.id, performance.held_seats,
+                 performance.next_hold_expiry)
+                for performance in self.paginate_queryset(
+                    self.filter_queryset(self.get_queryset())
+                )
+            ]
 
-        queryset = self.queryset
+        performances = sorted(performances)
+        self._shown_availability = (
+            tuple(performance_id for performance_id, _, _ in performances),
+            sum(held_seats for _, held_seats, _ in performances),
+            min(
+                (expiry for _, _, expiry in performances if expiry),
+                default=None,
+            ),
+        )
+        return self._shown_availability
+
+    def get_validator_sources(self):
+        performance_ids = self.get_shown_availability()[0]
+        return self.validator_sources + tuple(
+            seat_availability_scope(performance_id)
+            for performance_id in performance_ids
+        )
+
+    def get_validator_extra(self):
+        return self.get_shown_availability()
+
+    def get_cache_models(self):
+        return self.get_validator_sources()
+
+    def get_cache_extra(self):
+        return self.get_validator_extra()
+
+    def paginate_queryset(self, queryset):
+        if not hasattr(self, "_page"):
+            self._page = super().paginate_queryset(queryset)
+        return self._page
 
-        if date:
-            date = datetime.strptime(date, "%Y-%m-%d").date()
-            queryset = queryset.filter(show_time__date=date)
+    def get_queryset(self):
+        """Retrieve performances with filters."""
+        queryset = filter_performances(self.request, self.queryset)
 
-        if play_id_str:
-            queryset = queryset.filter(play_id=int(play_id_str))
+        if self.action == "list":
+            queryset = select_performance_list_fields(self.request, queryset)
+        if self.shows_availability():
+            queryset = queryset.with_next_hold_expiry()
+        elif self.action == "retrieve":
+            queryset = select_performance_detail_fields(
+                self.request, queryset
+            )
 
         return queryset
 
@@ -145,8 +448,46 @@ class PerformanceViewSet(viewsets.ModelViewSet):
                 required=False,
                 type=OpenApiTypes.DATE,
             ),
+            OpenApiParameter(
+                name="date_from",
+                description="Shows from this day (ex. ?date_from=2022-10-23)",
+                type=OpenApiTypes.DATE,
+            ),
+            OpenApiParameter(
+                name="date_to",
+                description="Shows until this day (ex. ?date_to=2022-10-30)",
+                type=OpenApiTypes.DATE,
+            ),
+            OpenApiParameter(
+                name="show_time_from",
+                description=(
+                    "Shows at or after this time "
+                    "(ex. ?show_time_from=2022-10-23T18:00)"
+                ),
+                type=OpenApiTypes.DATETIME,
+            ),
+            OpenApiParameter(
+                name="show_time_to",
+                description=(
+                    "Shows before this time "
+                    "(ex. ?show_time_to=2022-10-23T22:00)"
+                ),
+                type=OpenApiTypes.DATETIME,
+            ),
+            OpenApiParameter(
+                name="theatre_hall",
+                description="Filter by theatre hall id (ex. ?theatre_hall=2)",
+                type=OpenApiTypes.INT,
+            ),
+            OpenApiParameter(
+                name="genres",
+                description="Filter by play genre id (ex. ?genres=2,5)",
+                type={"type": "list", "items": {"type": "number"}},
+            ),
         ],
-        description="Filters performances by plays and datetime.",
+        description=(
+            "Filters performances by plays, halls, genres and show time."
+        ),
         auth=None,
         operation_id=None,
         operation=None,
@@ -154,6 +495,207 @@ class PerformanceViewSet(viewsets.ModelViewSet):
     def list(self, request):
         return super().list(request)
 
+    def filter_calendar_range(self, date_from, date_to):
+        """Performances of the calendar range.
+
+        Built apart from get_queryset, whose date filters would narrow
+        or shift the range; only play, hall and genre filters apply.
+        """
+        queryset = self.queryset.filter(
+            show_time__gte=_day_start(date_from),
+            show_time__lt=_day_start(date_to + timedelta(days=1)),
+        )
+        return filter_performance_catalog(self.request, queryset)
+
+    def get_calendar_queryset(self, date_from, date_to):
+        """Performances of the calendar range, with their availability."""
+        return (
+            self.filter_calendar_range(date_from, date_to)
+            .select_related("play", "theatre_hall")
+            .with_availability()
+        )
+
+    def get_calendar_state(self):
+        """Return the calendar's performance ids and next hold expiry.
+
+        Both are kept in the shared cache, so a cached calendar or a
+        304 costs no query. The ids only change with the catalog
+        versions and the expiry with the seat availability versions of
+        those performances, or once it has passed. Versions are read
+        before the rows, so rows read after a change are stored under
+        its version and never under the old one.
+        """
+        date_from, date_to = self.get_calendar_range(self.request)
+        digest = hashlib.md5(
+            self.request.get_full_path().encode(), usedforsecurity=False
+        ).hexdigest()
+
+        versions = get_versions(self.validator_sources)
+        ids_key = (
+            f"theatre:calendar:{digest}:ids:{'.'.join(map(str, versions))}"
+        )
+        performance_ids = cache.get(ids_key)
+        if performance_ids is None:
+            performances = sorted(
+                self.filter_calendar_range(date_from, date_to)
+                .with_next_hold_expiry()
+                .values_list("id", "next_hold_expiry")
+            )
+            performance_ids = tuple(
+                performance_id for performance_id, _ in performances
+            )
+            cache.set(ids_key, performance_ids, RESPONSE_CACHE_TIMEOUT)
+            # The availability versions were not read before these rows.
+            next_expiry = min(
+                (expiry for _, expiry in performances if expiry),
+                default=None,
+            )
+            return performance_ids, next_expiry
+
+        versions = get_versions(
+            seat_availability_scope(performance_id)
+            for performance_id in performance_ids
+        )
+        expiry_key = "theatre:calendar:holds:" + hashlib.md5(
+            repr((performance_ids, versions)).encode(),
+            usedforsecurity=False,
+        ).hexdigest()
+        now = timezone.now()
+        cached = cache.get(expiry_key)
+        if cached is not None and (cached[0] is None or cached[0] > now):
+            return performance_ids, cached[0]
+
+        next_expiry = SeatHold.objects.active().filter(
+            performance_id__in=performance_ids
+        ).aggregate(next_expiry=Min("expires_at"))["next_expiry"]
+        timeout = RESPONSE_CACHE_TIMEOUT
+        if next_expiry is not None:
+            timeout = min(timeout, int((next_expiry - now).total_seconds()))
+        if timeout > 0:
+            cache.set(expiry_key, (next_expiry,), timeout)
+        return performance_ids, next_expiry
+
+    def get_calendar_range(self, request):
+        for param in ("date", "show_time_from", "show_time_to"):
+            if param in request.query_params:
+                raise ValidationError(
+                    {param: "Pass month, or date_from and date_to."}
+                )
+        month = _query_param(request, "month", _parse_month)
+        date_from = _query_param(request, "date_from", parse_date)
+        date_to = _query_param(request, "date_to", parse_date)
+
+        if month and (date_from or date_to):
+            raise ValidationError(
+                {"month": "Pass either month or date_from and date_to."}
+            )
+        if not (date_from or date_to):
+            month = month or timezone.localdate().replace(day=1)
+            date_from = month
+            date_to = month.replace(day=monthrange(month.year, month.month)[1])
+        elif not (date_from and date_to):
+            raise ValidationError(
+                {"date_to": "date_from and date_to go together."}
+            )
+
+        days = (date_to - date_from).days + 1
+        if not 1 <= days <= self.calendar_max_days:
+            raise ValidationError(
+                {
+                    "date_to": "The range must span 1 to "
+                    f"{self.calendar_max_days} days."
+                }
+            )
+        return date_from, date_to
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="month",
+                description="Whole month, the current one by default "
+                "(ex. ?month=2022-10)",
+                type=OpenApiTypes.STR,
+            ),
+            OpenApiParameter(
+                name="date_from",
+                description="First day (ex. ?date_from=2022-10-23)",
+                type=OpenApiTypes.DATE,
+            ),
+            OpenApiParameter(
+                name="date_to",
+                description="Last day (ex. ?date_to=2022-10-30)",
+                type=OpenApiTypes.DATE,
+            ),
+            OpenApiParameter(
+                name="play",
+                description="Filter by play id (ex. ?play=2)",
+                type=OpenApiTypes.INT,
+            ),
+            OpenApiParameter(
+                name="theatre_hall",
+                description="Filter by theatre hall id (ex. ?theatre_hall=2)",
+                type=OpenApiTypes.INT,
+            ),
+            OpenApiParameter(
+                name="genres",
+                description="Filter by play genre id (ex. ?genres=2,5)",
+                type={"type": "list", "items": {"type": "number"}},
+            ),
+        ],
+        responses=PerformanceCalendarSerializer,
+        description=(
+            "Performances of every day in a month or in a range of at most "
+            "62 days, read in one query and served from the response cache."
+        ),
+    )
+    @action(detail=False, methods=["get"], pagination_class=None)
+    def calendar(self, request):
+        date_from, date_to = self.get_calendar_range(request)
+
+        def render():
+            performances = self.get_calendar_queryset(
+                date_from, date_to
+            ).order_by("show_time", "id")
+
+            days = {
+                date_from + timedelta(days=offset): []
+                for offset in range((date_to - date_from).days + 1)
+            }
+            for performance in performances:
+                days[timezone.localdate(performance.show_time)].append(
+                    performance
+                )
+
+            serializer = PerformanceCalendarSerializer(
+                {
+                    "date_from": date_from,
+                    "date_to": date_to,
+                    "days": [
+                        {"date": date, "performances": day}
+                        for date, day in days.items()
+                    ],
+                },
+                context=self.get_serializer_context(),
+            )
+            return Response(serializer.data)
+
+        return self.conditional_response(
+            request, lambda: self.cached_response(request, render)
+        )
+
+    @extend_schema(
+        responses=SeatMapSerializer,
+        description="Taken seats of the performance as a packed bitset.",
+    )
+    @action(detail=True, methods=["get"], url_path="seat-map")
+    def seat_map(self, request, pk=None):
+        seat_map = get_cached_seat_map(pk)
+        if seat_map is None:
+            performance = self.get_object()
+            seat_map = get_seat_map(performance)
+
+        return Response(seat_map)
+
     def get_serializer(self, *args, **kwargs):
         if self.action == "list":
             self.serializer_class = PerformanceListSerializer
@@ -174,6 +716,44 @@ class TicketViewSet(
 ):
     queryset = Ticket.objects.all()
     permission_classes = (IsAuthenticated,)
+    pagination_class = OptInCursorPagination
+    cursor_ordering = ("id",)
+
+    def get_queryset(self):
+        """Retrieve the user's tickets, or everyone's for ?scope=all."""
+        queryset = self.queryset
+
+        if self.request.query_params.get("scope") == "all":
+            if not self.request.user.is_staff:
+                raise PermissionDenied(
+                    "Only administrators can list all tickets."
+                )
+        else:
+            queryset = queryset.filter(reservation__user=self.request.user)
+
+        if self.action == "list" and is_field_requested(
+            self.request, "performance"
+        ):
+            queryset = queryset.with_performance()
+
+        return queryset
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="scope",
+                description=(
+                    "List tickets of every user instead of your own, "
+                    "administrators only (ex. ?scope=all)"
+                ),
+                type=OpenApiTypes.STR,
+                enum=["all"],
+            ),
+        ],
+        description="Lists the requesting user's tickets.",
+    )
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
 
     def get_serializer(self, *args, **kwargs):
         if self.action == "retrieve":
@@ -185,13 +765,89 @@ class TicketViewSet(
 
         return super().get_serializer(*args, **kwargs)
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="performance",
+                description="Filter by performance id (ex. ?performance=2)",
+                type=OpenApiTypes.INT,
+            ),
+            OpenApiParameter(
+                name="date_from",
+                description="Shows from this day (ex. ?date_from=2022-10-23)",
+                type=OpenApiTypes.DATE,
+            ),
+            OpenApiParameter(
+                name="date_to",
+                description="Shows until this day (ex. ?date_to=2022-10-30)",
+                type=OpenApiTypes.DATE,
+            ),
+        ],
+        responses={
+            (200, "text/csv"): OpenApiTypes.STR,
+            (200, "application/x-ndjson"): OpenApiTypes.STR,
+        },
+        description=(
+            "Streams every matching ticket as CSV (?format=csv) or "
+            "NDJSON (?format=ndjson). Administrators only."
+        ),
+    )
+    @action(
+        detail=False,
+        methods=["get"],
+        permission_classes=(IsAdminUser,),
+        renderer_classes=(CSVExportRenderer, NDJSONExportRenderer),
+        pagination_class=None,
+    )
+    def export(self, request):
+        performance_id = _query_param(request, "performance", int)
+        date_from = _query_param(request, "date_from", parse_date)
+        date_to = _query_param(request, "date_to", parse_date)
+
+        queryset = Ticket.objects.all()
+        if performance_id is not None:
+            queryset = queryset.filter(performance_id=performance_id)
+        if date_from:
+            queryset = queryset.filter(
+                performance__show_time__gte=_day_start(date_from)
+            )
+        if date_to:
+            queryset = queryset.filter(
+                performance__show_time__lt=_day_start(
+                    date_to + timedelta(days=1)
+                )
+            )
+        queryset = queryset.order_by(
+            "performance__show_time", "performance_id", "row", "seat_number"
+        )
+
+        renderer = request.accepted_renderer
+        response = StreamingHttpResponse(
+            EXPORT_STREAMS[renderer.format](iter_ticket_rows(queryset)),
+            content_type=renderer.media_type,
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="tickets.{renderer.format}"'
+        )
+        return response
+
 
 class ReservationViewSet(viewsets.ModelViewSet):
     queryset = Reservation.objects.all()
     permission_classes = (IsAuthenticated,)
+    pagination_class = OptInCursorPagination
+    cursor_ordering = ("id",)
+
+    def is_normalized(self):
+        return (
+            self.action in ("list", "retrieve")
+            and self.request.query_params.get("shape") == "normalized"
+        )
 
     def get_serializer(self, *args, **kwargs):
-        if self.action in "retrieve":
+        if self.is_normalized():
+            self.serializer_class = ReservationNormalizedSerializer
+        elif self.action in "retrieve":
             self.serializer_class = ReservationDetailSerializer
         elif self.action == "list":
             self.serializer_class = ReservationListSerializer
@@ -200,7 +856,219 @@ class ReservationViewSet(viewsets.ModelViewSet):
         return super().get_serializer(*args, **kwargs)
 
     def get_queryset(self):
-        return Reservation.objects.filter(user=self.request.user)
+        queryset = Reservation.objects.filter(user=self.request.user)
+
+        if self.is_normalized():
+            queryset = queryset.prefetch_related("tickets")
+        elif not is_field_requested(self.request, "tickets"):
+            return queryset
+        elif self.action == "list":
+            queryset = queryset.prefetch_related(
+                Prefetch("tickets", queryset=Ticket.objects.with_performance())
+            )
+        elif self.action == "retrieve":
+            queryset = queryset.prefetch_related(
+                Prefetch(
+                    "tickets",
+                    queryset=Ticket.objects.select_related(
+                        "performance__play", "performance__theatre_hall"
+                    ).prefetch_related(
+                        *play_cast_prefetches("performance__play__")
+                    ),
+                )
+            )
+
+        return queryset
+
+    def get_included(self, reservations):
+        """Load every performance the reservations' tickets refer to."""
+        performances = Performance.objects.filter(
+            id__in={
+                ticket.performance_id
+                for reservation in reservations
+                for ticket in reservation.tickets.all()
+            }
+        ).select_related("play", "theatre_hall").prefetch_related(
+            *play_cast_prefetches("play__")
+        ).order_by("id")
+        return serialize_included(
+            performances, context=self.get_serializer_context()
+        )
+
+    @extend_schema(parameters=[NORMALIZED_SHAPE_PARAMETER])
+    def list(self, request, *args, **kwargs):
+        if not self.is_normalized():
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        reservations = queryset if page is None else page
+        data = self.get_serializer(reservations, many=True).data
+
+        if page is None:
+            response = Response({"results": data})
+        else:
+            response = self.get_paginated_response(data)
+        response.data["included"] = self.get_included(reservations)
+        return response
+
+    @extend_schema(parameters=[NORMALIZED_SHAPE_PARAMETER])
+    def retrieve(self, request, *args, **kwargs):
+        if not self.is_normalized():
+            return super().retrieve(request, *args, **kwargs)
+
+        reservation = self.get_object()
+        data = self.get_serializer(reservation).data
+        data["included"] = self.get_included([reservation])
+        return Response(data)
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
+
+
+class SeatHoldViewSet(
+    mixins.ListModelMixin,
+    mixins.CreateModelMixin,
+    mixins.DestroyModelMixin,
+    GenericViewSet,
+):
+    permission_classes = (IsAuthenticated,)
+
+    def get_queryset(self):
+        return SeatHold.objects.active().filter(user=self.request.user)
+
+    def get_serializer(self, *args, **kwargs):
+        if self.action == "create":
+            self.serializer_class = SeatHoldCreateSerializer
+        elif self.action == "extend":
+            self.serializer_class = SeatHoldExtendSerializer
+        else:
+            self.serializer_class = SeatHoldSerializer
+
+        return super().get_serializer(*args, **kwargs)
+
+    @extend_schema(
+        responses={201: SeatHoldSerializer(many=True)},
+        description=(
+            "Holds seats of a performance for the current user. "
+            "Responds 409 with the taken seats if any seat is sold "
+            "or held by somebody else."
+        ),
+    )
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        holds = serializer.save(user=request.user)
+
+        return Response(
+            SeatHoldSerializer(holds, many=True).data,
+            status=status.HTTP_201_CREATED,
+        )
+
+    @extend_schema(
+        responses=SeatHoldSerializer(many=True),
+        description="Pushes the expiry of your active holds forward.",
+    )
+    @action(detail=False, methods=["post"])
+    def extend(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        queryset = self.get_queryset()
+        performance_id = serializer.validated_data.get("performance")
+        if performance_id is not None:
+            queryset = queryset.filter(performance_id=performance_id)
+        queryset.update(expires_at=SeatHold.next_expiry())
+
+        return Response(
+            SeatHoldSerializer(queryset.order_by("id"), many=True).data
+        )
+
+    def perform_destroy(self, instance):
+        instance.delete()
+        invalidate_seat_maps([instance.performance_id])
+
+
+class OccupancyViewSet(mixins.ListModelMixin, GenericViewSet):
+    """Read-only occupancy rollups for administrators' dashboards."""
+
+    queryset = Occupancy.objects.all()
+    serializer_class = OccupancySerializer
+    permission_classes = (IsAdminUser,)
+    orderings = {
+        "key": ("dimension", "key"),
+        "occupancy": ("occupancy_ratio", "dimension", "key"),
+        "seats_sold": ("seats_sold", "dimension", "key"),
+    }
+
+    def get_queryset(self):
+        queryset = self.queryset
+        dimension = self.request.query_params.get("dimension")
+        if dimension:
+            if dimension not in Occupancy.Dimension.values:
+                raise ValidationError(
+                    {"dimension": f"Invalid value {dimension!r}."}
+                )
+            queryset = queryset.filter(dimension=dimension)
+
+        # Day keys are ISO dates, so they compare like the dates do.
+        date_from = _query_param(self.request, "date_from", parse_date)
+        date_to = _query_param(self.request, "date_to", parse_date)
+        if date_from or date_to:
+            queryset = queryset.filter(dimension=Occupancy.Dimension.DAY)
+        if date_from:
+            queryset = queryset.filter(key__gte=date_from.isoformat())
+        if date_to:
+            queryset = queryset.filter(key__lte=date_to.isoformat())
+
+        ordering = self.request.query_params.get("ordering", "key")
+        descending = ordering.startswith("-")
+        fields = self.orderings.get(ordering.lstrip("-"))
+        if fields is None:
+            raise ValidationError({"ordering": f"Invalid value {ordering!r}."})
+        if "occupancy_ratio" in fields:
+            queryset = queryset.annotate(
+                occupancy_ratio=Cast("seats_sold", FloatField())
+                / NullIf("seats_total", 0)
+            )
+        return queryset.order_by(
+            *(F(field).desc(nulls_last=True) if descending else F(field).asc()
+              for field in fields)
+        )
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="dimension",
+                description="Only one rollup (ex. ?dimension=play)",
+                type=OpenApiTypes.STR,
+                enum=Occupancy.Dimension.values,
+            ),
+            OpenApiParameter(
+                name="date_from",
+                description="Days from this one (ex. ?date_from=2022-10-23)",
+                type=OpenApiTypes.DATE,
+            ),
+            OpenApiParameter(
+                name="date_to",
+                description="Days until this one (ex. ?date_to=2022-10-30)",
+                type=OpenApiTypes.DATE,
+            ),
+            OpenApiParameter(
+                name="ordering",
+                description=(
+                    "Sort by key, occupancy or seats_sold, prefix with - "
+                    "for descending (ex. ?ordering=-occupancy)"
+                ),
+                type=OpenApiTypes.STR,
+            ),
+        ],
+        description=(
+            "Seats sold per performance, play, hall, genre and day, "
+            "including every committed ticket write. Administrators only."
+        ),
+    )
+    def list(self, request, *args, **kwargs):
+        if OccupancyDelta.objects.exists():
+            fold_occupancy_deltas()
+        return super().list(request, *args, **kwargs)